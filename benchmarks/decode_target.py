@@ -0,0 +1,72 @@
+"""Compares fixed-cap decoding with viewport-targeted decoding.
+
+Run with: QT_QPA_PLATFORM=offscreen python benchmarks/decode_target.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyQt6.QtCore import QPointF, QSize
+from PyQt6.QtGui import QColor, QGuiApplication, QImage, QLinearGradient, QPainter
+
+from media_loader import ImagePyramid, decode_image
+
+SOURCE_SIZES = [(4000, 3000), (6000, 4000), (8192, 5464)]
+VIEWPORTS = [(1280, 800), (1920, 1080)]
+FORMATS = ["jpg", "png"]
+
+
+def make_image(path: Path, width: int, height: int) -> None:
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    gradient = QLinearGradient(QPointF(0, 0), QPointF(width, height))
+    gradient.setColorAt(0, QColor("darkorange"))
+    gradient.setColorAt(1, QColor("steelblue"))
+    painter = QPainter(image)
+    painter.fillRect(image.rect(), gradient)
+    painter.end()
+    image.save(str(path), None, 90)
+
+
+def measure(path: Path, target: QSize | None, repeat: int) -> tuple[float, int]:
+    timings = []
+    nbytes = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        image, source_size = decode_image(path, target)
+        pyramid = ImagePyramid.build(image, source_size)
+        timings.append((time.perf_counter() - start) * 1000)
+        nbytes = pyramid.nbytes()
+    return statistics.median(timings), nbytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="decodes per measurement (median is reported)")
+    args = parser.parse_args()
+
+    _app = QGuiApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'file':<16} {'viewport':<10} {'cap ms':>8} {'cap MB':>8} {'view ms':>8} {'view MB':>8}")
+        for ext in FORMATS:
+            for width, height in SOURCE_SIZES:
+                path = Path(tmp) / f"{width}x{height}.{ext}"
+                make_image(path, width, height)
+                cap_ms, cap_bytes = measure(path, None, args.repeat)
+                for vw, vh in VIEWPORTS:
+                    view_ms, view_bytes = measure(path, QSize(vw, vh), args.repeat)
+                    print(
+                        f"{path.name:<16} {vw}x{vh:<5} {cap_ms:8.1f} {cap_bytes / 2**20:8.1f} "
+                        f"{view_ms:8.1f} {view_bytes / 2**20:8.1f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
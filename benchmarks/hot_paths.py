@@ -0,0 +1,327 @@
+"""Times the scan, decode, scale and move hot paths of the main window on synthetic folders.
+
+Run with: QT_QPA_PLATFORM=offscreen python benchmarks/hot_paths.py --output results.json
+Compare with an earlier run: ... --baseline results.json (exits 1 on a regression)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyQt6.QtCore import QT_VERSION_STR, QEventLoop, QPointF, QSize
+from PyQt6.QtGui import QColor, QImage, QImageWriter, QLinearGradient, QPainter
+from PyQt6.QtWidgets import QApplication
+
+from constants import IMAGE_FORMATS, SCRUB_SETTLE_MS
+
+# Source images the synthetic folders are linked from: (width, height, formats)
+SOURCES = [
+    (640, 480, ["jpg", "png", "bmp", "gif", "webp", "tiff"]),
+    (1920, 1080, ["jpg", "png", "webp"]),
+    (4000, 3000, ["jpg"]),
+]
+SIZES = [1000, 10000, 100000]
+WINDOW_SIZES = [QSize(1280, 800), QSize(1920, 1080)]
+
+# Metric -> (unit, True when higher is better)
+METRICS = {
+    "scan_cold_ms": ("ms", False),
+    "scan_warm_ms": ("ms", False),
+    "first_image_cold_ms": ("ms", False),
+    "first_image_warm_ms": ("ms", False),
+    "probe_ms": ("ms", False),
+    "navigation_p50_ms": ("ms", False),
+    "navigation_p95_ms": ("ms", False),
+    "navigation_max_ms": ("ms", False),
+    "scrub_p50_ms": ("ms", False),
+    "scrub_p95_ms": ("ms", False),
+    "scale_smooth_ms": ("ms", False),
+    "scale_fast_ms": ("ms", False),
+    "move_call_p95_ms": ("ms", False),
+    "move_files_per_s": ("files/s", True),
+}
+# Differences below this many units are noise, whatever the ratio
+ABSOLUTE_SLACK = {"ms": 2.0, "files/s": 5.0}
+
+
+def make_image(path: Path, width: int, height: int) -> bool:
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    gradient = QLinearGradient(QPointF(0, 0), QPointF(width, height))
+    gradient.setColorAt(0, QColor("darkorange"))
+    gradient.setColorAt(1, QColor("steelblue"))
+    painter = QPainter(image)
+    painter.fillRect(image.rect(), gradient)
+    painter.end()
+    return image.save(str(path), None, 90)
+
+
+def make_sources(directory: Path) -> list[Path]:
+    """One file per source size and format this Qt build can write."""
+    writable = {bytes(name).decode() for name in QImageWriter.supportedImageFormats()}
+    sources = []
+    for width, height, formats in SOURCES:
+        for ext in formats:
+            path = directory / f"source_{width}x{height}.{ext}"
+            if ext in IMAGE_FORMATS and ext in writable and make_image(path, width, height):
+                sources.append(path)
+    return sources
+
+
+def make_folder(directory: Path, sources: list[Path], count: int) -> Path:
+    """A folder of count images cycling through sources, hard-linked where the filesystem allows."""
+    folder = directory / f"folder_{count}"
+    folder.mkdir()
+    for i in range(count):
+        source = sources[i % len(sources)]
+        target = folder / f"{i:06d}{source.suffix}"
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+    (folder / "sorted").mkdir()
+    return folder
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Bench:
+    """Drives a MainWindow through the hot paths and collects timings in milliseconds."""
+
+    def __init__(self, app: QApplication, keep_background: bool) -> None:
+        import main
+
+        self.app = app
+        self.keep_background = keep_background
+        self.window = main.MainWindow()
+        self.window.resize(WINDOW_SIZES[0])
+        self.window.show()
+        self.pump(100)
+
+    def pump(self, ms: float) -> None:
+        end = time.perf_counter() + ms / 1000
+        while time.perf_counter() < end:
+            self.app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 10)
+
+    def wait(self, done: Callable[[], bool], timeout: float = 300.0) -> float:
+        """Processes events until done() holds; returns the elapsed milliseconds."""
+        start = time.perf_counter()
+        while not done():
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError("benchmark step did not finish")
+            self.app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 5)
+        return (time.perf_counter() - start) * 1000
+
+    def image_shown(self) -> bool:
+        w = self.window
+        return bool(w.files) and not w.image_pending and (w.image_loaded or w.image_pyramid is None)
+
+    def open_folder(self, folder: Path) -> tuple[float, float]:
+        """(scan ms, time to first full-quality image ms)"""
+        w = self.window
+        w.folder = folder
+        scan = first_image = None
+        start = time.perf_counter()
+        w.get_folder_content()
+        while scan is None or first_image is None:
+            self.app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 5)
+            elapsed = (time.perf_counter() - start) * 1000
+            if scan is None and w.scan_progress is None:
+                scan = elapsed
+            if first_image is None and self.image_shown():
+                first_image = elapsed
+        if not self.keep_background:
+            # Hashing and feature extraction would compete with every measurement below
+            w._cancel_similarity_scans()
+        return scan, first_image
+
+    def wait_for_probe(self) -> float:
+        """Waits until the header probe has delivered metadata for every file."""
+        w = self.window
+        if w.folder_index is None:
+            return 0.0
+
+        def probed() -> bool:
+            metadata = w.order.metadata
+            return not w._pending_metadata and all(
+                name in metadata and metadata[name].width is not None for name in w.files
+            )
+
+        start = time.perf_counter()
+        while not probed():
+            self.pump(50)
+        return (time.perf_counter() - start) * 1000
+
+    def navigate(self, steps: int) -> list[float]:
+        """Settled navigation: each step waits for full quality and for the scrub timer to lapse."""
+        w = self.window
+        timings = []
+        for _ in range(steps):
+            if w.curr_file >= len(w.files) - 1:
+                break
+            self.pump(SCRUB_SETTLE_MS + 20)
+            start = time.perf_counter()
+            w.next_image()
+            self.wait(self.image_shown)
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def scrub(self, steps: int) -> list[float]:
+        """Held-down arrow key: the synchronous cost of each next_image() call."""
+        w = self.window
+        timings = []
+        for _ in range(steps):
+            if w.curr_file >= len(w.files) - 1:
+                break
+            start = time.perf_counter()
+            w.next_image()
+            timings.append((time.perf_counter() - start) * 1000)
+            self.app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 5)
+        self.pump(SCRUB_SETTLE_MS + 20)
+        self.wait(self.image_shown)
+        return timings
+
+    def scale(self, repeat: int) -> tuple[float, float]:
+        """Median (smooth, fast) _scale_image() cost over the window sizes."""
+        w = self.window
+        smooth: list[float] = []
+        fast: list[float] = []
+        for size in WINDOW_SIZES:
+            w.resize(size)
+            self.pump(100)
+            for _ in range(repeat):
+                for timings, flag in ((smooth, True), (fast, False)):
+                    start = time.perf_counter()
+                    w._scale_image(flag)
+                    timings.append((time.perf_counter() - start) * 1000)
+        w.resize(WINDOW_SIZES[0])
+        self.pump(100)
+        return statistics.median(smooth), statistics.median(fast)
+
+    def move(self, count: int) -> tuple[list[float], float]:
+        """(move_to_category() call timings, files moved per second until the queue drained)"""
+        w = self.window
+        timings = []
+        start = time.perf_counter()
+        for _ in range(count):
+            if not w.files:
+                break
+            self.wait(lambda: not w.move_queue.is_full())
+            call = time.perf_counter()
+            w.move_to_category("sorted")
+            timings.append((time.perf_counter() - call) * 1000)
+            self.app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 5)
+        self.wait(lambda: w.move_queue.pending() == 0)
+        elapsed = time.perf_counter() - start
+        return timings, len(timings) / elapsed if elapsed else 0.0
+
+    def run(self, folder: Path, args: argparse.Namespace) -> dict[str, float]:
+        result: dict[str, float] = {}
+        result["scan_cold_ms"], result["first_image_cold_ms"] = self.open_folder(folder)
+        result["probe_ms"] = self.wait_for_probe()
+        result["scan_warm_ms"], result["first_image_warm_ms"] = self.open_folder(folder)
+        self.wait_for_probe()
+
+        navigation = self.navigate(args.navigations)
+        result["navigation_p50_ms"] = percentile(navigation, 0.5)
+        result["navigation_p95_ms"] = percentile(navigation, 0.95)
+        result["navigation_max_ms"] = max(navigation)
+        scrub = self.scrub(args.navigations)
+        result["scrub_p50_ms"] = percentile(scrub, 0.5)
+        result["scrub_p95_ms"] = percentile(scrub, 0.95)
+        result["scale_smooth_ms"], result["scale_fast_ms"] = self.scale(args.repeat)
+
+        calls, rate = self.move(args.moves)
+        result["move_call_p95_ms"] = percentile(calls, 0.95)
+        result["move_files_per_s"] = rate
+        return {name: round(value, 3) for name, value in result.items()}
+
+    def close(self) -> None:
+        self.window.close()
+
+
+def compare(results: dict, baseline: dict, tolerance: float, metrics: dict = METRICS) -> list[str]:
+    """Lines describing every metric that got worse than baseline by more than tolerance."""
+    regressions = []
+    for size, values in results["results"].items():
+        before = baseline.get("results", {}).get(size, {})
+        for name, value in values.items():
+            if name not in before or name not in metrics:
+                continue
+            unit, higher_is_better = metrics[name]
+            old = before[name]
+            worse = old - value if higher_is_better else value - old
+            if worse > ABSOLUTE_SLACK[unit] and worse > tolerance * abs(old):
+                regressions.append(f"{size} files: {name} {old:g} -> {value:g} {unit}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="files per synthetic folder")
+    parser.add_argument("--navigations", type=int, default=100, help="next-file steps per folder")
+    parser.add_argument("--moves", type=int, default=200, help="files moved to a category per folder")
+    parser.add_argument("--repeat", type=int, default=10, help="scale calls per window size (median is reported)")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="earlier JSON results to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline")
+    parser.add_argument(
+        "--keep-background", action="store_true", help="leave duplicate and feature scans running while measuring"
+    )
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    results: dict = {
+        "environment": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "qpa": app.platformName(),
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the folder index and caches of this run away from the user's
+        os.environ["XDG_CACHE_HOME"] = str(Path(tmp) / "cache")
+        sources = make_sources(Path(tmp))
+        bench = Bench(app, args.keep_background)
+        try:
+            for count in args.sizes:
+                folder = make_folder(Path(tmp), sources, count)
+                result = bench.run(folder, args)
+                results["results"][str(count)] = result
+                print(f"{count} files")
+                for name, value in result.items():
+                    print(f"  {name:<22} {value:>12.2f} {METRICS[name][0]}")
+        finally:
+            bench.close()
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
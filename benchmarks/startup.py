@@ -0,0 +1,132 @@
+"""Times the start of the app in fresh processes: time to window and time to first image.
+
+Run with: QT_QPA_PLATFORM=offscreen python benchmarks/startup.py --output startup.json
+Compare with an earlier run: ... --baseline startup.json (exits 1 on a regression)
+
+Each run launches main.py on a synthetic folder with --startup-report. The
+first run per folder starts with an empty cache (no folder index, no
+previews); the rest find the cache of the runs before them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from hot_paths import compare, make_folder, make_sources, percentile
+from PyQt6.QtCore import QT_VERSION_STR
+from PyQt6.QtGui import QGuiApplication
+
+MAIN = Path(__file__).resolve().parent.parent / "main.py"
+SIZES = [1000, 10000]
+
+# Metric -> (unit, True when higher is better)
+METRICS = {
+    "window_cold_ms": ("ms", False),
+    "first_image_cold_ms": ("ms", False),
+    "window_warm_p50_ms": ("ms", False),
+    "window_warm_p95_ms": ("ms", False),
+    "first_image_warm_p50_ms": ("ms", False),
+    "first_image_warm_p95_ms": ("ms", False),
+}
+
+
+def launch(folder: Path, environment: dict[str, str], timeout: float) -> tuple[float, float | None, bool]:
+    """(ms to window, ms to first image or None, whether QtMultimedia got imported) for one start"""
+    started = time.time()
+    output = subprocess.run(
+        [sys.executable, str(MAIN), str(folder), "--startup-report"],
+        env=environment,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        check=True,
+    ).stdout
+    report = json.loads(output.strip().splitlines()[-1])
+    first_media = report["first_media"]
+    return (
+        (report["window_shown"] - started) * 1000,
+        (first_media - started) * 1000 if first_media is not None else None,
+        report["multimedia_loaded"],
+    )
+
+
+def measure(folder: Path, runs: int, environment: dict[str, str], timeout: float) -> dict[str, float]:
+    window, first_image = [], []
+    for _ in range(runs):
+        shown, media, multimedia = launch(folder, environment, timeout)
+        if media is None:
+            raise RuntimeError(f"no image was shown for {folder}")
+        if multimedia:
+            print("  warning: QtMultimedia was imported for an image-only folder")
+        window.append(shown)
+        first_image.append(media)
+    result = {"window_cold_ms": window[0], "first_image_cold_ms": first_image[0]}
+    warm_window, warm_image = window[1:], first_image[1:]
+    if warm_window:
+        result["window_warm_p50_ms"] = statistics.median(warm_window)
+        result["window_warm_p95_ms"] = percentile(warm_window, 0.95)
+        result["first_image_warm_p50_ms"] = statistics.median(warm_image)
+        result["first_image_warm_p95_ms"] = percentile(warm_image, 0.95)
+    return {name: round(value, 3) for name, value in result.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="files per synthetic folder")
+    parser.add_argument("--runs", type=int, default=6, help="starts per folder; the first one is cold")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds one start may take")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="earlier JSON results to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    results: dict = {
+        "environment": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "qpa": app.platformName(),
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = make_sources(Path(tmp))
+        for count in args.sizes:
+            folder = make_folder(Path(tmp), sources, count)
+            # A cache and settings of its own per folder, so that the first run is cold
+            environment = dict(
+                os.environ,
+                XDG_CACHE_HOME=str(Path(tmp) / f"cache_{count}"),
+                XDG_CONFIG_HOME=str(Path(tmp) / f"config_{count}"),
+            )
+            result = measure(folder, args.runs, environment, args.timeout)
+            results["results"][str(count)] = result
+            print(f"{count} files")
+            for name, value in result.items():
+                print(f"  {name:<24} {value:>10.2f} {METRICS[name][0]}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance, METRICS)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
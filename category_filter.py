@@ -0,0 +1,83 @@
+"""Type-ahead matching of category names (no Qt dependencies).
+
+Names are ranked in three tiers: names starting with the query, names with
+a word starting with it, then names containing its characters in order.
+The first two tiers come from sorted keys searched with bisect; only the
+fuzzy tier looks at names one by one, and when the query grows by a
+keystroke only the names that matched the shorter query are looked at."""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from collections.abc import Iterable
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _prefixed(keys: list[tuple[str, int]], prefix: str) -> list[int]:
+    """Positions of the keys starting with prefix, in key order."""
+    found = []
+    for i in range(bisect_left(keys, (prefix, -1)), len(keys)):
+        key, position = keys[i]
+        if not key.startswith(prefix):
+            break
+        found.append(position)
+    return found
+
+
+def fuzzy_score(name: str, query: str) -> int | None:
+    """How loosely query's characters appear in order in name (lower is closer), or None.
+
+    Both are expected casefolded. Characters are matched leftmost-first and
+    the score counts the skipped characters between the first and last one."""
+    start = end = -1
+    for char in query:
+        end = name.find(char, end + 1)
+        if end < 0:
+            return None
+        if start < 0:
+            start = end
+    return end - start + 1 - len(query)
+
+
+class CategoryFilter:
+    """Ranks category names against a typed query."""
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self.set_names(names)
+
+    def set_names(self, names: Iterable[str]) -> None:
+        """Rebuilds the index; matching costs nothing per name until this is called again."""
+        self._names = list(names)
+        self._folded = [name.casefold() for name in self._names]
+        self._keys = sorted((key, i) for i, key in enumerate(self._folded))
+        self._words = sorted((word, i) for i, key in enumerate(self._folded) for word in set(_WORD.findall(key)))
+        # The last query and the positions it matched, to narrow the next keystroke's search
+        self._last: tuple[str, list[int]] | None = None
+
+    def match(self, query: str, limit: int | None = None) -> list[str]:
+        """Names matching query, best first; every name, in order, for an empty query."""
+        query = query.strip().casefold()
+        if not query:
+            return self._names[:limit]
+        candidates = None
+        if self._last is not None and query.startswith(self._last[0]):
+            candidates = self._last[1]
+
+        found: dict[int, None] = {}
+        exact = [i for i in _prefixed(self._keys, query) if self._folded[i] == query]
+        found.update(dict.fromkeys(exact))
+        found.update(dict.fromkeys(sorted(_prefixed(self._keys, query))))
+        found.update(dict.fromkeys(sorted(set(_prefixed(self._words, query)))))
+        scored = []
+        for i in candidates if candidates is not None else range(len(self._names)):
+            if i not in found:
+                score = fuzzy_score(self._folded[i], query)
+                if score is not None:
+                    scored.append((score, i))
+        found.update(dict.fromkeys(i for _, i in sorted(scored)))
+
+        positions = list(found)
+        self._last = (query, positions)
+        return [self._names[i] for i in positions[:limit]]
@@ -0,0 +1,211 @@
+"""Category buttons with a type-ahead filter, for folders with hundreds of categories."""
+
+from __future__ import annotations
+
+import math
+from functools import partial
+
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QResizeEvent, QWheelEvent
+from PyQt6.QtWidgets import QGridLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QVBoxLayout, QWidget
+
+from category_filter import CategoryFilter
+from constants import CATEGORY_BUTTON_HEIGHT, CATEGORY_BUTTON_WIDTH, CATEGORY_ROWS
+
+# Horizontal padding and border of a category button in the style sheet
+_BUTTON_CHROME = 28
+
+
+class CategoryPanel(QWidget):
+    """Shows one page of category buttons, at most CATEGORY_ROWS rows of them.
+
+    The buttons are a pool sized to the page and only relabelled when the
+    categories, the filter or the page change, so the cost of an update
+    does not grow with the number of categories. Resizing moves the pooled
+    buttons to the new column count instead of recreating them.
+
+    Typing into the filter narrows the buttons to the matching categories;
+    Enter files into the best match. category_chosen carries the category
+    of a clicked button or of that match."""
+
+    category_chosen = pyqtSignal(str)
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._index = CategoryFilter()
+        self._categories: list[str] = []
+        self._shown: list[str] = []
+        self._suggested: set[str] = set()
+        self._page = 0
+        self._columns = 1
+        self._button_width = CATEGORY_BUTTON_WIDTH
+        self._buttons: list[QPushButton] = []
+
+        self.filterEdit = QLineEdit()
+        self.filterEdit.setObjectName("categoryFilter")
+        self.filterEdit.setPlaceholderText("Type to find a category, Enter to move the file there")
+        self.filterEdit.setClearButtonEnabled(True)
+        self.filterEdit.textChanged.connect(self._on_filter_changed)
+        self.filterEdit.returnPressed.connect(self._on_filter_accepted)
+        self.countLabel = QLabel()
+        self.prevPageButton = QPushButton("\u2039")
+        self.prevPageButton.setToolTip("Previous page of categories")
+        self.prevPageButton.clicked.connect(partial(self.turn_page, -1))
+        self.pageLabel = QLabel()
+        self.nextPageButton = QPushButton("\u203a")
+        self.nextPageButton.setToolTip("Next page of categories")
+        self.nextPageButton.clicked.connect(partial(self.turn_page, 1))
+
+        self.header = QWidget()
+        header = QHBoxLayout(self.header)
+        header.setContentsMargins(0, 0, 0, 0)
+        header.addWidget(self.filterEdit, stretch=1)
+        header.addWidget(self.countLabel)
+        header.addWidget(self.prevPageButton)
+        header.addWidget(self.pageLabel)
+        header.addWidget(self.nextPageButton)
+
+        self._grid = QGridLayout()
+        self._grid.setSpacing(6)
+        self._grid.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.header)
+        layout.addLayout(self._grid)
+        # Otherwise the layout makes the current columns the minimum and the window could never narrow them
+        self.setMinimumWidth(CATEGORY_BUTTON_WIDTH)
+        self._refresh()
+
+    def set_categories(self, categories: list[str]) -> None:
+        if categories == self._categories:
+            return
+        self._categories = list(categories)
+        self._index.set_names(self._categories)
+        self._shown = self._index.match(self.filterEdit.text())
+        self._refresh()
+
+    def set_suggested(self, categories: list[str]) -> None:
+        """Highlights the buttons of categories, where they are on the current page"""
+        self._suggested = set(categories)
+        for button in self._buttons:
+            self._mark_suggested(button)
+
+    def start_filter(self, text: str) -> None:
+        """Starts a new type-ahead query with text, e.g. a key typed anywhere in the window"""
+        # The text shows the filter row, which has to be visible to take the focus
+        self.filterEdit.setText(text)
+        self.filterEdit.setFocus()
+
+    def clear_filter(self) -> bool:
+        """Ends the type-ahead query; False when there was none"""
+        active = bool(self.filterEdit.text()) or self.filterEdit.hasFocus()
+        self.filterEdit.clearFocus()
+        if self.filterEdit.text():
+            self.filterEdit.clear()
+        else:
+            self._refresh()
+        return active
+
+    def turn_page(self, step: int) -> None:
+        pages = self._page_count()
+        page = min(max(0, self._page + step), pages - 1)
+        if page != self._page:
+            self._page = page
+            self._refresh()
+
+    def _page_size(self) -> int:
+        return self._columns * CATEGORY_ROWS
+
+    def _page_count(self) -> int:
+        return max(1, math.ceil(len(self._shown) / self._page_size()))
+
+    def _on_filter_changed(self, text: str) -> None:
+        self._shown = self._index.match(text)
+        self._page = 0
+        self._refresh()
+
+    def _on_filter_accepted(self) -> None:
+        if self._shown and self.filterEdit.text():
+            category = self._shown[0]
+            self.clear_filter()
+            self.category_chosen.emit(category)
+
+    def _on_button(self, button: QPushButton) -> None:
+        self.category_chosen.emit(button.property("category"))
+
+    def _new_button(self) -> QPushButton:
+        button = QPushButton()
+        button.setObjectName("categoryButton")
+        button.setFixedSize(self._button_width, CATEGORY_BUTTON_HEIGHT)
+        button.clicked.connect(partial(self._on_button, button))
+        index = len(self._buttons)
+        self._grid.addWidget(button, index // self._columns, index % self._columns)
+        self._buttons.append(button)
+        return button
+
+    def _reflow(self) -> None:
+        """Moves the pooled buttons into the current column count"""
+        for button in self._buttons:
+            self._grid.removeWidget(button)
+        for index, button in enumerate(self._buttons):
+            button.setFixedWidth(self._button_width)
+            self._grid.addWidget(button, index // self._columns, index % self._columns)
+
+    def _refresh(self) -> None:
+        """Labels the pooled buttons with the current page of matching categories"""
+        self._page = min(self._page, self._page_count() - 1)
+        start = self._page * self._page_size()
+        page = self._shown[start : start + self._page_size()]
+        while len(self._buttons) < len(page):
+            self._new_button()
+        metrics = self.fontMetrics()
+        for index, button in enumerate(self._buttons):
+            if index >= len(page):
+                button.setVisible(False)
+                continue
+            category = page[index]
+            if button.property("category") != category or button.property("elided") != self._button_width:
+                text = metrics.elidedText(category, Qt.TextElideMode.ElideRight, self._button_width - _BUTTON_CHROME)
+                button.setText(text)
+                button.setToolTip(category if text != category else "")
+                button.setProperty("category", category)
+                button.setProperty("elided", self._button_width)
+            self._mark_suggested(button)
+            button.setVisible(True)
+
+        filtering = bool(self.filterEdit.text())
+        paged = len(self._shown) > self._page_size()
+        self.header.setVisible(filtering or self.filterEdit.hasFocus() or len(self._categories) > self._page_size())
+        self.countLabel.setText(f"{len(self._shown)} of {len(self._categories)}" if filtering else "")
+        self.pageLabel.setText(f"{self._page + 1}/{self._page_count()}")
+        for widget in (self.prevPageButton, self.pageLabel, self.nextPageButton):
+            widget.setVisible(paged)
+        self.prevPageButton.setEnabled(self._page > 0)
+        self.nextPageButton.setEnabled(self._page < self._page_count() - 1)
+
+    def _mark_suggested(self, button: QPushButton) -> None:
+        suggested = button.property("category") in self._suggested
+        if bool(button.property("suggested")) != suggested:
+            button.setProperty("suggested", suggested)
+            # Re-evaluate the [suggested="true"] style rule
+            button.style().unpolish(button)
+            button.style().polish(button)
+
+    def resizeEvent(self, event: QResizeEvent | None) -> None:
+        super().resizeEvent(event)
+        spacing = self._grid.spacing()
+        width = self.width()
+        columns = max(1, (width + spacing) // (CATEGORY_BUTTON_WIDTH + spacing))
+        button_width = max(CATEGORY_BUTTON_WIDTH, (width - spacing * (columns - 1)) // columns)
+        if (columns, button_width) != (self._columns, self._button_width):
+            self._columns = columns
+            self._button_width = button_width
+            self._reflow()
+            self._refresh()
+
+    def wheelEvent(self, event: QWheelEvent | None) -> None:
+        """Turns pages of categories"""
+        delta = event.angleDelta().y()
+        if delta:
+            self.turn_page(-1 if delta > 0 else 1)
+        event.accept()
@@ -4,3 +4,53 @@ IMAGE_FORMATS = {"jpg", "png", "jpeg", "gif", "bmp", "webp", "ico", "tiff", "tif
 VIDEO_FORMATS = {"mp4", "avi", "mov", "mkv", "webm", "wmv", "flv", "m4v", "mpg", "mpeg"}
 MEDIA_FORMATS = IMAGE_FORMATS | VIDEO_FORMATS
 MAX_IMAGE_DIMENSION = 4096
+PREFETCH_AHEAD = 3
+PREFETCH_BEHIND = 1
+PREVIEW_DIMENSION = 320
+PREVIEW_CACHE_SIZE = 64
+SCRUB_SETTLE_MS = 150
+MIPMAP_MIN_DIMENSION = 256
+VIEWPORT_DECODE = True
+DECODE_SIZE_STEP = 256
+SCAN_FIRST_BATCH = 64
+SCAN_MAX_BATCH = 16384
+CACHE_DIR_NAME = "python-media-sorter-gui"
+WATCH_COALESCE_MS = 250
+MOVE_QUEUE_DEPTH = 64
+MOVE_CHUNK_SIZE = 8 * 1024 * 1024
+MOVE_VERIFY = False
+MOVE_FSYNC = True
+RESTORE_WORKERS = 4
+RESTORE_BATCH = 256
+RESTORE_PARALLEL_LATENCY = 0.0005
+TRASH_BATCH = 32
+THUMBNAIL_SIZE = 128
+THUMBNAIL_CACHE_SIZE = 2048
+THUMBNAIL_MAX_PENDING = 256
+POSTER_TIMEOUT_MS = 5000
+PREVIEW_DISK_CACHE_BYTES = 1024 * 1024 * 1024
+PREVIEW_DISK_MIN_BYTES = 8 * 1024 * 1024
+PREVIEW_DISK_MIN_PIXELS = 16_000_000
+ZOOM_TILE_SIZE = 512
+ZOOM_TILE_CACHE_BYTES = 192 * 1024 * 1024
+ZOOM_MAX_FACTOR = 8
+ZOOM_FALLBACK_PIXELS = 32_000_000
+VIDEO_PRELOAD_DELAY_MS = 300
+VIDEO_AUTOPLAY = True
+POSTER_SIZE = 1024
+POSTER_CACHE_SIZE = 24
+DUPLICATE_MAX_DISTANCE = 6
+HASH_BATCH = 256
+SUGGEST_NEIGHBOURS = 7
+SUGGEST_COUNT = 2
+SUGGEST_WORKERS = 2
+SUGGEST_MAX_COMPARISONS = 2048
+SUGGEST_REFRESH_MS = 500
+METADATA_RESORT_MS = 1000
+TRACE_CAPACITY = 200_000
+STARTUP_REPORT_TIMEOUT_MS = 30_000
+CATEGORY_BUTTON_WIDTH = 100
+CATEGORY_BUTTON_HEIGHT = 35
+CATEGORY_ROWS = 3
+SOURCE_SCAN_WORKERS = 8
+SOURCE_SCAN_PENDING = 4
@@ -0,0 +1,162 @@
+"""Compact image signatures and nearest-neighbour ranking of categories (no Qt dependencies).
+
+A signature packs a colour histogram and a downscaled luminance image into
+one integer using thermometer codes: every value is quantised to a level
+and written as that many set bits, so the Hamming distance between two
+signatures is the L1 distance between their quantised features. Comparing
+two signatures costs one XOR and popcount, and a pivot index keeps the
+number of comparisons per ranking bounded."""
+
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left, insort
+
+from constants import SUGGEST_MAX_COMPARISONS, SUGGEST_NEIGHBOURS
+
+# Images are reduced to this many pixels square before extracting features
+SIGNATURE_SIZE = 16
+
+# 4x4x4 RGB histogram; a bin's level is the number of thresholds its share of pixels reaches
+_COLOUR_LEVELS = 4
+_SHARE_THRESHOLDS = (1 / 128, 1 / 64, 1 / 32, 1 / 16, 1 / 8, 1 / 4, 1 / 2)
+# Each colour level step counts double, so colour weighs about as much as luminance
+_COLOUR_STEP_BITS = 2
+# 8x8 luminance cells quantised to 0..7
+_LUMA_CELLS = 8
+_LUMA_LEVELS = 7
+# Sorted examples are grouped around at most this many pivots; an example becomes one while it lies
+# further than _PIVOT_SPACING bits from every pivot so far
+_PIVOTS = 64
+_PIVOT_SPACING = 96
+
+
+def _thermometer(level: int, width: int) -> int:
+    """level set bits at the bottom of a width-bit field."""
+    return ((1 << level) - 1) if level < width else (1 << width) - 1
+
+
+def signature_from_rgb(pixels: bytes, stride: int) -> int:
+    """Signature of a SIGNATURE_SIZE square RGB888 image given as rows of stride bytes."""
+    size = SIGNATURE_SIZE
+    bins = [0] * _COLOUR_LEVELS**3
+    luma = [0] * (_LUMA_CELLS * _LUMA_CELLS)
+    cell = size // _LUMA_CELLS
+    shift = 8 - (_COLOUR_LEVELS.bit_length() - 1)
+    for y in range(size):
+        row = pixels[y * stride : y * stride + size * 3]
+        for x in range(size):
+            r, g, b = row[3 * x], row[3 * x + 1], row[3 * x + 2]
+            bins[((r >> shift) * _COLOUR_LEVELS + (g >> shift)) * _COLOUR_LEVELS + (b >> shift)] += 1
+            luma[(y // cell) * _LUMA_CELLS + x // cell] += 299 * r + 587 * g + 114 * b
+
+    signature = 0
+    pixel_count = size * size
+    colour_width = len(_SHARE_THRESHOLDS) * _COLOUR_STEP_BITS
+    for count in bins:
+        share = count / pixel_count
+        level = sum(share >= threshold for threshold in _SHARE_THRESHOLDS) * _COLOUR_STEP_BITS
+        signature = (signature << colour_width) | _thermometer(level, colour_width)
+    luma_scale = cell * cell * 1000 * 256
+    for total in luma:
+        level = total * (_LUMA_LEVELS + 1) // luma_scale
+        signature = (signature << _LUMA_LEVELS) | _thermometer(level, _LUMA_LEVELS)
+    return signature
+
+
+class CategoryIndex:
+    """Signatures of sorted examples, keyed (category, name), plus unsorted files under category "".
+
+    Sorted examples are filed under the nearest of a few pivot signatures,
+    ordered by their distance to it. rank() visits the pivots nearest the
+    query first and, by the triangle inequality, only the examples of a pivot
+    whose distance to it lets them beat the current k-th nearest. It stops
+    after max_comparisons examples, so a ranking costs about the same at a
+    million examples as at ten thousand. version changes whenever a ranking
+    could."""
+
+    def __init__(self, max_comparisons: int = SUGGEST_MAX_COMPARISONS) -> None:
+        self._max_comparisons = max_comparisons
+        self._signatures: dict[tuple[str, str], int] = {}
+        self._pivots: list[int] = []
+        # Per pivot: (distance to the pivot, category, name, signature), sorted
+        self._groups: list[list[tuple[int, str, str, int]]] = []
+        self._placed: dict[tuple[str, str], tuple[int, int]] = {}
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def get(self, key: tuple[str, str]) -> int | None:
+        return self._signatures.get(key)
+
+    def add(self, key: tuple[str, str], signature: int) -> None:
+        if key in self._signatures:
+            self.remove(key)
+        self._signatures[key] = signature
+        if key[0]:
+            self._place(key, signature)
+
+    def remove(self, key: tuple[str, str]) -> None:
+        signature = self._signatures.pop(key, None)
+        placed = self._placed.pop(key, None)
+        if signature is None or placed is None:
+            return
+        group_index, distance = placed
+        group = self._groups[group_index]
+        del group[bisect_left(group, (distance, *key, signature))]
+        self.version += 1
+
+    def move(self, old: tuple[str, str], new: tuple[str, str]) -> None:
+        signature = self._signatures.get(old)
+        if signature is not None:
+            self.remove(old)
+            self.add(new, signature)
+
+    def clear(self) -> None:
+        self._signatures.clear()
+        self._pivots.clear()
+        self._groups.clear()
+        self._placed.clear()
+        self.version += 1
+
+    def _place(self, key: tuple[str, str], signature: int) -> None:
+        distances = [(pivot ^ signature).bit_count() for pivot in self._pivots]
+        if len(self._pivots) < _PIVOTS and min(distances, default=_PIVOT_SPACING + 1) > _PIVOT_SPACING:
+            self._pivots.append(signature)
+            self._groups.append([])
+            distances.append(0)
+        group_index = min(range(len(distances)), key=distances.__getitem__)
+        insort(self._groups[group_index], (distances[group_index], *key, signature))
+        self._placed[key] = (group_index, distances[group_index])
+        self.version += 1
+
+    def rank(self, signature: int, neighbours: int = SUGGEST_NEIGHBOURS) -> list[str]:
+        """Categories ordered by weighted votes of the nearest sorted examples, best first."""
+        to_pivots = [(pivot ^ signature).bit_count() for pivot in self._pivots]
+        # Max-heap of the nearest examples so far as (-distance, category)
+        nearest: list[tuple[int, str]] = []
+        budget = self._max_comparisons
+        for group_index in sorted(range(len(to_pivots)), key=to_pivots.__getitem__):
+            group = self._groups[group_index]
+            to_pivot = to_pivots[group_index]
+            start, end = 0, len(group)
+            if len(nearest) == neighbours:
+                radius = -nearest[0][0]
+                start = bisect_left(group, (to_pivot - radius,))
+                end = bisect_left(group, (to_pivot + radius + 1,))
+            for i in range(start, end):
+                _, category, _, other = group[i]
+                distance = (other ^ signature).bit_count()
+                if len(nearest) < neighbours:
+                    heapq.heappush(nearest, (-distance, category))
+                elif distance < -nearest[0][0]:
+                    heapq.heapreplace(nearest, (-distance, category))
+            budget -= end - start
+            if budget <= 0:
+                break
+
+        votes: dict[str, float] = {}
+        for distance, category in sorted((-negated, category) for negated, category in nearest):
+            votes[category] = votes.get(category, 0.0) + 1 / (1 + distance)
+        return sorted(votes, key=lambda category: -votes[category])
@@ -0,0 +1,94 @@
+"""Operations on the sorted file-name lists used for navigation (no Qt dependencies).
+
+Lists are sorted by name unless a sort key is given; a key must order every
+name uniquely (see file_order.FileOrder.key) and be the one the list was
+sorted with."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections.abc import Callable, Iterable
+from itertools import pairwise
+from typing import Any
+
+SortKey = Callable[[str], Any]
+
+# Fewer new names than this are inserted one by one instead of re-sorting under a key
+_INSORT_LIMIT = 64
+
+
+def position(items: list[str], name: str, key: SortKey | None = None) -> int:
+    """Where name belongs in the sorted list items (bisect_left)."""
+    return bisect_left(items, name) if key is None else bisect_left(items, key(name), key=key)
+
+
+def contains(items: list[str], name: str, key: SortKey | None = None) -> bool:
+    i = position(items, name, key)
+    return i < len(items) and items[i] == name
+
+
+def index_of(items: list[str], name: str, key: SortKey | None = None) -> int:
+    """Returns the position of name in the sorted list items, or -1 if missing."""
+    i = position(items, name, key)
+    return i if i < len(items) and items[i] == name else -1
+
+
+def merge_sorted(items: list[str], batch: Iterable[str], key: SortKey | None = None) -> list[str]:
+    """Returns a new sorted list holding items plus every new name from batch."""
+    if key is not None:
+        new = {name for name in batch if not contains(items, name, key)}
+        if len(new) < _INSORT_LIMIT:
+            merged = list(items)
+            for name in new:
+                insort(merged, name, key=key)
+            return merged
+        # Computing every key once is cheaper than many insertions
+        return sorted([*items, *new], key=key)
+    if not items:
+        batch = list(batch)
+        if all(a < b for a, b in pairwise(batch)):
+            # Already sorted and unique, as scan batches are
+            return batch
+        return sorted(set(batch))
+    new = sorted({name for name in batch if not contains(items, name)})
+    if not new:
+        return list(items)
+    merged = items + new
+    # Two sorted runs: timsort merges them in linear time
+    merged.sort()
+    return merged
+
+
+def remove_names(items: list[str], names: Iterable[str]) -> list[str]:
+    """Returns items without any of names, keeping the order."""
+    drop = set(names)
+    return [name for name in items if name not in drop]
+
+
+def diff_listing(items: list[str], listing: set[str], ignore: set[str] = frozenset()) -> tuple[list[str], list[str]]:
+    """Compares items with a fresh listing, returning (sorted added names, removed names).
+
+    Names in ignore are left alone either way, e.g. files the app itself is moving."""
+    known = set(items)
+    added = sorted(listing - known - ignore)
+    removed = [name for name in items if name not in listing and name not in ignore]
+    return added, removed
+
+
+def remove_selection(items: list[str], names: Iterable[str], index: int) -> tuple[list[str], int]:
+    """Removes names in one pass and returns (remaining items, new position of the file to show).
+
+    The file at index stays current if it survives; otherwise its first surviving
+    successor does, or the last file when nothing follows."""
+    drop = set(names)
+    remaining: list[str] = []
+    position = -1
+    for i, name in enumerate(items):
+        if name in drop:
+            continue
+        if position < 0 and i >= index:
+            position = len(remaining)
+        remaining.append(name)
+    if position < 0:
+        position = len(remaining) - 1
+    return remaining, max(position, 0)
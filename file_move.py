@@ -0,0 +1,259 @@
+"""Moving files between folders that may live on different filesystems (no Qt dependencies).
+
+Same-device moves stay a single rename. Across devices the file is streamed
+into a hidden ".partial" file next to the destination with copy_file_range or
+sendfile, renamed into place once complete, and only then is the source
+removed. An interrupted copy leaves its partial file behind and the next move
+of the same file resumes from where it stopped."""
+
+from __future__ import annotations
+
+import errno
+import hashlib
+import os
+import shutil
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from constants import (
+    MOVE_CHUNK_SIZE,
+    MOVE_FSYNC,
+    MOVE_VERIFY,
+    RESTORE_BATCH,
+    RESTORE_PARALLEL_LATENCY,
+    RESTORE_WORKERS,
+)
+from folder_scan import is_media_name
+
+# Bytes compared between the partial file and the source before resuming
+_RESUME_CHECK = 64 * 1024
+
+# Errors that mean a zero-copy syscall cannot be used for this pair of files
+_NO_ZERO_COPY = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.ENOTSUP}
+
+
+class MoveCancelled(Exception):
+    """Raised when a cross-device copy was stopped; its partial file is kept for resuming."""
+
+
+def partial_path(dest: Path) -> Path:
+    return dest.with_name(f".{dest.name}.partial")
+
+
+def move_file(
+    source: Path,
+    dest: Path,
+    verify: bool = MOVE_VERIFY,
+    fsync: bool = MOVE_FSYNC,
+    progress: Callable[[int, int], None] | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> bool:
+    """Moves source to dest and returns True if the file had to be copied across devices.
+
+    An existing dest is never replaced; FileExistsError is raised instead.
+    verify compares checksums of the copy and the source before the source is
+    removed; fsync flushes the copy and its directory to disk first. progress
+    is called with (bytes done, total bytes) while copying."""
+    # rename() would silently replace it, e.g. a file of the same name from another source folder
+    if os.path.lexists(dest):
+        raise FileExistsError(errno.EEXIST, f"already exists in {dest.parent.name}", str(dest))
+    try:
+        source.rename(dest)
+        return False
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+
+    if cancelled is not None and cancelled():
+        raise MoveCancelled(str(source))
+    _copy_across(source, dest, verify, fsync, progress, cancelled)
+    source.unlink()
+    return True
+
+
+@dataclass
+class MovedBatch:
+    """Outcome of one chunk of move_entries(); files and folders are sorted."""
+
+    files: list[str]
+    folders: list[str]
+    failures: list[str]
+    done: int
+    total: int
+
+
+def move_entries(
+    source: Path,
+    dest: Path,
+    cancelled: Callable[[], bool] | None = None,
+    workers: int = RESTORE_WORKERS,
+    batch_size: int = RESTORE_BATCH,
+) -> Iterator[MovedBatch]:
+    """Moves every entry of source into dest, yielding a MovedBatch after each chunk.
+
+    Only media files are listed in a batch's files. Names that already exist in
+    dest are reported as failures instead of being overwritten. Stopping
+    through cancelled happens between chunks.
+
+    The first chunk is moved sequentially. If its renames turn out slow, as on
+    network filesystems, later chunks use up to `workers` threads to overlap
+    the round trips; on local disks threads only contend for the directory lock."""
+    with os.scandir(source) as it:
+        entries = sorted((entry.name, entry.is_dir()) for entry in it)
+    total = len(entries)
+    done = 0
+
+    def move_one(entry: tuple[str, bool]) -> str | None:
+        return _move_entry(source, dest, *entry, cancelled)
+
+    executor: ThreadPoolExecutor | None = None
+    try:
+        for start in range(0, total, batch_size):
+            if cancelled is not None and cancelled():
+                return
+            chunk = entries[start : start + batch_size]
+            started = time.perf_counter()
+            errors = list(executor.map(move_one, chunk) if executor is not None else map(move_one, chunk))
+            latency = (time.perf_counter() - started) / len(chunk)
+            if start == 0 and workers > 1 and latency > RESTORE_PARALLEL_LATENCY:
+                executor = ThreadPoolExecutor(workers)
+            batch = MovedBatch([], [], [], done + len(chunk), total)
+            for (name, is_dir), error in zip(chunk, errors, strict=True):
+                if error is not None:
+                    batch.failures.append(f"{name}: {error}")
+                elif is_dir:
+                    batch.folders.append(name)
+                elif is_media_name(name):
+                    batch.files.append(name)
+            done = batch.done
+            yield batch
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def _move_entry(source: Path, dest: Path, name: str, is_dir: bool, cancelled: Callable[[], bool] | None) -> str | None:
+    """Moves one entry and returns an error message, or None on success."""
+    target = dest / name
+    if os.path.lexists(target):
+        return f"already exists in {dest.name}"
+    try:
+        if not is_dir:
+            move_file(source / name, target, cancelled=cancelled)
+            return None
+        try:
+            (source / name).rename(target)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.move(source / name, target)
+    except MoveCancelled:
+        return "cancelled"
+    except OSError as e:
+        return e.strerror or str(e)
+    return None
+
+
+def _copy_across(
+    source: Path,
+    dest: Path,
+    verify: bool,
+    fsync: bool,
+    progress: Callable[[int, int], None] | None,
+    cancelled: Callable[[], bool] | None,
+) -> None:
+    partial = partial_path(dest)
+    total = source.stat().st_size
+    # Not opened in append mode: copy_file_range rejects O_APPEND destinations
+    fd = os.open(partial, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+    with open(source, "rb") as src, open(fd, "r+b") as dst:
+        done = _resume_offset(src, dst, total)
+        dst.truncate(done)
+        if progress is not None:
+            progress(done, total)
+        while done < total:
+            if cancelled is not None and cancelled():
+                raise MoveCancelled(str(source))
+            done += _copy_chunk(src, dst, done, min(MOVE_CHUNK_SIZE, total - done))
+            if progress is not None:
+                progress(done, total)
+        if fsync:
+            dst.flush()
+            os.fsync(dst.fileno())
+
+    if verify and _checksum(source) != _checksum(partial):
+        partial.unlink()
+        raise OSError(errno.EIO, "Copy does not match the source", str(dest))
+
+    shutil.copystat(source, partial)
+    os.replace(partial, dest)
+    if fsync:
+        _fsync_dir(dest.parent)
+
+
+def _resume_offset(src, dst, total: int) -> int:
+    """Length of an earlier partial copy that can be kept, or 0 to start over."""
+    done = os.fstat(dst.fileno()).st_size
+    if done == 0 or done > total:
+        return 0
+    check = min(done, _RESUME_CHECK)
+    src.seek(done - check)
+    dst.seek(done - check)
+    if src.read(check) != dst.read(check):
+        return 0
+    return done
+
+
+def _copy_chunk(src, dst, offset: int, count: int) -> int:
+    """Copies up to count bytes at offset, preferring in-kernel copies over read/write."""
+    in_fd, out_fd = src.fileno(), dst.fileno()
+    if hasattr(os, "copy_file_range"):
+        try:
+            copied = os.copy_file_range(in_fd, out_fd, count, offset, offset)
+            if copied:
+                return copied
+        except OSError as e:
+            if e.errno not in _NO_ZERO_COPY:
+                raise
+    if hasattr(os, "sendfile"):
+        try:
+            os.lseek(out_fd, offset, os.SEEK_SET)
+            copied = os.sendfile(out_fd, in_fd, offset, count)
+            if copied:
+                return copied
+        except OSError as e:
+            if e.errno not in _NO_ZERO_COPY:
+                raise
+    src.seek(offset)
+    data = src.read(count)
+    if not data:
+        raise OSError(errno.EIO, "Source file shrank while copying", src.name)
+    dst.seek(offset)
+    dst.write(data)
+    dst.flush()
+    return len(data)
+
+
+def _checksum(path: Path) -> bytes:
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        while chunk := f.read(MOVE_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _fsync_dir(folder: Path) -> None:
+    """Makes a rename in folder durable; not supported on every platform."""
+    try:
+        fd = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
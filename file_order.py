@@ -0,0 +1,104 @@
+"""Sort orders and filters for the navigation list (no Qt dependencies).
+
+Orders other than by name use the metadata kept in the folder index, so
+changing the order or the filter never touches the files themselves. Files
+whose metadata is not known yet sort after the rest, by name.
+
+Files from source folders are named by their absolute path; every order
+compares them by file name like the top-level files, with the full path
+breaking ties."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable
+
+from file_list import SortKey
+from folder_index import IndexEntry, entry_kind
+
+# Order name -> label
+SORT_ORDERS = {
+    "name": "Name",
+    "taken": "Capture time",
+    "pixels": "Pixel count",
+    "size": "File size",
+    "mtime": "Modified",
+}
+
+# Filter name -> label
+FILTERS = {
+    "all": "All files",
+    "images": "Images",
+    "videos": "Videos",
+    "small": "Images < 1 MP",
+    "large": "Images ≥ 1 MP",
+}
+
+_MEGAPIXEL = 1_000_000
+
+
+def _value(order: str, entry: IndexEntry | None) -> int | None:
+    if entry is None:
+        return None
+    if order == "taken":
+        return entry.taken
+    if order == "pixels":
+        return None if entry.width is None else entry.width * (entry.height or 0)
+    if order == "size":
+        return entry.size
+    return entry.mtime_ns
+
+
+def _name_key(name: str) -> tuple[str, str]:
+    return (os.path.basename(name), name)
+
+
+class FileOrder:
+    """The active sort order and filter, plus the metadata they are evaluated on."""
+
+    def __init__(self, order: str = "name", file_filter: str = "all") -> None:
+        self.order = order
+        self.filter = file_filter
+        self.metadata: dict[str, IndexEntry] = {}
+        # True while source folders add absolute paths to the list
+        self.has_paths = False
+
+    def uses_metadata(self) -> bool:
+        return self.order != "name" or self.filter in ("small", "large")
+
+    @property
+    def key(self) -> SortKey | None:
+        """Sort key for the file_list helpers; None when sorting top-level names by name."""
+        if self.order != "name":
+            return self._key
+        return _name_key if self.has_paths else None
+
+    def _key(self, name: str) -> tuple[bool, int, str, str]:
+        value = _value(self.order, self.metadata.get(name))
+        return (value is None, value or 0, *_name_key(name))
+
+    def accepts(self, name: str) -> bool:
+        if self.filter == "all":
+            return True
+        entry = self.metadata.get(name)
+        kind = entry.kind if entry is not None else entry_kind(name)
+        if self.filter == "videos":
+            return kind == "video"
+        if kind != "image":
+            return False
+        if self.filter == "images":
+            return True
+        # Images are only sorted into a size class once they have been probed
+        pixels = _value("pixels", entry)
+        if pixels is None:
+            return False
+        return pixels < _MEGAPIXEL if self.filter == "small" else pixels >= _MEGAPIXEL
+
+    def arrange(self, names: Iterable[str]) -> tuple[list[str], list[str]]:
+        """Splits names into (shown files in sort order, names the filter hides)."""
+        shown: list[str] = []
+        hidden: list[str] = []
+        for name in names:
+            (shown if self.accepts(name) else hidden).append(name)
+        shown.sort(key=self.key)
+        return shown, hidden
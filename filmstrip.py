@@ -0,0 +1,163 @@
+"""File list views: a strip of names under the media view and a thumbnail grid.
+
+Both navigate and select several files at once."""
+
+from __future__ import annotations
+
+from PyQt6.QtCore import (
+    QAbstractListModel,
+    QItemSelection,
+    QItemSelectionModel,
+    QModelIndex,
+    QObject,
+    QSize,
+    Qt,
+    pyqtSignal,
+)
+from PyQt6.QtWidgets import QAbstractItemView, QListView, QWidget
+
+from constants import THUMBNAIL_SIZE
+from file_list import SortKey, index_of
+from thumbnails import ThumbnailLoader
+
+_ITEM_WIDTH = 140
+_ITEM_HEIGHT = 24
+
+
+class FileListModel(QAbstractListModel):
+    """Read-only view of the window's sorted file list; rows are created lazily by the view.
+
+    key is the sort key the list is ordered by, None for plain names.
+
+    With a ThumbnailLoader, rows also carry thumbnails. They are requested only
+    when the view asks for a row's data, i.e. when the row is painted."""
+
+    def __init__(self, thumbnails: ThumbnailLoader | None = None, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._files: list[str] = []
+        self.key: SortKey | None = None
+        self._thumbnails = thumbnails
+        if thumbnails is not None:
+            thumbnails.thumbnail_ready.connect(self._on_thumbnail_ready)
+
+    def files(self) -> list[str]:
+        return self._files
+
+    def set_files(self, files: list[str], key: SortKey | None = None) -> None:
+        self.beginResetModel()
+        self._files = files
+        self.key = key
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: B008
+        return 0 if parent.isValid() else len(self._files)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> str | None:
+        if not index.isValid() or index.row() >= len(self._files):
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return self._files[index.row()]
+        if role == Qt.ItemDataRole.DecorationRole and self._thumbnails is not None:
+            return self._thumbnails.get(self._files[index.row()])
+        return None
+
+    def _on_thumbnail_ready(self, name: str) -> None:
+        row = index_of(self._files, name, self.key)
+        if row >= 0:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+
+class Filmstrip(QListView):
+    """Shows every file in one row; click to jump, Ctrl/Shift+click to select several.
+
+    The selection is kept by name, so it survives files being merged in or
+    removed while a scan or the folder watcher is running."""
+
+    # Row the user clicked, to become the file on screen
+    row_activated = pyqtSignal(int)
+
+    def __init__(self, parent: QWidget | None = None, thumbnails: ThumbnailLoader | None = None) -> None:
+        super().__init__(parent)
+        self._model = FileListModel(thumbnails, self)
+        self._length = 0
+        self._syncing = False
+        self.setModel(self._model)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(500)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setTextElideMode(Qt.TextElideMode.ElideMiddle)
+        # Arrow keys stay with the window's shortcuts
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.selectionModel().currentChanged.connect(self._on_current_changed)
+        self._setup_layout()
+
+    def _setup_layout(self) -> None:
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setWrapping(False)
+        self.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setGridSize(QSize(_ITEM_WIDTH, _ITEM_HEIGHT))
+        self.setFixedHeight(_ITEM_HEIGHT + self.horizontalScrollBar().sizeHint().height() + 2 * self.frameWidth())
+
+    def sync(self, files: list[str], current: int, key: SortKey | None = None) -> None:
+        """Shows files, sorted by key, with files[current] highlighted; the model is only rebuilt when the list changed."""
+        self._syncing = True
+        try:
+            if files is not self._model.files() or len(files) != self._length:
+                selected = self.selected_names()
+                self._model.set_files(files, key)
+                self._length = len(files)
+                self._select_names(selected)
+            if 0 <= current < len(files):
+                index = self._model.index(current)
+                self.selectionModel().setCurrentIndex(index, QItemSelectionModel.SelectionFlag.NoUpdate)
+                self.scrollTo(index)
+        finally:
+            self._syncing = False
+
+    def selected_names(self) -> list[str]:
+        files = self._model.files()
+        rows = sorted(index.row() for index in self.selectionModel().selectedIndexes())
+        return [files[row] for row in rows if row < len(files)]
+
+    def select_range(self, first: int, last: int) -> None:
+        """Replaces the selection with rows first..last in either order."""
+        first, last = min(first, last), max(first, last)
+        selection = QItemSelection(self._model.index(first), self._model.index(last))
+        self.selectionModel().select(selection, QItemSelectionModel.SelectionFlag.ClearAndSelect)
+
+    def clear_selection(self) -> None:
+        self.selectionModel().clearSelection()
+
+    def _select_names(self, names: list[str]) -> None:
+        files = self._model.files()
+        selection = QItemSelection()
+        for name in names:
+            row = index_of(files, name, self._model.key)
+            if row >= 0:
+                index = self._model.index(row)
+                selection.select(index, index)
+        if not selection.isEmpty():
+            self.selectionModel().select(selection, QItemSelectionModel.SelectionFlag.Select)
+
+    def _on_current_changed(self, current: QModelIndex, previous: QModelIndex) -> None:
+        if not self._syncing and current.isValid():
+            self.row_activated.emit(current.row())
+
+
+class ThumbnailGrid(Filmstrip):
+    """Wrapping grid of thumbnails for surveying a whole folder.
+
+    Uniform item sizes let the view place any of 100k rows without measuring
+    them, and only painted rows ever ask for a thumbnail."""
+
+    def _setup_layout(self) -> None:
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setMovement(QListView.Movement.Static)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setWrapping(True)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        self.setGridSize(QSize(THUMBNAIL_SIZE + 24, THUMBNAIL_SIZE + 32))
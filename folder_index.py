@@ -0,0 +1,194 @@
+"""Persistent SQLite index of scanned folders (no Qt dependencies).
+
+The index lets a folder that was opened before be shown straight from disk
+cache while a background rescan validates it. The directory mtime is the
+invalidation key: when it still matches, the stored listing is current."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from constants import IMAGE_FORMATS, VIDEO_FORMATS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    folder_id INTEGER NOT NULL REFERENCES folders(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    mtime_ns INTEGER NOT NULL DEFAULT 0,
+    width INTEGER,
+    height INTEGER,
+    taken INTEGER,
+    PRIMARY KEY (folder_id, name)
+) WITHOUT ROWID;
+"""
+
+
+def entry_kind(name: str, is_dir: bool = False) -> str:
+    """Returns "dir", "image", "video" or "other" for a directory entry."""
+    if is_dir:
+        return "dir"
+    ext = os.path.splitext(name)[1][1:].lower()
+    if ext in IMAGE_FORMATS:
+        return "image"
+    if ext in VIDEO_FORMATS:
+        return "video"
+    return "other"
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    name: str
+    kind: str
+    size: int = 0
+    mtime_ns: int = 0
+    # None until probed; 0x0 when the headers gave no dimensions
+    width: int | None = None
+    height: int | None = None
+    # EXIF or container capture time in seconds, when the file has one
+    taken: int | None = None
+
+
+@dataclass
+class IndexedFolder:
+    mtime_ns: int
+    files: list[str]
+    folders: list[str]
+
+
+def stat_entry(folder: Path, name: str, kind: str) -> IndexEntry | None:
+    """Builds an index entry from the file on disk, or None if it has gone."""
+    try:
+        st = os.stat(folder / name)
+    except OSError:
+        return None
+    return IndexEntry(name, kind, st.st_size, st.st_mtime_ns)
+
+
+class FolderIndex:
+    """Stores file names, sizes, mtimes, media kind, dimensions and capture times per source folder.
+
+    Every call opens its own connection, so one index can be used from any thread."""
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+            if "taken" not in columns:
+                # Indexes from before capture times were probed: probe every file again
+                conn.execute("ALTER TABLE entries ADD COLUMN taken INTEGER")
+                conn.execute("UPDATE entries SET width = NULL, height = NULL")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute("PRAGMA foreign_keys=ON")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _key(folder: Path) -> str:
+        return str(folder.resolve())
+
+    def _folder_id(self, conn: sqlite3.Connection, folder: Path) -> int | None:
+        row = conn.execute("SELECT id FROM folders WHERE path = ?", (self._key(folder),)).fetchone()
+        return row[0] if row else None
+
+    def load(self, folder: Path) -> IndexedFolder | None:
+        """Returns the stored listing of folder, sorted by name, or None if it was never indexed."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT id, mtime_ns FROM folders WHERE path = ?", (self._key(folder),)).fetchone()
+            if row is None:
+                return None
+            folder_id, mtime_ns = row
+            files: list[str] = []
+            folders: list[str] = []
+            for name, kind in conn.execute("SELECT name, kind FROM entries WHERE folder_id = ?", (folder_id,)):
+                if kind == "dir":
+                    folders.append(name)
+                elif kind in ("image", "video"):
+                    files.append(name)
+        files.sort()
+        folders.sort()
+        return IndexedFolder(mtime_ns, files, folders)
+
+    def entries(self, folder: Path) -> dict[str, IndexEntry]:
+        with self._connect() as conn:
+            folder_id = self._folder_id(conn, folder)
+            if folder_id is None:
+                return {}
+            rows = conn.execute(
+                "SELECT name, kind, size, mtime_ns, width, height, taken FROM entries WHERE folder_id = ?",
+                (folder_id,),
+            )
+            return {row[0]: IndexEntry(*row) for row in rows}
+
+    def update(
+        self,
+        folder: Path,
+        mtime_ns: int,
+        added: Iterable[IndexEntry],
+        removed: Iterable[str] = (),
+        replace: bool = False,
+    ) -> None:
+        """Applies a rescan diff; with replace=True the stored listing is dropped first."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO folders (path, mtime_ns) VALUES (?, ?) ON CONFLICT(path) DO UPDATE SET mtime_ns = excluded.mtime_ns",
+                (self._key(folder), mtime_ns),
+            )
+            folder_id = self._folder_id(conn, folder)
+            if replace:
+                conn.execute("DELETE FROM entries WHERE folder_id = ?", (folder_id,))
+            conn.executemany(
+                "DELETE FROM entries WHERE folder_id = ? AND name = ?", ((folder_id, name) for name in removed)
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (folder_id, name, kind, size, mtime_ns, width, height, taken) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((folder_id, e.name, e.kind, e.size, e.mtime_ns, e.width, e.height, e.taken) for e in added),
+            )
+
+    def unprobed(self, folder: Path, limit: int = 500) -> list[str]:
+        """Names of indexed images and videos whose headers have not been probed yet."""
+        with self._connect() as conn:
+            folder_id = self._folder_id(conn, folder)
+            if folder_id is None:
+                return []
+            rows = conn.execute(
+                "SELECT name FROM entries WHERE folder_id = ? AND kind IN ('image', 'video') AND width IS NULL LIMIT ?",
+                (folder_id, limit),
+            )
+            return [row[0] for row in rows]
+
+    def set_probed(self, folder: Path, probed: Iterable[tuple[str, int, int, int | None]]) -> None:
+        """Stores probed (name, width, height, capture time); unreadable files are stored as 0x0 so they are not re-probed."""
+        with self._connect() as conn:
+            folder_id = self._folder_id(conn, folder)
+            if folder_id is None:
+                return
+            conn.executemany(
+                "UPDATE entries SET width = ?, height = ?, taken = ? WHERE folder_id = ? AND name = ?",
+                ((width, height, taken, folder_id, name) for name, width, height, taken in probed),
+            )
+
+    def forget(self, folder: Path) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM folders WHERE path = ?", (self._key(folder),))
@@ -0,0 +1,125 @@
+"""Directory scanning helpers for the media sorter (no Qt dependencies)."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+from constants import MEDIA_FORMATS, SCAN_FIRST_BATCH, SCAN_MAX_BATCH
+
+
+def is_media_name(name: str) -> bool:
+    return os.path.splitext(name)[1][1:].lower() in MEDIA_FORMATS
+
+
+def iter_folder_batches(
+    folder: Path,
+    cancelled: Callable[[], bool] = lambda: False,
+    first_batch: int = SCAN_FIRST_BATCH,
+    max_batch: int = SCAN_MAX_BATCH,
+) -> Iterator[tuple[list[str], list[str], int]]:
+    """Yields (media files, subfolders, entries scanned so far) for the top level of folder.
+
+    Each batch is sorted. Batches start small and double up to max_batch, so
+    the first media file is reported quickly while large folders are still
+    merged in few steps. os.scandir answers is_dir()/is_file() from the
+    directory entry type, so no per-entry stat is needed on most filesystems."""
+    files: list[str] = []
+    folders: list[str] = []
+    scanned = 0
+    pending = 0
+    batch_size = first_batch
+    found_media = False
+
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if cancelled():
+                return
+            scanned += 1
+            pending += 1
+            try:
+                if entry.is_dir():
+                    folders.append(entry.name)
+                elif is_media_name(entry.name) and entry.is_file():
+                    files.append(entry.name)
+            except OSError:
+                continue
+
+            if pending >= batch_size or (files and not found_media):
+                found_media = found_media or bool(files)
+                yield sorted(files), sorted(folders), scanned
+                files, folders = [], []
+                if pending >= batch_size:
+                    batch_size = min(batch_size * 2, max_batch)
+                pending = 0
+
+    yield sorted(files), sorted(folders), scanned
+
+
+def distinct_roots(roots: list[Path]) -> list[Path]:
+    """Absolute roots without duplicates or roots that lie inside another root, in the given order."""
+    resolved: list[Path] = []
+    for root in roots:
+        path = Path(os.path.abspath(root))
+        if path not in resolved:
+            resolved.append(path)
+    return [root for root in resolved if not any(other in root.parents for other in resolved)]
+
+
+def iter_tree_batches(
+    root: Path,
+    skip: Callable[[str], bool] = lambda path: False,
+    cancelled: Callable[[], bool] = lambda: False,
+    first_batch: int = SCAN_FIRST_BATCH,
+    max_batch: int = SCAN_MAX_BATCH,
+) -> Iterator[tuple[list[str], int]]:
+    """Yields (media file paths, entries scanned so far) for the whole tree below root.
+
+    Directories are walked depth-first in name order with an explicit stack,
+    so memory grows with the depth and breadth of the tree, never with the
+    number of files: each batch is handed over and forgotten. Hidden
+    directories, symlinked directories, directories that cannot be read and
+    those skip() returns True for are left out. Paths are absolute when root
+    is, and each batch is sorted; batches grow as in iter_folder_batches."""
+    files: list[str] = []
+    scanned = 0
+    pending = 0
+    batch_size = first_batch
+    found_media = False
+    stack = [] if skip(str(root)) else [str(root)]
+
+    while stack:
+        directory = stack.pop()
+        subfolders: list[str] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if cancelled():
+                        return
+                    scanned += 1
+                    pending += 1
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not entry.name.startswith(".") and not skip(entry.path):
+                                subfolders.append(entry.path)
+                        elif is_media_name(entry.name) and entry.is_file():
+                            files.append(entry.path)
+                    except OSError:
+                        continue
+
+                    if pending >= batch_size or (files and not found_media):
+                        found_media = found_media or bool(files)
+                        yield sorted(files), scanned
+                        files = []
+                        if pending >= batch_size:
+                            batch_size = min(batch_size * 2, max_batch)
+                        pending = 0
+        except OSError:
+            if directory == str(root):
+                raise
+            continue
+        # Reversed, so that the first subfolder by name is walked next
+        stack.extend(sorted(subfolders, reverse=True))
+
+    yield sorted(files), scanned
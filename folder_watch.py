@@ -0,0 +1,109 @@
+"""Change feed for the source folder, built on QFileSystemWatcher."""
+
+from __future__ import annotations
+
+from functools import partial
+from pathlib import Path
+
+from PyQt6.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal
+
+from constants import WATCH_COALESCE_MS
+from folder_index import FolderIndex
+from workers import FolderListing
+
+
+class FolderWatcher(QObject):
+    """Reports the listing of the watched folder after it changes on disk.
+
+    Change notifications only say that the directory changed, so a burst of
+    them is coalesced into one background re-listing that starts at most
+    WATCH_COALESCE_MS after the first event. Events arriving while a listing
+    runs schedule exactly one more. The receiver diffs the reported listing
+    against its own state; listing_started marks the point from which its own
+    changes to the folder may not be reflected yet."""
+
+    listing_started = pyqtSignal()
+    listing_ready = pyqtSignal(object, object)
+    folder_lost = pyqtSignal()
+
+    def __init__(self, index: FolderIndex | None = None, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._index = index
+        self._folder: Path | None = None
+        self._job: FolderListing | None = None
+        self._dirty = False
+        self._paused = False
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(WATCH_COALESCE_MS)
+        self._timer.timeout.connect(self._start_listing)
+
+    def watch(self, folder: Path | None) -> bool:
+        """Switches to watching folder (or nothing); returns False if it cannot be watched."""
+        directories = self._watcher.directories()
+        if directories:
+            self._watcher.removePaths(directories)
+        self._cancel_job()
+        self._timer.stop()
+        self._dirty = False
+        self._folder = folder
+        if folder is None:
+            return True
+        return self._watcher.addPath(str(folder))
+
+    def pause(self) -> None:
+        """Holds change events back, e.g. while a full scan is delivering the same information."""
+        self._paused = True
+        self._timer.stop()
+
+    def resume(self) -> None:
+        self._paused = False
+        if self._dirty and self._job is None:
+            self._timer.start()
+
+    def _on_directory_changed(self, path: str) -> None:
+        if self._folder is None:
+            return
+        if not self._folder.is_dir():
+            self.watch(None)
+            self.folder_lost.emit()
+            return
+        self._dirty = True
+        if not self._paused and self._job is None and not self._timer.isActive():
+            self._timer.start()
+
+    def _start_listing(self) -> None:
+        if self._folder is None or self._paused or self._job is not None:
+            return
+        self._dirty = False
+        job = FolderListing(self._folder, self._index)
+        job.finished.connect(partial(self._on_listing, job))
+        job.failed.connect(partial(self._on_failed, job))
+        self._job = job
+        self.listing_started.emit()
+        job.start()
+
+    def _on_listing(self, job: FolderListing, files: set[str], folders: set[str]) -> None:
+        if job is not self._job:
+            return
+        self._job = None
+        self.listing_ready.emit(files, folders)
+        if self._dirty and not self._paused:
+            self._timer.start()
+
+    def _on_failed(self, job: FolderListing, message: str) -> None:
+        if job is not self._job:
+            return
+        self._job = None
+        if self._folder is not None and not self._folder.is_dir():
+            self.watch(None)
+            self.folder_lost.emit()
+
+    def _cancel_job(self) -> None:
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
@@ -0,0 +1,218 @@
+"""Perceptual hashes for finding duplicate images, with a fast Hamming-distance lookup (no Qt dependencies).
+
+The difference hash (dHash) compares neighbouring pixels of a 9x8 grayscale
+thumbnail, which survives re-encoding, resizing and small edits. HashIndex
+answers "which hashes lie within n bits of this one" with multi-index
+hashing: the 64 bits are split into four 16-bit chunks, and any hash within
+n bits must match one chunk within n // 4 bits, so a query only compares
+against a few buckets instead of every stored hash."""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Hashable, Iterable, Iterator
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import combinations
+from pathlib import Path
+
+HASH_WIDTH = 9
+HASH_HEIGHT = 8
+
+_CHUNKS = 4
+_CHUNK_BITS = 16
+_CHUNK_MASK = (1 << _CHUNK_BITS) - 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    dhash INTEGER,
+    PRIMARY KEY (name, size, mtime_ns)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS signatures (
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    signature BLOB,
+    PRIMARY KEY (name, size, mtime_ns)
+) WITHOUT ROWID;
+"""
+
+# A file is identified by (name, size, mtime_ns), which survives moves between folders
+FileKey = tuple[str, int, int]
+
+
+def dhash_from_gray(pixels: bytes, stride: int) -> int:
+    """64-bit difference hash of a 9x8 grayscale image given as rows of stride bytes."""
+    value = 0
+    for y in range(HASH_HEIGHT):
+        row = pixels[y * stride : y * stride + HASH_WIDTH]
+        for x in range(HASH_WIDTH - 1):
+            value = (value << 1) | (row[x] > row[x + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _chunks(value: int) -> list[int]:
+    return [(value >> (i * _CHUNK_BITS)) & _CHUNK_MASK for i in range(_CHUNKS)]
+
+
+@lru_cache(maxsize=8)
+def _flip_masks(radius: int) -> tuple[int, ...]:
+    """XOR masks turning a chunk into every value within radius bits of it."""
+    masks = []
+    for distance in range(radius + 1):
+        for bits in combinations(range(_CHUNK_BITS), distance):
+            masks.append(sum(1 << bit for bit in bits))
+    return tuple(masks)
+
+
+class HashIndex:
+    """In-memory set of keyed 64-bit hashes searchable by Hamming distance."""
+
+    def __init__(self) -> None:
+        self._hashes: dict[Hashable, int] = {}
+        # Buckets hold (hash, key) so a query never has to look the hash up again
+        self._tables: list[dict[int, list[tuple[int, Hashable]]]] = [{} for _ in range(_CHUNKS)]
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def get(self, key: Hashable) -> int | None:
+        return self._hashes.get(key)
+
+    def add(self, key: Hashable, value: int) -> None:
+        if key in self._hashes:
+            self.remove(key)
+        self._hashes[key] = value
+        for table, chunk in zip(self._tables, _chunks(value), strict=True):
+            table.setdefault(chunk, []).append((value, key))
+
+    def remove(self, key: Hashable) -> None:
+        value = self._hashes.pop(key, None)
+        if value is None:
+            return
+        for table, chunk in zip(self._tables, _chunks(value), strict=True):
+            bucket = table[chunk]
+            bucket.remove((value, key))
+            if not bucket:
+                del table[chunk]
+
+    def move(self, old: Hashable, new: Hashable) -> None:
+        value = self._hashes.get(old)
+        if value is not None:
+            self.remove(old)
+            self.add(new, value)
+
+    def clear(self) -> None:
+        self._hashes.clear()
+        for table in self._tables:
+            table.clear()
+
+    def find(self, value: int, max_distance: int) -> list[tuple[int, Hashable]]:
+        """(distance, key) of every stored hash within max_distance bits of value, closest first."""
+        masks = _flip_masks(max_distance // _CHUNKS)
+        found: dict[Hashable, int] = {}
+        for table, chunk in zip(self._tables, _chunks(value), strict=True):
+            for mask in masks:
+                bucket = table.get(chunk ^ mask)
+                if bucket is None:
+                    continue
+                for other, key in bucket:
+                    distance = (value ^ other).bit_count()
+                    if distance <= max_distance:
+                        found[key] = distance
+        return sorted(((distance, key) for key, distance in found.items()), key=lambda item: item[0])
+
+
+def _to_signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+class HashStore:
+    """Persistent perceptual hashes and feature signatures; a stored None marks a file that could not be decoded.
+
+    Every call opens its own connection, so one store can be used from any thread."""
+
+    # Names per SELECT ... IN query, below SQLite's bound parameter limit
+    _LOOKUP_CHUNK = 500
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _select(self, table: str, column: str, files: Iterable[FileKey]) -> dict[FileKey, object]:
+        wanted = set(files)
+        names = sorted({name for name, _, _ in wanted})
+        found: dict[FileKey, object] = {}
+        with self._connect() as conn:
+            for start in range(0, len(names), self._LOOKUP_CHUNK):
+                chunk = names[start : start + self._LOOKUP_CHUNK]
+                rows = conn.execute(
+                    f"SELECT name, size, mtime_ns, {column} FROM {table} WHERE name IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for name, size, mtime_ns, value in rows:
+                    key = (name, size, mtime_ns)
+                    if key in wanted:
+                        found[key] = value
+        return found
+
+    def lookup(self, files: Iterable[FileKey]) -> dict[FileKey, int | None]:
+        """Stored hashes of the given files; files never hashed are missing from the result."""
+        found = self._select("hashes", "dhash", files)
+        return {key: None if value is None else _to_unsigned(value) for key, value in found.items()}
+
+    def store(self, hashes: Iterable[tuple[str, int, int, int | None]]) -> None:
+        """Saves (name, size, mtime_ns, hash or None) rows."""
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO hashes (name, size, mtime_ns, dhash) VALUES (?, ?, ?, ?)",
+                (
+                    (name, size, mtime, None if value is None else _to_signed(value))
+                    for name, size, mtime, value in hashes
+                ),
+            )
+
+    def lookup_signatures(self, files: Iterable[FileKey]) -> dict[FileKey, int | None]:
+        """Stored feature signatures of the given files, like lookup()."""
+        found = self._select("signatures", "signature", files)
+        return {key: None if value is None else int.from_bytes(value, "little") for key, value in found.items()}
+
+    def store_signatures(self, signatures: Iterable[tuple[str, int, int, int | None]]) -> None:
+        """Saves (name, size, mtime_ns, signature or None) rows."""
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO signatures (name, size, mtime_ns, signature) VALUES (?, ?, ?, ?)",
+                (
+                    (
+                        name,
+                        size,
+                        mtime,
+                        None if value is None else value.to_bytes((value.bit_length() + 7) // 8, "little"),
+                    )
+                    for name, size, mtime, value in signatures
+                ),
+            )
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import argparse
+import json
+import math
+import multiprocessing
 import os
+import sqlite3
 import sys
+import time
 from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 if sys.platform == "win32":
     os.environ["QT_MEDIA_BACKEND"] = "windows"
@@ -13,19 +20,76 @@ elif sys.platform == "linux":
     os.environ["QT_MEDIA_BACKEND"] = "gstreamer"
 
 from PyQt6 import QtGui, QtWidgets
-from PyQt6.QtCore import Qt, QTimer, QUrl
-from PyQt6.QtGui import QCloseEvent, QIcon, QKeySequence, QResizeEvent, QShortcut
-from PyQt6.QtMultimedia import QAudioOutput, QMediaMetaData, QMediaPlayer
-from PyQt6.QtMultimediaWidgets import QVideoWidget
+from PyQt6.QtCore import (
+    QEvent,
+    QModelIndex,
+    QObject,
+    QPointF,
+    QSettings,
+    QSize,
+    QStandardPaths,
+    Qt,
+    QTimer,
+    pyqtSignal,
+)
+from PyQt6.QtGui import (
+    QCloseEvent,
+    QIcon,
+    QKeyEvent,
+    QKeySequence,
+    QMouseEvent,
+    QResizeEvent,
+    QShortcut,
+    QWheelEvent,
+)
 from PyQt6.QtWidgets import QFileDialog, QMessageBox, QStackedWidget
 from send2trash import send2trash
 
-from constants import MAX_IMAGE_DIMENSION, MEDIA_FORMATS, VIDEO_FORMATS
+from category_panel import CategoryPanel
+from constants import (
+    CACHE_DIR_NAME,
+    DECODE_SIZE_STEP,
+    DUPLICATE_MAX_DISTANCE,
+    METADATA_RESORT_MS,
+    POSTER_CACHE_SIZE,
+    POSTER_SIZE,
+    PREFETCH_AHEAD,
+    PREVIEW_DISK_CACHE_BYTES,
+    SCRUB_SETTLE_MS,
+    STARTUP_REPORT_TIMEOUT_MS,
+    SUGGEST_COUNT,
+    SUGGEST_REFRESH_MS,
+    VIDEO_AUTOPLAY,
+    VIDEO_FORMATS,
+    VIEWPORT_DECODE,
+)
+from feature_index import CategoryIndex
+from file_list import diff_listing, index_of, merge_sorted, position, remove_names, remove_selection
+from file_order import FILTERS, SORT_ORDERS, FileOrder
+from filmstrip import Filmstrip, ThumbnailGrid
+from folder_index import FolderIndex, IndexEntry
+from folder_watch import FolderWatcher
+from image_hash import HashIndex, HashStore
 from main_window import Ui_mainWindow
+from media_loader import ImagePrefetcher, ImagePyramid
+from move_queue import MoveQueue
+from preview_cache import PreviewCache
 from themes.theme_manager import ThemeManager
+from thumbnails import ThumbnailLoader
+from tile_viewer import TileViewer
+from tracing import tracer
+from video_deck import VideoDeck
+from workers import CategoryRestore, DuplicateScan, FeatureScan, FolderScan, SourceScan, TrashJob
+
+if TYPE_CHECKING:
+    # QtMultimedia is imported by VideoDeck once the first video is shown
+    from PyQt6.QtMultimedia import QMediaPlayer
 
 
 class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
+    # Name of a file once it is on screen at full quality (or, for videos, playing)
+    media_shown = pyqtSignal(str)
+
     def __init__(self) -> None:
         super().__init__()
         self.setupUi(self)
@@ -34,11 +98,64 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         self.files: list[str] = []
         self.curr_file: int = 0
         self.image_loaded: bool = False
-        self.original_pixmap: QtGui.QPixmap | None = None
+        self.image_pending: bool = False
+        self.image_pyramid: ImagePyramid | None = None
         self.media_path: Path | None = None
         self.media_type: str | None = None
         self.cats_visible: bool = False
         self.video_resolution: QtGui.QSize | None = None
+        self.scan_progress: int | None = None
+        self._scan: FolderScan | None = None
+        # Extra folders walked recursively; their files are listed by absolute path, which folder / name keeps
+        self.sources: list[Path] = []
+        self._source_scan: SourceScan | None = None
+        self.source_progress: int | None = None
+        # Unreadable source roots of the running scan
+        self._source_failures: list[str] = []
+        self._scan_follows_first: bool = False
+        self._restore: CategoryRestore | None = None
+        self.restore_progress: tuple[int, int] | None = None
+        # Cull mode: Delete marks files, which are trashed together when the session ends
+        self.cull_mode: bool = False
+        self._culled: list[str] = []
+        self._trash_jobs: dict[TrashJob, int] = {}
+        self._trash_failures: list[str] = []
+        self._close_after_trash: bool = False
+        self.grid_mode: bool = False
+        # Poster mode (autoplay off): videos show a cached frame until Space or a click starts them
+        self.video_autoplay: bool = VIDEO_AUTOPLAY
+        # Where a Shift+arrow selection started
+        self._selection_anchor: str | None = None
+        # Names this app changed on disk since the folder watcher's current listing started
+        self._touched_names: set[str] = set()
+        # Perceptual hashes of the folder ("", name) and its categories (category, name)
+        self.duplicates = HashIndex()
+        self._hash_scan: DuplicateScan | None = None
+        # Feature signatures keyed the same way, for suggesting categories
+        self.suggestions = CategoryIndex()
+        self._feature_scan: FeatureScan | None = None
+        self._suggested: list[str] = []
+        # Suggestions per file name, valid while the sorted examples are at _rankings_version
+        self._rankings: dict[str, list[str]] = {}
+        self._rankings_version = -1
+        # Signature batches re-rank the current file at most once per interval
+        self._suggest_timer = QTimer()
+        self._suggest_timer.setSingleShot(True)
+        self._suggest_timer.setInterval(SUGGEST_REFRESH_MS)
+        self._suggest_timer.timeout.connect(self._on_suggest_timer)
+        # Sort order and filter of the file list; files the filter hides wait in _filtered_out
+        self.order = FileOrder()
+        self._filtered_out: set[str] = set()
+        # Probed metadata is applied in bursts, re-sorting the list at most once per interval
+        self._pending_metadata: list[IndexEntry] = []
+        self._order_timer = QTimer()
+        self._order_timer.setSingleShot(True)
+        self._order_timer.setInterval(METADATA_RESORT_MS)
+        self._order_timer.timeout.connect(self._on_order_timer)
+        # Starts of spans that end in a later event, while tracing
+        self._load_started: int | None = None
+        self._video_started: int | None = None
+        self._scan_started: int | None = None
 
         self.folderPathSelectorButton.clicked.connect(self.select_folder)
         self.nextButton.clicked.connect(self.next_image)
@@ -48,9 +165,24 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
 
         QShortcut(QKeySequence(Qt.Key.Key_Right), self, self.next_image)
         QShortcut(QKeySequence(Qt.Key.Key_Left), self, self.prev_image)
+        QShortcut(QKeySequence("Shift+Right"), self, partial(self.extend_selection, 1))
+        QShortcut(QKeySequence("Shift+Left"), self, partial(self.extend_selection, -1))
         QShortcut(QKeySequence("Ctrl+O"), self, self.select_folder)
+        QShortcut(QKeySequence("Ctrl+Shift+O"), self, self.add_source)
+        QShortcut(QKeySequence("Ctrl+Shift+U"), self, self.clear_sources)
         QShortcut(QKeySequence(Qt.Key.Key_Space), self, self._toggle_playback)
         QShortcut(QKeySequence(Qt.Key.Key_Delete), self, self.delete_file)
+        QShortcut(QKeySequence(Qt.Key.Key_Escape), self, self._on_escape)
+        QShortcut(QKeySequence("Ctrl+1"), self, self.zoom_actual_size)
+        QShortcut(QKeySequence("Ctrl+0"), self, self.zoom_fit)
+        QShortcut(QKeySequence("Ctrl+K"), self, self.toggle_cull_mode)
+        QShortcut(QKeySequence("Ctrl+G"), self, self.toggle_grid_mode)
+        QShortcut(QKeySequence("Ctrl+P"), self, self.toggle_autoplay)
+        QShortcut(QKeySequence("Ctrl+D"), self, self.trash_duplicate)
+        QShortcut(QKeySequence("Ctrl+Z"), self, self.unmark_last_culled)
+        QShortcut(QKeySequence("Ctrl+Shift+Delete"), self, self.flush_culled)
+        QShortcut(QKeySequence("Ctrl+T"), self, self.toggle_tracing)
+        QShortcut(QKeySequence("Ctrl+Shift+T"), self, self.export_trace)
 
         app_dir = Path(__file__).parent
         self.setWindowIcon(QIcon(str(app_dir / "app_icon.ico")))
@@ -75,18 +207,29 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
 
         self.verticalLayout.addWidget(self.mediaStack)
 
-        # Persistent media player
-        self.mediaPlayer = QMediaPlayer()
-        self.audioOutput = QAudioOutput()
-        self.mediaPlayer.setAudioOutput(self.audioOutput)
-        self.mediaPlayer.setVideoOutput(self.videoWidget)
-
-        self.seekSlider.sliderMoved.connect(self.mediaPlayer.setPosition)
-        self.mediaPlayer.playbackStateChanged.connect(self._on_playback_state_changed)
-        self.mediaPlayer.durationChanged.connect(self._on_duration_changed)
-        self.mediaPlayer.positionChanged.connect(self._on_position_changed)
-        self.mediaPlayer.errorOccurred.connect(self._on_player_error)
-        self.mediaPlayer.metaDataChanged.connect(self._on_metadata_changed)
+        self.thumbnails = ThumbnailLoader(self.thumbnail_dir(), parent=self)
+        self.posters = ThumbnailLoader(self.thumbnail_dir(), POSTER_SIZE, POSTER_CACHE_SIZE, self)
+        self.posters.thumbnail_ready.connect(self._on_poster_ready)
+        self.grid = ThumbnailGrid(thumbnails=self.thumbnails)
+        self.grid.row_activated.connect(self._on_filmstrip_row)
+        self.grid.doubleClicked.connect(self._on_grid_open)
+        self.mediaStack.addWidget(self.grid)  # page 2: thumbnail grid
+
+        self.tile_viewer = TileViewer()
+        self.tile_viewer.exit_requested.connect(self.zoom_fit)
+        self.mediaStack.addWidget(self.tile_viewer)  # page 3: zoomed image
+        self.imageLabel.installEventFilter(self)
+
+        self.filmstrip = Filmstrip(self.scrollAreaWidgetContents)
+        self.filmstrip.row_activated.connect(self._on_filmstrip_row)
+        self.verticalLayout.addWidget(self.filmstrip)
+
+        self.seekSlider.sliderMoved.connect(self.video.set_position)
+        self.video.playbackStateChanged.connect(self._on_playback_state_changed)
+        self.video.durationChanged.connect(self._on_duration_changed)
+        self.video.positionChanged.connect(self._on_position_changed)
+        self.video.errorOccurred.connect(self._on_player_error)
+        self.video.metaDataChanged.connect(self._on_metadata_changed)
 
         self.prevButton.setEnabled(False)
         self.nextButton.setEnabled(False)
@@ -94,7 +237,33 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         self._resize_timer = QTimer()
         self._resize_timer.setSingleShot(True)
         self._resize_timer.setInterval(50)
-        self._resize_timer.timeout.connect(self._scale_image)
+        self._resize_timer.timeout.connect(self._on_resize_settled)
+
+        self.folder_index = self._open_folder_index()
+        self.hash_store = self._open_hash_store()
+
+        self.folder_watcher = FolderWatcher(self.folder_index, self)
+        self.folder_watcher.listing_started.connect(self._touched_names.clear)
+        self.folder_watcher.listing_ready.connect(self._on_folder_listing)
+        self.folder_watcher.folder_lost.connect(self._on_folder_lost)
+
+        self.move_queue = MoveQueue(parent=self)
+        self.move_queue.moved.connect(self._on_file_moved)
+        self.move_queue.failed.connect(self._on_move_failed)
+        self.move_queue.progress.connect(self._on_move_progress)
+        self.move_queue.drained.connect(self._start_restore)
+        self._move_failures: list[str] = []
+
+        preview_cache = PreviewCache(self.cache_dir() / "previews", PREVIEW_DISK_CACHE_BYTES)
+        self.prefetcher = ImagePrefetcher(parent=self, preview_cache=preview_cache)
+        self.prefetcher.image_ready.connect(self._on_image_ready)
+        self.prefetcher.preview_ready.connect(self._on_preview_ready)
+
+        # Navigation arriving faster than this is treated as scrubbing
+        self._scrub_timer = QTimer()
+        self._scrub_timer.setSingleShot(True)
+        self._scrub_timer.setInterval(SCRUB_SETTLE_MS)
+        self._scrub_timer.timeout.connect(self._on_scrub_settled)
 
         self.folderPathSelectorButton.setToolTip("Select a folder of media files to sort (Ctrl+O)")
         self.prevButton.setToolTip("Previous file (Left arrow)")
@@ -103,17 +272,67 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         self.delCatButton.setToolTip("Delete the selected category")
         self.deleteFileButton.setToolTip("Delete current file (Delete key)")
 
+        self._setup_order_controls()
+        self.categoryPanel = CategoryPanel()
+        self.categoryPanel.category_chosen.connect(self.move_to_category)
+        self.buttonsGridLayout.addWidget(self.categoryPanel, 0, 0)
+        # Latency overlay, shown while tracing
+        self.traceLabel = QtWidgets.QLabel()
+        self.traceLabel.setObjectName("traceLabel")
+        self.traceLabel.setVisible(False)
+        self.statusbar.addPermanentWidget(self.traceLabel)
         self.toggle_categories()
         self.update_status_bar()
 
+    @staticmethod
+    def cache_dir() -> Path:
+        location = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation)
+        return Path(location) / CACHE_DIR_NAME
+
+    @staticmethod
+    def thumbnail_dir() -> Path:
+        """The freedesktop thumbnail directory, shared with file managers"""
+        location = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation)
+        return Path(location) / "thumbnails"
+
+    def _open_folder_index(self) -> FolderIndex | None:
+        """Opens the on-disk folder index; folders are simply rescanned if it is unavailable"""
+        try:
+            return FolderIndex(self.cache_dir() / "folder_index.sqlite3")
+        except (OSError, sqlite3.Error):
+            return None
+
+    def _open_hash_store(self) -> HashStore | None:
+        """Opens the on-disk perceptual hash store; without it every image is hashed again"""
+        try:
+            return HashStore(self.cache_dir() / "hashes.sqlite3")
+        except (OSError, sqlite3.Error):
+            return None
+
+    def _setup_order_controls(self) -> None:
+        self.sortComboBox = QtWidgets.QComboBox()
+        for order, label in SORT_ORDERS.items():
+            self.sortComboBox.addItem(label, order)
+        self.sortComboBox.setToolTip("Sort files by")
+        self.sortComboBox.currentIndexChanged.connect(self._on_sort_order_selected)
+        self.filterComboBox = QtWidgets.QComboBox()
+        for file_filter, label in FILTERS.items():
+            self.filterComboBox.addItem(label, file_filter)
+        self.filterComboBox.setToolTip("Show only these files")
+        self.filterComboBox.currentIndexChanged.connect(self._on_filter_selected)
+        # After the Delete button
+        self.horizontalLayout.insertWidget(4, self.sortComboBox)
+        self.horizontalLayout.insertWidget(5, self.filterComboBox)
+
     def _setup_video_container(self) -> None:
         self.videoContainer = QtWidgets.QWidget()
         layout = QtWidgets.QVBoxLayout(self.videoContainer)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
 
-        self.videoWidget = QVideoWidget()
-        layout.addWidget(self.videoWidget, stretch=1)
+        # Persistent media players, created for the first video; the second one pre-rolls the next video
+        self.video = VideoDeck(self)
+        layout.addWidget(self.video.widget, stretch=1)
 
         self.videoControlsWidget = QtWidgets.QWidget()
         self.videoControlsWidget.setObjectName("videoControlsWidget")
@@ -145,37 +364,47 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         layout.addWidget(self.videoControlsWidget)
 
     def _toggle_playback(self) -> None:
-        if self.mediaPlayer.playbackState() == QMediaPlayer.PlaybackState.PlayingState:
-            self.mediaPlayer.pause()
-        elif self.mediaPlayer.source().isValid():
-            self.mediaPlayer.play()
+        if self.video.is_playing():
+            self.video.pause()
+        elif self.video.source().isValid():
+            self.video.resume()
+        elif self.media_type == "video" and self.files and not self.grid_mode:
+            self._play_video()
 
     def _toggle_mute(self) -> None:
         muted = self.muteButton.isChecked()
-        self.audioOutput.setMuted(muted)
+        self.video.set_muted(muted)
         self.muteButton.setText("\U0001f507" if muted else "\U0001f50a")
 
     def _on_playback_state_changed(self, state: QMediaPlayer.PlaybackState) -> None:
-        if state == QMediaPlayer.PlaybackState.PlayingState:
+        tracer.instant("player_state", state=state.name)
+        if self.video.is_playing():
             self.playPauseButton.setText("\u23f8")
+            if self._video_started is not None:
+                tracer.finish("video_start", self._video_started, file=self.media_path.name)
+                self._video_started = None
+                self._update_trace_overlay()
+            self.media_shown.emit(self.media_path.name)
         else:
             self.playPauseButton.setText("\u25b6")
 
     def _on_duration_changed(self, duration: int) -> None:
         self.seekSlider.setRange(0, duration)
-        self._update_time_label(self.mediaPlayer.position(), duration)
+        self._update_time_label(self.video.position(), duration)
 
     def _on_position_changed(self, position: int) -> None:
         self.seekSlider.setValue(position)
-        self._update_time_label(position, self.mediaPlayer.duration())
+        self._update_time_label(position, self.video.duration())
 
     def _on_metadata_changed(self) -> None:
-        resolution = self.mediaPlayer.metaData().value(QMediaMetaData.Key.Resolution)
-        if resolution and resolution.isValid():
+        resolution = self.video.resolution()
+        if resolution is not None:
             self.video_resolution = resolution
             self.update_status_bar()
 
     def _on_player_error(self, error: QMediaPlayer.Error, message: str) -> None:
+        tracer.instant("player_error", error=error.name, message=message)
+        self._video_started = None
         self._stop_video()
         self.mediaStack.setCurrentWidget(self.imageLabel)
         file_name = self.media_path.name if self.media_path else "unknown"
@@ -192,13 +421,78 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         return Path(filename).suffix.lower().lstrip(".") in VIDEO_FORMATS
 
     def _stop_video(self) -> None:
-        self.mediaPlayer.stop()
-        self.mediaPlayer.setSource(QUrl())
+        self.video.stop()
 
     def _play_video(self) -> None:
+        self.image_pyramid = None
+        self.image_loaded = False
         self.mediaStack.setCurrentWidget(self.videoContainer)
-        self.mediaPlayer.setSource(QUrl.fromLocalFile(str(self.media_path)))
-        self.mediaPlayer.play()
+        # Ends when the player reports that it is playing
+        self._video_started = tracer.start()
+        with tracer.span("video_play", file=self.media_path.name):
+            self.video.play(self.media_path)
+        self.update_status_bar()
+
+    def _open_video(self) -> None:
+        if self.video_autoplay:
+            self._play_video()
+        else:
+            self._show_poster()
+
+    def _show_poster(self) -> None:
+        """Shows the cached poster frame of the current video without opening a playback pipeline"""
+        self.mediaStack.setCurrentWidget(self.imageLabel)
+        pixmap = self.posters.get(self.files[self.curr_file])
+        if pixmap is None:
+            self.image_pyramid = None
+            self.image_loaded = False
+            self.imageLabel.clear()
+            self.imageLabel.setText(f"{self.media_path.name}\nPress Space to play")
+            return
+        image = pixmap.toImage()
+        self.image_pyramid = ImagePyramid.build(image, image.size())
+        self._scale_image()
+        self.image_loaded = True
+        self.media_shown.emit(self.media_path.name)
+
+    def _on_poster_ready(self, name: str) -> None:
+        if (
+            self.media_type == "video"
+            and not self.video_autoplay
+            and not self._scrub_timer.isActive()
+            and self.files
+            and self.files[self.curr_file] == name
+            and self.mediaStack.currentWidget() is self.imageLabel
+        ):
+            self._show_poster()
+
+    def _prefetch_videos(self) -> None:
+        """Pre-rolls the next video, or in poster mode queues the posters of the next few"""
+        if self.video_autoplay:
+            self.video.preload(self._next_video())
+            return
+        for name in self.files[self.curr_file + 1 : self.curr_file + 1 + PREFETCH_AHEAD]:
+            if self._is_video(name):
+                self.posters.get(name)
+
+    def toggle_autoplay(self) -> None:
+        """Switches between playing videos on arrival and showing their poster frame first"""
+        self.video_autoplay = not self.video_autoplay
+        self.statusbar.showMessage(f"Video autoplay {'on' if self.video_autoplay else 'off'}", 1500)
+        if not self.video_autoplay:
+            self.video.release()
+        if self.files and self.media_type == "video" and not self.grid_mode:
+            self._stop_video()
+            self._open_video()
+        self._prefetch_videos()
+        self.update_status_bar()
+
+    def _next_video(self) -> Path | None:
+        """The first video among the next PREFETCH_AHEAD files; the one worth pre-rolling"""
+        for name in self.files[self.curr_file + 1 : self.curr_file + 1 + PREFETCH_AHEAD]:
+            if self._is_video(name):
+                return self.folder / name
+        return None
 
     def toggle_categories(self, visible: bool = False) -> None:
         self.cats_visible = visible
@@ -210,6 +504,9 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
     def update_status_bar(self) -> None:
         if len(self.files) == 0:
             status_text = ""
+        elif self.grid_mode:
+            file_name = self.files[self.curr_file]
+            status_text = f"File: {self.curr_file + 1} of {len(self.files)} | File: {file_name} | Grid (Ctrl+G)"
         elif self.media_type == "video":
             file_name = self.media_path.name
             if self.video_resolution and self.video_resolution.isValid():
@@ -217,66 +514,216 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
             else:
                 res = "Video"
             status_text = f"File: {self.curr_file + 1} of {len(self.files)} | File: {file_name} | {res}"
-        elif self.original_pixmap is None:
+            if not self.video_autoplay and not self.video.source().isValid():
+                status_text += " | Space to play"
+        elif self.image_pending:
+            file_name = self.media_path.name
+            status_text = f"File: {self.curr_file + 1} of {len(self.files)} | File: {file_name} | Loading..."
+        elif self.image_pyramid is None:
             file_name = self.media_path.name
             status_text = f"File: {self.curr_file + 1} of {len(self.files)} | File: {file_name} | Invalid image"
         else:
             file_name = self.media_path.name
-            orig_width = self.original_pixmap.width()
-            orig_height = self.original_pixmap.height()
+            orig_width = self.image_pyramid.source_size.width()
+            orig_height = self.image_pyramid.source_size.height()
             status_text = f"File: {self.curr_file + 1} of {len(self.files)} | File: {file_name} | Orig: {orig_width}x{orig_height}"
+        duplicate = self._sorted_duplicate() if self.files and not self.grid_mode else None
+        if duplicate is not None:
+            distance, match = duplicate
+            status_text += f" | {'Duplicate' if distance == 0 else 'Near-duplicate'} of {match} (Ctrl+D to trash)"
+        if self._filtered_out:
+            hidden = f"{len(self._filtered_out)} hidden by filter"
+            status_text = f"{status_text} | {hidden}" if status_text else hidden
+        if self.scan_progress is not None:
+            scanning = f"Scanning... {self.scan_progress} entries"
+            status_text = f"{status_text} | {scanning}" if status_text else scanning
+        if self.source_progress is not None:
+            scanning = f"Scanning {len(self.sources)} source folder(s)... {self.source_progress} entries"
+            status_text = f"{status_text} | {scanning}" if status_text else scanning
+        if self.move_queue.pending():
+            moving = f"Moving {self.move_queue.pending()} file(s)..."
+            copying = self.move_queue.copying()
+            if copying is not None:
+                source, done, total = copying
+                moving = f"{moving} {source.name} {done * 100 // max(total, 1)}%"
+            status_text = f"{status_text} | {moving}" if status_text else moving
+        if self.cull_mode or self._culled:
+            culling = f"Cull mode: {len(self._culled)} marked (Ctrl+Z to unmark)"
+            status_text = f"{status_text} | {culling}" if status_text else culling
+        if self._trash_jobs:
+            trashing = f"Deleting {sum(self._trash_jobs.values())} file(s)..."
+            status_text = f"{status_text} | {trashing}" if status_text else trashing
+        if self._restore is not None:
+            if self.restore_progress is None:
+                restoring = f"Deleting {self._restore.category} once the moves are done (Esc to cancel)"
+            else:
+                done, total = self.restore_progress
+                restoring = f"Restoring {self._restore.category}... {done} of {total} (Esc to cancel)"
+            status_text = f"{status_text} | {restoring}" if status_text else restoring
         self.statusbar.showMessage(status_text)
 
-    def add_btns_for_categories(self) -> None:
-        """Adds buttons to the grid layout for each category"""
-        for i in range(self.buttonsGridLayout.count())[::-1]:
-            self.buttonsGridLayout.itemAt(i).widget().deleteLater()
-
-        button_width = 100
-        spacing = self.buttonsGridLayout.spacing() or 6
-        available_width = (
-            self.centralwidget.width()
-            - self.gridLayout.contentsMargins().left()
-            - self.gridLayout.contentsMargins().right()
-        )
-        cols = max(1, available_width // (button_width + spacing))
-
-        for idx, category in enumerate(self.folders):
-            row = idx // cols
-            col = idx % cols
-            button = QtWidgets.QPushButton(category)
-            button.setObjectName("categoryButton")
-            button.clicked.connect(partial(self.move_to_category, category))
-            button.setMinimumWidth(button_width)
-            button.setFixedHeight(35)
-            self.buttonsGridLayout.addWidget(button, row, col)
-
     def move_to_category(self, category: str) -> None:
-        """Moves current file to the given category"""
-        if len(self.files) == 0:
+        """Moves current file, or every selected file, to the given category.
+        The move runs in the background; the next file is shown immediately"""
+        with tracer.span("move_to_category"):
+            if len(self.files) == 0:
+                return
+            selection = self._file_view().selected_names()
+            if len(selection) > 1:
+                self._move_selection(category, selection)
+                return
+            if self.move_queue.is_full():
+                self.statusbar.showMessage("Still moving earlier files, please wait...", 2000)
+                return
+            if self._restore is not None and self._restore.category == category:
+                self.statusbar.showMessage(f"Category '{category}' is being deleted", 2000)
+                return
+
+            self._stop_video()
+            self._scan_follows_first = False
+
+            file_name = self.files[self.curr_file]
+
+            path_to_file = self.folder / file_name
+            # Files from source folders keep only their own name in the category
+            path_to_dest = self.folder / category / path_to_file.name
+            if os.path.lexists(path_to_dest):
+                self.statusbar.showMessage(f"{path_to_dest.name} already exists in {category}", 3000)
+                return
+            self.video.release({path_to_file})
+            self.move_queue.submit(path_to_file, path_to_dest)
+
+            self._touched_names.add(file_name)
+            self.files.pop(self.curr_file)
+            self.prefetcher.discard(file_name)
+            self._advance_after_removal()
+
+    def _move_selection(self, category: str, names: list[str]) -> None:
+        """Moves several files as one queued batch and drops them from the list in one pass"""
+        if self._restore is not None and self._restore.category == category:
+            self.statusbar.showMessage(f"Category '{category}' is being deleted", 2000)
             return
+        capacity = self.move_queue.capacity()
+        if capacity == 0:
+            self.statusbar.showMessage("Still moving earlier files, please wait...", 2000)
+            return
+        # Files whose name the category already has stay selected; nothing is overwritten
+        existing = [name for name in names if os.path.lexists(self.folder / category / Path(name).name)]
+        if existing:
+            skipped = set(existing)
+            names = [name for name in names if name not in skipped]
+            if not names:
+                self.statusbar.showMessage(f"Every selected file already exists in {category}", 3000)
+                return
+        # The queue is bounded: move what fits and leave the rest selected for the next press
+        remaining = names[capacity:]
+        names = names[:capacity]
+        moves = [(self.folder / name, self.folder / category / Path(name).name) for name in names]
+        if not self.move_queue.submit_many(moves):
+            return
+        self.video.release({source for source, _ in moves})
 
         self._stop_video()
+        self._scan_follows_first = False
+        self._selection_anchor = None
+        self._touched_names.update(names)
+        for name in names:
+            self.prefetcher.discard(name)
+        self.files, self.curr_file = remove_selection(self.files, names, self.curr_file)
+        if not remaining and not existing:
+            self._file_view().clear_selection()
+        if not self.files:
+            self._on_list_emptied()
+        else:
+            self.display_media()
+        if existing:
+            self.statusbar.showMessage(
+                f"Moving {len(names)} file(s); {len(existing)} already exist in {category} and stay selected", 4000
+            )
+        elif remaining:
+            self.statusbar.showMessage(
+                f"Moving {len(names)} file(s); {len(remaining)} stay selected until these are done", 4000
+            )
 
-        file_name = self.files[self.curr_file]
-
-        path_to_file = self.folder / file_name
-        path_to_dest = self.folder / category / file_name
-        try:
-            path_to_file.rename(path_to_dest)
-        except OSError as e:
-            QMessageBox.warning(self, "Move Failed", f"Could not move {file_name} to {category}:\n{e}")
+    def extend_selection(self, step: int) -> None:
+        """Moves to the neighbouring file and selects everything from the anchor to it"""
+        target = self.curr_file + step
+        if not 0 <= target < len(self.files):
             return
+        anchor = index_of(self.files, self._selection_anchor, self.order.key) if self._selection_anchor else -1
+        if anchor < 0:
+            anchor = self.curr_file
+            self._selection_anchor = self.files[anchor]
+        self._scan_follows_first = False
+        self.curr_file = target
+        self._file_view().select_range(anchor, target)
+        self.display_media()
+
+    def _on_filmstrip_row(self, row: int) -> None:
+        if row == self.curr_file or row >= len(self.files):
+            return
+        self._scan_follows_first = False
+        self._selection_anchor = self.files[row]
+        self.curr_file = row
+        self.display_media()
+
+    def _file_view(self) -> Filmstrip:
+        """The file list the user is selecting in"""
+        return self.grid if self.grid_mode else self.filmstrip
+
+    def toggle_grid_mode(self) -> None:
+        """Switches between the single-file view and the thumbnail grid"""
+        self._clear_selection()
+        self.grid_mode = not self.grid_mode
+        self.filmstrip.setVisible(not self.grid_mode)
+        if self.files:
+            self.display_media()
+        elif self.grid_mode:
+            self.update_status_bar()
 
-        self.files.pop(self.curr_file)
-        self._advance_after_removal()
+    def _on_grid_open(self, index: QModelIndex) -> None:
+        if self.grid_mode and index.isValid():
+            self.curr_file = index.row()
+            self.toggle_grid_mode()
+
+    def _on_file_moved(self, source: Path, dest: Path) -> None:
+        if source.parent == self.folder:
+            # A folder listing that started before the move finished may still have seen the file
+            self._touched_names.add(source.name)
+            self.duplicates.move(("", source.name), (dest.parent.name, dest.name))
+            self.suggestions.move(("", source.name), (dest.parent.name, dest.name))
+        self.update_status_bar()
+
+    def _on_move_progress(self, source: Path, done: int, total: int) -> None:
+        self.update_status_bar()
+
+    def _on_move_failed(self, source: Path, dest: Path, error: str) -> None:
+        """Puts the file back at its sorted position and reports the failure"""
+        if source.parent == self.folder:
+            self._touched_names.discard(source.name)
+            self._merge_entries([source.name], [])
+        elif self.sources:
+            self._merge_entries([str(source)], [])
+        self._move_failures.append(f"{source.name} -> {dest.parent.name}: {error}")
+        if len(self._move_failures) == 1:
+            # Collect failures reported in quick succession into one dialog
+            QTimer.singleShot(0, self._report_move_failures)
+        self.update_status_bar()
+
+    def _report_move_failures(self) -> None:
+        failures, self._move_failures = self._move_failures, []
+        QMessageBox.warning(self, "Move Failed", f"Could not move {len(failures)} file(s):\n\n" + "\n".join(failures))
 
     def delete_file(self) -> None:
-        """Sends current file to the system recycle bin"""
+        """Sends current file to the system recycle bin.
+        In cull mode the file is only marked and hidden"""
         if not self.files:
             return
 
         self._stop_video()
+        if self.cull_mode:
+            self._cull_current()
+            return
 
         file_name = self.files[self.curr_file]
         file_path = self.folder / file_name
@@ -292,34 +739,280 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         if confirm != QMessageBox.StandardButton.Yes:
             return
 
+        self.video.release({file_path})
         try:
             send2trash(str(file_path))
         except OSError as e:
             QMessageBox.warning(self, "Delete Failed", f"Could not delete {file_name}:\n{e}")
             return
 
+        self._touched_names.add(file_name)
         self.files.pop(self.curr_file)
+        self.prefetcher.discard(file_name)
+        self.duplicates.remove(("", file_name))
+        self.suggestions.remove(("", file_name))
+        self._advance_after_removal()
+
+    def trash_duplicate(self) -> None:
+        """Sends the current file to the recycle bin without asking, if it duplicates an already sorted one"""
+        if not self.files or self.grid_mode or self._sorted_duplicate() is None:
+            return
+        self._stop_video()
+        file_name = self.files.pop(self.curr_file)
+        self.prefetcher.discard(file_name)
+        self._start_trash([file_name])
+        self.statusbar.showMessage(f"Trashed duplicate {file_name}", 2000)
+        self._advance_after_removal()
+
+    def _sorted_duplicate(self) -> tuple[int, str] | None:
+        """(Hamming distance, "category/name") of the closest sorted image that looks like the current file"""
+        value = self.duplicates.get(("", self.files[self.curr_file]))
+        if value is None:
+            return None
+        for distance, (category, name) in self.duplicates.find(value, DUPLICATE_MAX_DISTANCE):
+            if category:
+                return distance, f"{category}/{name}"
+        return None
+
+    def _start_similarity_scans(self) -> None:
+        """Hashes the folder and its categories and extracts their feature signatures in the background.
+        Stored hashes and signatures make repeat scans cheap"""
+        self._cancel_similarity_scans()
+        if self.folder is None:
+            return
+        scan = DuplicateScan(self.folder, list(self.folders), self.hash_store)
+        scan.hashed.connect(partial(self._on_hashed, scan))
+        self._hash_scan = scan
+        scan.start()
+        features = FeatureScan(self.folder, list(self.folders), self.hash_store)
+        features.signatures.connect(partial(self._on_signatures, features))
+        self._feature_scan = features
+        features.start()
+
+    def _cancel_similarity_scans(self) -> None:
+        if self._hash_scan is not None:
+            self._hash_scan.cancel()
+            self._hash_scan = None
+        if self._feature_scan is not None:
+            self._feature_scan.cancel()
+            self._feature_scan = None
+        self.duplicates.clear()
+        self.suggestions.clear()
+        self._update_suggestions()
+
+    def _on_hashed(self, scan: DuplicateScan, hashes: list[tuple[str, str, int]]) -> None:
+        if scan is not self._hash_scan:
+            return
+        for category, name, value in hashes:
+            self.duplicates.add((category, name), value)
+        self.update_status_bar()
+
+    def _on_signatures(self, scan: FeatureScan, signatures: list[tuple[str, str, int]]) -> None:
+        if scan is not self._feature_scan:
+            return
+        for category, name, value in signatures:
+            self.suggestions.add((category, name), value)
+        if not self._suggest_timer.isActive():
+            self._suggest_timer.start()
+
+    def _on_suggest_timer(self) -> None:
+        # Scrubbing ranks once it settles
+        self._update_suggestions(rank=not self._scrub_timer.isActive())
+
+    def _update_suggestions(self, rank: bool = True) -> None:
+        """Highlights the categories whose sorted examples are nearest to the current file.
+        With rank=False, e.g. while scrubbing, only an already known ranking is shown"""
+        if self.suggestions.version != self._rankings_version:
+            self._rankings.clear()
+            self._rankings_version = self.suggestions.version
+        suggested: list[str] = []
+        if self.files and not self.grid_mode:
+            name = self.files[self.curr_file]
+            ranking = self._rankings.get(name)
+            if ranking is None and rank:
+                signature = self.suggestions.get(("", name))
+                if signature is not None:
+                    with tracer.span("rank_categories", file=name):
+                        ranking = self.suggestions.rank(signature)[:SUGGEST_COUNT]
+                    self._rankings[name] = ranking
+            suggested = ranking or []
+        if suggested != self._suggested:
+            self._suggested = suggested
+            self.categoryPanel.set_suggested(suggested)
+
+    def toggle_tracing(self) -> None:
+        """Starts or stops recording timing spans, with the latency overlay in the status bar"""
+        tracer.enabled = not tracer.enabled
+        self._load_started = self._video_started = self._scan_started = None
+        if tracer.enabled:
+            tracer.clear()
+        self.traceLabel.setVisible(tracer.enabled)
+        self._update_trace_overlay()
+        self.statusbar.showMessage("Tracing on (Ctrl+Shift+T to export)" if tracer.enabled else "Tracing off", 2000)
+
+    def export_trace(self) -> None:
+        """Saves the recorded spans as a Chrome trace"""
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Trace", str(Path.home() / "media-sorter-trace.json"), "Chrome trace (*.json)"
+        )
+        if not path:
+            return
+        try:
+            count = tracer.export(Path(path))
+        except OSError as e:
+            QMessageBox.warning(self, "Export Failed", f"Could not write {path}:\n{e}")
+            return
+        self.statusbar.showMessage(f"Exported {count} trace events to {path}", 3000)
+
+    def _update_trace_overlay(self) -> None:
+        """Shows where the last load of the file on screen spent its time, and load percentiles"""
+        if not tracer.enabled:
+            return
+        parts = []
+        if self.media_type == "video":
+            stages = ["video_play"]
+            total = "video_start"
+        else:
+            stages = ["read", "decode", "pyramid", "scale", "fromImage"]
+            total = "load"
+        if self.media_path is not None:
+            last = tracer.breakdown(stages, file=self.media_path.name)
+            parts = [f"{stage} {last[stage]:.1f}" for stage in stages if stage in last]
+        p50 = tracer.percentile(total, 0.5)
+        p95 = tracer.percentile(total, 0.95)
+        text = f"Last: {' / '.join(parts)} ms" if parts else "Last: -"
+        if p50 is not None:
+            text += f" | {total} p50 {p50:.0f} p95 {p95:.0f} ms"
+        self.traceLabel.setText(text)
+
+    def toggle_cull_mode(self) -> None:
+        """Switches cull mode; leaving it offers to delete the marked files"""
+        self.cull_mode = not self.cull_mode
+        if self.cull_mode:
+            self.deleteFileButton.setToolTip("Mark current file for deletion (Delete key, Ctrl+K to finish)")
+        else:
+            self.deleteFileButton.setToolTip("Delete current file (Delete key)")
+            self.flush_culled()
+        self.update_status_bar()
+
+    def _cull_current(self) -> None:
+        file_name = self.files.pop(self.curr_file)
+        self._culled.append(file_name)
+        self.prefetcher.discard(file_name)
         self._advance_after_removal()
 
+    def unmark_last_culled(self) -> None:
+        """Brings the most recently marked file back and shows it"""
+        if not self._culled or self.folder is None:
+            return
+        file_name = self._culled.pop()
+        self._scan_follows_first = False
+        self.files = merge_sorted(self.files, [file_name], self.order.key)
+        self.curr_file = index_of(self.files, file_name, self.order.key)
+        self.toggle_categories(True)
+        self.display_media()
+
+    def flush_culled(self) -> None:
+        """Asks once to trash every marked file; declined files return to the list"""
+        if not self._culled or self.folder is None:
+            return
+        names, self._culled = self._culled, []
+        confirm = QMessageBox.question(
+            self,
+            "Delete Marked Files",
+            f"Move {len(names)} marked file(s) to the recycle bin?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes,
+        )
+        if confirm == QMessageBox.StandardButton.Yes:
+            self._start_trash(names)
+        else:
+            self._merge_entries(sorted(names), [])
+        self.update_status_bar()
+
+    def _start_trash(self, names: list[str]) -> None:
+        self.video.release({self.folder / name for name in names})
+        job = TrashJob(self.folder, names)
+        job.batch_done.connect(partial(self._on_trash_batch, job))
+        job.finished.connect(partial(self._on_trash_finished, job))
+        self._trash_jobs[job] = len(names)
+        job.start()
+
+    def _on_trash_batch(self, job: TrashJob, trashed: list[str], failures: list[tuple[str, str]], done: int) -> None:
+        self._trash_jobs[job] = len(job.names) - done
+        if job.folder == self.folder:
+            self._touched_names.update(trashed)
+            for name in trashed:
+                self.duplicates.remove(("", name))
+                self.suggestions.remove(("", name))
+        if failures:
+            self._trash_failures.extend(f"{name}: {error}" for name, error in failures)
+            if job.folder == self.folder:
+                # The files are still there, so they go back into the list
+                self._merge_entries(sorted(name for name, _ in failures), [])
+        self.update_status_bar()
+
+    def _on_trash_finished(self, job: TrashJob) -> None:
+        del self._trash_jobs[job]
+        self.update_status_bar()
+        if self._trash_jobs:
+            return
+        if self._trash_failures:
+            failures, self._trash_failures = self._trash_failures, []
+            QMessageBox.warning(
+                self,
+                "Delete Failed",
+                f"Could not delete {len(failures)} file(s):\n\n" + "\n".join(failures[:50]),
+            )
+        if self._close_after_trash:
+            self.close()
+
     def _advance_after_removal(self) -> None:
         """Adjusts curr_file index and refreshes display after a file is removed from the list."""
+        if not self.files and self._culled:
+            # End of the folder: settle the marked files before giving up on it
+            self.flush_culled()
         if not self.files:
-            self.reset_state()
+            self._on_list_emptied()
         elif self.curr_file >= len(self.files):
             self.curr_file = len(self.files) - 1
             self.display_media()
         else:
             self.display_media()
 
+    def _on_list_emptied(self) -> None:
+        """The last shown file is gone; the folder stays open while the filter hides others"""
+        if self._filtered_out:
+            self.reset_image(self._empty_label())
+        else:
+            self.reset_state()
+
+    def _empty_label(self) -> str:
+        if self._filtered_out:
+            return f"No files match the filter ({len(self._filtered_out)} hidden)."
+        return "No media files found."
+
     def reset_state(self) -> None:
         """Resets state to initial state"""
+        self._cancel_scan()
+        self._cancel_restore()
+        self._cancel_similarity_scans()
+        self._reset_order()
+        self._culled = []
+        self.folder_watcher.watch(None)
         self.folder = None
         self.folders = []
         self.folderPathSelectorButton.setText("Select Folder")
         self.reset_image("Nothing here... Just both of us...")
 
     def reset_image(self, label: str = "No media files found.") -> None:
-        self._stop_video()
+        """Clears the view. The loaders stay bound to the open folder, so files merged in later still load;
+        only reset_state(), which closes the folder first, unbinds them"""
+        self.video.release()
+        self._scrub_timer.stop()
+        self.prefetcher.reset(self.folder)
+        self.thumbnails.reset(self.folder)
+        self.posters.reset(self.folder)
         self.mediaStack.setCurrentWidget(self.imageLabel)
         self.files = []
         self.curr_file = 0
@@ -327,9 +1020,10 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         self.imageLabel.setText(label)
         self.catListComboBox.clear()
         self.catListComboBox.setPlaceholderText("Categories")
-        self.add_btns_for_categories()
+        self.categoryPanel.set_categories(self.folders)
         self.image_loaded = False
-        self.original_pixmap = None
+        self.image_pending = False
+        self.image_pyramid = None
         self.media_path = None
         self.media_type = None
         self.toggle_categories(False)
@@ -341,107 +1035,577 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         self.prevButton.setEnabled(has_files and self.curr_file > 0)
         self.nextButton.setEnabled(has_files and self.curr_file < len(self.files) - 1)
         self.deleteFileButton.setEnabled(has_files)
+        self.filmstrip.sync(self.files, self.curr_file, self.order.key)
+        if self.grid_mode:
+            self.grid.sync(self.files, self.curr_file, self.order.key)
 
     def display_media(self) -> None:
-        """Loads current file and displays it (image or video)"""
-        if len(self.files) == 0:
-            self.reset_image()
-            return
+        """Loads current file and displays it (image or video).
+        While navigation is scrubbing only cheap previews are shown"""
+        with tracer.span("display_media"):
+            if len(self.files) == 0:
+                self.reset_image()
+                return
 
-        self._stop_video()
-        self.video_resolution = None
-        self.media_path = self.folder / self.files[self.curr_file]
+            if self.grid_mode:
+                self._stop_video()
+                self.mediaStack.setCurrentWidget(self.grid)
+                self.update_status_bar()
+                self._update_nav_buttons()
+                self._update_suggestions()
+                return
 
-        if self._is_video(self.files[self.curr_file]):
-            self.media_type = "video"
-            self.original_pixmap = None
-            self.image_loaded = False
-            self._play_video()
-        else:
-            self.media_type = "image"
-            self._display_image()
+            self.tile_viewer.clear()
+            scrubbing = self._scrub_timer.isActive()
+            self._scrub_timer.start()
+
+            self._stop_video()
+            self.video_resolution = None
+            self.media_path = self.folder / self.files[self.curr_file]
+
+            if self._is_video(self.files[self.curr_file]):
+                self.media_type = "video"
+                self.image_pyramid = None
+                self.image_loaded = False
+                self.image_pending = False
+                if scrubbing:
+                    self.prefetcher.cancel_pending()
+                    self.mediaStack.setCurrentWidget(self.imageLabel)
+                    self.imageLabel.clear()
+                    self.imageLabel.setText(self.media_path.name)
+                else:
+                    self._open_video()
+            else:
+                self.media_type = "image"
+                # Ends when the full-quality image is on screen
+                self._load_started = tracer.start()
+                self._display_image(scrubbing)
+
+            if not scrubbing:
+                self.prefetcher.update(self.files, self.curr_file)
+                self._prefetch_videos()
+            self.update_status_bar()
+            self._update_nav_buttons()
+            self._update_suggestions(rank=not scrubbing)
+
+    def _display_image(self, scrubbing: bool = False) -> None:
+        """Shows the current image, decoding it in the background if it is not ready yet"""
+        with tracer.span("display_image"):
+            self.mediaStack.setCurrentWidget(self.imageLabel)
+            file_name = self.files[self.curr_file]
+            if scrubbing:
+                self.prefetcher.cancel_pending()
+                image = self.prefetcher.get(file_name)
+            else:
+                image = self.prefetcher.request(file_name)
+            if image is not None:
+                self._show_image(image)
+                return
 
-        self.update_status_bar()
-        self._update_nav_buttons()
+            self.image_pending = True
+            preview = self.prefetcher.preview(file_name)
+            if preview is not None:
+                self._show_preview(preview)
+            else:
+                self.image_pyramid = None
+                self.image_loaded = False
+                self.imageLabel.clear()
+                self.imageLabel.setText(f"Loading {file_name}...")
+
+    def _show_image(self, pyramid: ImagePyramid) -> None:
+        self.image_pending = False
+        self.image_pyramid = pyramid
+        self._scale_image()
+        self.image_loaded = True
+        if self._load_started is not None:
+            tracer.finish("load", self._load_started, file=self.media_path.name)
+            self._load_started = None
+            self._update_trace_overlay()
+        self.media_shown.emit(self.media_path.name)
+
+    def _show_preview(self, pyramid: ImagePyramid) -> None:
+        self.image_pyramid = pyramid
+        self._scale_image()
+        self.image_loaded = True
 
-    def _display_image(self) -> None:
-        """Loads image from the current file and displays it scaled to fit"""
-        self.mediaStack.setCurrentWidget(self.imageLabel)
-        reader = QtGui.QImageReader(str(self.media_path))
-        reader.setAutoTransform(True)
-        size = reader.size()
-        if size.isValid() and (size.width() > MAX_IMAGE_DIMENSION or size.height() > MAX_IMAGE_DIMENSION):
-            reader.setScaledSize(
-                size.scaled(MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION, Qt.AspectRatioMode.KeepAspectRatio)
-            )
-        image = reader.read()
-        if image.isNull():
-            self.original_pixmap = None
+    def _is_current_image(self, name: str) -> bool:
+        return self.media_type == "image" and bool(self.files) and self.files[self.curr_file] == name
+
+    def _on_image_ready(self, name: str, pyramid: ImagePyramid | None) -> None:
+        if not self._is_current_image(name):
+            return
+        if pyramid is None:
+            self.image_pending = False
+            self.image_pyramid = None
             self.image_loaded = False
             self.imageLabel.clear()
-            self.imageLabel.setText(f"Unable to load image: {self.media_path.name}")
+            self.imageLabel.setText(f"Unable to load image: {name}")
+        else:
+            self._show_image(pyramid)
+        self.update_status_bar()
+
+    def _on_preview_ready(self, name: str, pyramid: ImagePyramid | None) -> None:
+        if self.image_pending and pyramid is not None and self._is_current_image(name):
+            self._show_preview(pyramid)
+
+    def _on_scrub_settled(self) -> None:
+        """Upgrades the file navigation stopped on to full quality"""
+        if not self.files:
+            return
+        if self.media_type == "video":
+            if not self.video.source().isValid():
+                self._open_video()
+        elif self.image_pending:
+            image = self.prefetcher.request(self.files[self.curr_file])
+            if image is not None:
+                self._show_image(image)
+                self.update_status_bar()
+        self.prefetcher.update(self.files, self.curr_file)
+        self._prefetch_videos()
+        self._update_suggestions()
+
+    def _scale_image(self, smooth: bool = True) -> None:
+        """Scales the current image pyramid to fit the scroll area viewport.
+        Scaling starts from the nearest larger pyramid level"""
+        if self.image_pyramid is None:
             return
-        self.original_pixmap = QtGui.QPixmap.fromImage(image)
+        ratio = self.devicePixelRatioF()
+        viewport_size = self.scrollArea.viewport().size()
+        name = self.media_path.name if self.media_path else ""
+        with tracer.span("scale", file=name, smooth=smooth):
+            scaled = self.image_pyramid.scaled(viewport_size * ratio, smooth)
+        with tracer.span("fromImage", file=name):
+            pixmap = QtGui.QPixmap.fromImage(scaled)
+        pixmap.setDevicePixelRatio(ratio)
+        self.imageLabel.setPixmap(pixmap)
+
+    def _decode_target(self) -> QSize | None:
+        """Device pixel size of the viewport, rounded up so small resizes do not trigger a re-decode"""
+        if not VIEWPORT_DECODE:
+            return None
+        ratio = self.devicePixelRatioF()
+        viewport_size = self.scrollArea.viewport().size()
+        width = math.ceil(viewport_size.width() * ratio / DECODE_SIZE_STEP) * DECODE_SIZE_STEP
+        height = math.ceil(viewport_size.height() * ratio / DECODE_SIZE_STEP) * DECODE_SIZE_STEP
+        return QSize(width, height)
+
+    def _screen_target(self) -> QSize:
+        """Device pixel size of the screen the window is on; the size of on-disk previews"""
+        screen = self.screen()
+        ratio = screen.devicePixelRatio()
+        size = screen.size()
+        return QSize(math.ceil(size.width() * ratio), math.ceil(size.height() * ratio))
+
+    def _on_resize_settled(self) -> None:
         self._scale_image()
-        self.image_loaded = True
+        target = self._decode_target()
+        self.prefetcher.set_target_size(target)
+        self.prefetcher.set_screen_size(self._screen_target())
+        if (
+            target is not None
+            and self.media_type == "image"
+            and not self.image_pending
+            and self.image_pyramid is not None
+            and not self.image_pyramid.covers(target)
+        ):
+            # The window outgrew the decoded size; the sharper decode arrives through image_ready
+            pyramid = self.prefetcher.request(self.files[self.curr_file])
+            if pyramid is not None:
+                self._show_image(pyramid)
+
+    def eventFilter(self, watched: QObject | None, event: QEvent | None) -> bool:
+        """Wheel-up or double-click on the fitted image zooms in around the cursor;
+        a click on a video's poster frame starts playback"""
+        if watched is self.imageLabel:
+            if (
+                isinstance(event, QMouseEvent)
+                and event.type() == QEvent.Type.MouseButtonPress
+                and self.media_type == "video"
+                and self.files
+                and not self.video.source().isValid()
+            ):
+                self._play_video()
+                return True
+            if isinstance(event, QWheelEvent) and event.angleDelta().y() > 0:
+                return self._zoom_in(event.position(), self.tile_viewer.fit_scale() * 1.25)
+            if isinstance(event, QMouseEvent) and event.type() == QEvent.Type.MouseButtonDblClick:
+                return self._zoom_in(event.position())
+        return super().eventFilter(watched, event)
+
+    def _zoom_in(self, anchor: QPointF, scale: float | None = None) -> bool:
+        """Switches the current image to the tiled viewer; scale None means 1:1 device pixels"""
+        if self.media_type != "image" or self.image_pyramid is None or self.image_pending or self.grid_mode:
+            return False
+        backdrop = self.image_pyramid.levels[0]
+        if not self.tile_viewer.open(self.media_path, backdrop, anchor, scale):
+            return False
+        self.mediaStack.setCurrentWidget(self.tile_viewer)
+        return True
+
+    def zoom_actual_size(self) -> None:
+        size = self.tile_viewer.size()
+        self._zoom_in(QPointF(size.width() / 2, size.height() / 2))
+
+    def zoom_fit(self) -> None:
+        if self.mediaStack.currentWidget() is not self.tile_viewer:
+            return
+        self.tile_viewer.clear()
+        self.mediaStack.setCurrentWidget(self.imageLabel)
 
-    def _scale_image(self) -> None:
-        """Scales the cached original_pixmap to fit the scroll area viewport"""
-        if self.original_pixmap is None:
+    def _on_escape(self) -> None:
+        if self.categoryPanel.clear_filter():
             return
-        viewport_size = self.scrollArea.viewport().size()
-        scaled = self.original_pixmap.scaled(
-            viewport_size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+        if self.mediaStack.currentWidget() is self.tile_viewer:
+            self.zoom_fit()
+        else:
+            self._cancel_restore()
+
+    def keyPressEvent(self, event: QKeyEvent | None) -> None:
+        """Keys no other widget took start a type-ahead search of the categories"""
+        text = event.text()
+        typed = text.isprintable() and not text.isspace() and text != ""
+        modifiers = (
+            Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.AltModifier | Qt.KeyboardModifier.MetaModifier
         )
-        self.imageLabel.setPixmap(scaled)
+        if typed and self.folders and not event.modifiers() & modifiers:
+            self.categoryPanel.start_filter(text)
+            return
+        super().keyPressEvent(event)
 
     def resizeEvent(self, event: QResizeEvent | None) -> None:
         if self.image_loaded:
+            # Cheap preview while the window is being dragged; the timer does the smooth pass
+            self._scale_image(smooth=False)
             self._resize_timer.start()
         super().resizeEvent(event)
 
     def closeEvent(self, event: QCloseEvent | None) -> None:
+        self.flush_culled()
+        if self._trash_jobs:
+            # Close once the recycle bin has everything
+            self._close_after_trash = True
+            event.ignore()
+            return
         self._resize_timer.stop()
-        self._stop_video()
+        self._scrub_timer.stop()
+        self._suggest_timer.stop()
+        self._cancel_scan()
+        self._cancel_restore()
+        self._cancel_similarity_scans()
+        self.folder_watcher.watch(None)
+        self.prefetcher.shutdown()
+        self.thumbnails.shutdown()
+        self.posters.shutdown()
+        self.tile_viewer.shutdown()
+        self.move_queue.shutdown()
+        self.video.release()
         event.accept()
 
     def set_categories(self) -> None:
         """Sets the categories to the folders in the current folder"""
         self.catListComboBox.clear()
         self.catListComboBox.addItems(self.folders)
-        self.add_btns_for_categories()
+        self.categoryPanel.set_categories(self.folders)
 
     def get_folder_content(self) -> None:
-        """Gets the content of current folder"""
-        self.curr_file = 0
-        self.files = []
-        self.folders = []
-        for entry in sorted(self.folder.iterdir(), key=lambda p: p.name):
-            if entry.is_file():
-                ext = entry.suffix.lower().lstrip(".")
-                if ext in MEDIA_FORMATS:
-                    self.files.append(entry.name)
-            else:
-                self.folders.append(entry.name)
-        self.set_categories()
+        """Scans the current folder in the background.
+        Files and categories are merged in as they are found"""
+        with tracer.span("get_folder_content"):
+            self._cancel_scan()
+            self._cancel_restore()
+            self._cancel_similarity_scans()
+            self._reset_order()
+            self.order.has_paths = bool(self.sources)
+            self.curr_file = 0
+            self.files = []
+            self.folders = []
+            self.prefetcher.reset(self.folder)
+            self.thumbnails.reset(self.folder)
+            self.posters.reset(self.folder)
+            self.prefetcher.set_target_size(self._decode_target())
+            self.prefetcher.set_screen_size(self._screen_target())
+            self.set_categories()
+            self.imageLabel.clear()
+            self.imageLabel.setText("Scanning folder...")
+            self._update_nav_buttons()
+
+            self.scan_progress = 0
+            self._scan_follows_first = True
+            self._touched_names.clear()
+            self.folder_watcher.watch(self.folder)
+            # The scan itself picks up changes made while it runs
+            self.folder_watcher.pause()
+            # With a metadata order the stored metadata must arrive before the first files are placed
+            self._scan_started = tracer.start()
+            scan = FolderScan(self.folder, self.folder_index, early_metadata=self.order.uses_metadata())
+            scan.batch_ready.connect(partial(self._on_scan_batch, scan))
+            scan.entries_removed.connect(partial(self._on_scan_removed, scan))
+            scan.metadata_ready.connect(partial(self._on_scan_metadata, scan))
+            scan.finished.connect(partial(self._on_scan_finished, scan))
+            scan.failed.connect(partial(self._on_scan_failed, scan))
+            self._scan = scan
+            scan.start()
+            self._start_source_scan()
+            self.update_status_bar()
 
+    def _cancel_scan(self) -> None:
+        if self._scan is not None:
+            self._scan.cancel()
+            self._scan = None
+        self.scan_progress = None
+        if self._source_scan is not None:
+            self._source_scan.cancel()
+            self._source_scan = None
+        self.source_progress = None
+
+    def _start_source_scan(self) -> None:
+        """Walks the source folders next to the folder scan; the two merge into the same list"""
+        if not self.sources:
+            return
+        scan = SourceScan(self.sources, self.folder)
+        scan.batch_ready.connect(partial(self._on_source_batch, scan))
+        scan.metadata_ready.connect(partial(self._on_source_metadata, scan))
+        scan.failed.connect(partial(self._on_source_failed, scan))
+        scan.finished.connect(partial(self._on_source_finished, scan))
+        self._source_scan = scan
+        self.source_progress = 0
+        self._source_failures = []
+        scan.start()
+
+    def _on_source_batch(self, scan: SourceScan, worker: int, files: list[str], scanned: int) -> None:
+        if scan is not self._source_scan:
+            return
+        self.source_progress = scanned
+        if files:
+            self._merge_entries(files, [])
+        else:
+            self.update_status_bar()
+        # Only now may the worker queue another batch
+        scan.batch_taken(worker)
+
+    def _on_source_metadata(self, scan: SourceScan, entries: list[IndexEntry]) -> None:
+        if scan is self._source_scan:
+            self._add_metadata(entries)
+
+    def _on_source_failed(self, scan: SourceScan, message: str) -> None:
+        # Reported in one dialog when the scan finishes, however many roots failed
+        if scan is self._source_scan:
+            self._source_failures.append(message)
+
+    def _on_source_finished(self, scan: SourceScan) -> None:
+        if scan is not self._source_scan:
+            return
+        # The scan object stays referenced so background metadata probing can still be cancelled
+        self.source_progress = None
         if self.files:
-            self.display_media()
+            self.update_status_bar()
+        elif self.scan_progress is None:
+            self.reset_image(self._empty_label())
+        failures, self._source_failures = self._source_failures, []
+        if failures:
+            QMessageBox.warning(
+                self,
+                "Scan Failed",
+                f"Could not read {len(failures)} source folder(s):\n\n" + "\n".join(failures[:50]),
+            )
+
+    def _on_scan_batch(self, scan: FolderScan, files: list[str], folders: list[str], scanned: int) -> None:
+        if scan is not self._scan:
+            return
+        self.scan_progress = scanned
+        if files or folders:
+            self._merge_entries(files, folders)
+        else:
+            self.update_status_bar()
+
+    def _on_scan_removed(self, scan: FolderScan, files: list[str], folders: list[str]) -> None:
+        """Drops entries the folder index listed but the rescan no longer found"""
+        if scan is not self._scan:
+            return
+        self._remove_entries(files, folders)
+
+    def _on_scan_finished(self, scan: FolderScan) -> None:
+        if scan is not self._scan:
+            return
+        # The scan object stays referenced so background metadata probing can still be cancelled
+        tracer.finish("scan", self._scan_started, files=len(self.files))
+        self.scan_progress = None
+        self.folder_watcher.resume()
+        self._start_similarity_scans()
+        if self.files or self.source_progress is not None:
+            self.update_status_bar()
+        else:
+            self.reset_image(self._empty_label())
+
+    def _on_scan_failed(self, scan: FolderScan, message: str) -> None:
+        if scan is not self._scan:
+            return
+        self._scan = None
+        self.scan_progress = None
+        self.folder_watcher.resume()
+        QMessageBox.warning(self, "Scan Failed", f"Could not read {self.folder}:\n{message}")
+        if not self.files and self.source_progress is None:
+            self.reset_image(self._empty_label())
+
+    def _on_scan_metadata(self, scan: FolderScan, entries: list[IndexEntry]) -> None:
+        if scan is self._scan:
+            self._add_metadata(entries)
+
+    def _add_metadata(self, entries: list[IndexEntry]) -> None:
+        """Buffers probed metadata, re-sorting after a pause when the order or filter depends on it"""
+        self._pending_metadata.extend(entries)
+        if not self.order.uses_metadata() or not (self.files or self._filtered_out):
+            # Nothing on screen is placed by metadata yet
+            self._flush_metadata()
+        elif not self._order_timer.isActive():
+            self._order_timer.start()
+
+    def _flush_metadata(self) -> None:
+        """Applies buffered metadata; the caller re-sorts if the order depends on it"""
+        self._order_timer.stop()
+        pending, self._pending_metadata = self._pending_metadata, []
+        self.order.metadata.update((entry.name, entry) for entry in pending)
+
+    def _on_order_timer(self) -> None:
+        self._flush_metadata()
+        self._rearrange()
+
+    def _reset_order(self) -> None:
+        self._order_timer.stop()
+        self._pending_metadata = []
+        self.order.metadata = {}
+        self._filtered_out = set()
+
+    def _on_sort_order_selected(self) -> None:
+        self._flush_metadata()
+        self.order.order = self.sortComboBox.currentData()
+        self._rearrange()
+
+    def _on_filter_selected(self) -> None:
+        self._flush_metadata()
+        self.order.filter = self.filterComboBox.currentData()
+        self._rearrange()
+
+    def _rearrange(self) -> None:
+        """Re-sorts and re-filters the file list from the metadata in memory, keeping the file on screen"""
+        if self.folder is None:
+            return
+        current = self.files[self.curr_file] if self.files else None
+        previous = self.curr_file
+        self.files, hidden = self.order.arrange([*self.files, *self._filtered_out])
+        self._filtered_out = set(hidden)
+        if not self.files:
+            self.reset_image(self._empty_label())
+            return
+        row = index_of(self.files, current, self.order.key) if current is not None else -1
+        if row >= 0 and not self._scan_follows_first:
+            self.curr_file = row
+            self._update_nav_buttons()
+            self.update_status_bar()
+            if self.media_type == "image":
+                self.prefetcher.update(self.files, self.curr_file)
+            return
+        if current is None:
+            # Back from "no files match": reset_image() cleared the category list
+            self.set_categories()
+        self.curr_file = 0 if current is None or self._scan_follows_first else min(previous, len(self.files) - 1)
+        self.toggle_categories(True)
+        self.display_media()
+
+    def _on_folder_listing(self, files: set[str], folders: set[str]) -> None:
+        """Applies changes made to the folder by other programs"""
+        if self.folder is None:
+            return
+        ignore = self._touched_names | self.move_queue.in_flight_names(self.folder) | set(self._culled)
+        for job in self._trash_jobs:
+            if job.folder == self.folder:
+                ignore.update(job.names)
+        known = [*self.files, *self._filtered_out]
+        if self.sources:
+            # The watcher lists the top level only; files from source folders are not part of its listing
+            known = [name for name in known if not os.path.isabs(name)]
+        added_files, removed_files = diff_listing(known, files, ignore)
+        added_folders, removed_folders = diff_listing(self.folders, folders, ignore)
+        if removed_files or removed_folders:
+            self._remove_entries(removed_files, removed_folders)
+        if added_files or added_folders:
+            self._merge_entries(added_files, added_folders)
+
+    def _on_folder_lost(self) -> None:
+        self.reset_state()
+        self.statusbar.showMessage("The selected folder is no longer available.")
+
+    def _merge_entries(self, files: list[str], folders: list[str]) -> None:
+        """Merges new sorted file and category names in, keeping the file on screen in place"""
+        if folders:
+            self.folders = sorted(set(self.folders).union(folders))
+            self.set_categories()
+
+        if files and self.order.filter != "all":
+            self._filtered_out.update(name for name in files if not self.order.accepts(name))
+            files = [name for name in files if name not in self._filtered_out]
+
+        if files:
+            current = self.files[self.curr_file] if self.files else None
+            self.files = merge_sorted(self.files, files, self.order.key)
+            if current is None or (self._scan_follows_first and self.files[0] != current):
+                # Until the user navigates, keep showing the first file in sort order
+                self.curr_file = 0
+                self.toggle_categories(True)
+                self.display_media()
+                return
+            self.curr_file = max(0, index_of(self.files, current, self.order.key))
+            self._update_nav_buttons()
+
+        self.update_status_bar()
+
+    def _remove_entries(self, files: list[str], folders: list[str]) -> None:
+        """Drops vanished file and category names, moving on if the file on screen is gone"""
+        if folders:
+            self.folders = remove_names(self.folders, folders)
+            self.set_categories()
+
+        self._filtered_out.difference_update(files)
+        if not files or not self.files:
+            return
+        for name in files:
+            self.prefetcher.discard(name)
+        current = self.files[self.curr_file]
+        key = self.order.key
+        self.files = remove_names(self.files, files)
+        if index_of(self.files, current, key) >= 0:
+            self.curr_file = index_of(self.files, current, key)
+            self._update_nav_buttons()
+            self.update_status_bar()
+        elif not self.files:
+            self.reset_image(self._empty_label())
         else:
-            self.reset_image("No media files found.")
+            # The file on screen is gone; show its successor
+            self.curr_file = (
+                0 if self._scan_follows_first else min(position(self.files, current, key), len(self.files) - 1)
+            )
+            self.display_media()
 
     def next_image(self) -> None:
         """Shows the next file"""
+        self._scan_follows_first = False
+        self._clear_selection()
         if self.curr_file < len(self.files) - 1:
             self.curr_file += 1
             self.display_media()
 
     def prev_image(self) -> None:
         """Shows the previous file"""
+        self._scan_follows_first = False
+        self._clear_selection()
         if self.curr_file > 0:
             self.curr_file -= 1
             self.display_media()
 
+    def _clear_selection(self) -> None:
+        self._selection_anchor = None
+        self._file_view().clear_selection()
+
     def add_category(self) -> None:
         """Adds new category with the name of the text of combobox"""
         category = self.catListComboBox.currentText().strip()
@@ -460,6 +1624,7 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
             QMessageBox.warning(self, "Create Failed", f"Could not create category '{category}':\n{e}")
             return
 
+        self._touched_names.add(category)
         self.folders.append(category)
         self.set_categories()
 
@@ -481,52 +1646,220 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
             QMessageBox.StandardButton.No,
         )
 
-        if confirmation == QMessageBox.StandardButton.Yes:
-            category_path = self.folder / category
-            failures: list[str] = []
-
-            for entry in category_path.iterdir():
-                try:
-                    entry.rename(self.folder / entry.name)
-                except OSError as e:
-                    failures.append(f"{entry.name}: {e}")
-
-            if failures:
-                QMessageBox.warning(
-                    self,
-                    "Move Errors",
-                    f"Could not move {len(failures)} file(s) back to the main folder. "
-                    f"Category '{category}' was not removed.\n\n" + "\n".join(failures),
-                )
-                self.get_folder_content()
-                return
+        if confirmation != QMessageBox.StandardButton.Yes:
+            return
+        if self._restore is not None:
+            self.statusbar.showMessage(f"Still deleting category '{self._restore.category}'", 2000)
+            return
+
+        restore = CategoryRestore(self.folder, category)
+        restore.batch_ready.connect(partial(self._on_restore_batch, restore))
+        restore.finished.connect(partial(self._on_restore_finished, restore))
+        restore.failed.connect(partial(self._on_restore_failed, restore))
+        self._restore = restore
+        self.delCatButton.setEnabled(False)
+        if self.move_queue.pending():
+            # Queued moves land first so none of them end up in a folder that is being emptied;
+            # the queue's drained signal starts the restore
+            self.update_status_bar()
+            return
+        self._start_restore()
+
+    def _start_restore(self) -> None:
+        """Starts the category deletion that waited for queued moves, if there is one"""
+        if self._restore is None or self.restore_progress is not None:
+            return
+        self._touched_names.add(self._restore.category)
+        # The restore reports every entry it moves; change events would only repeat that
+        self.folder_watcher.pause()
+        self.restore_progress = (0, 0)
+        self._restore.start()
+        self.update_status_bar()
+
+    def _cancel_restore(self) -> None:
+        """Stops a running or waiting category deletion; entries already moved stay in the main folder"""
+        if self._restore is None:
+            return
+        self._restore.cancel()
+        self._restore = None
+        if self.restore_progress is not None:
+            self.restore_progress = None
+            self.folder_watcher.resume()
+        self.delCatButton.setEnabled(True)
+        self.update_status_bar()
+
+    def _on_restore_batch(
+        self, restore: CategoryRestore, files: list[str], folders: list[str], done: int, total: int
+    ) -> None:
+        if restore is not self._restore:
+            return
+        self.restore_progress = (done, total)
+        self._touched_names.update(files)
+        self._touched_names.update(folders)
+        if files or folders:
+            self._merge_entries(files, folders)
+        else:
+            self.update_status_bar()
 
-            try:
-                category_path.rmdir()
-            except OSError:
-                QMessageBox.warning(self, "Delete Failed", f"Could not remove folder '{category}' (not empty).")
+    def _on_restore_finished(self, restore: CategoryRestore, failures: list[str], removed: bool) -> None:
+        if restore is not self._restore:
+            return
+        self._restore = None
+        self.restore_progress = None
+        self.folder_watcher.resume()
+        self.delCatButton.setEnabled(True)
+        if removed:
+            self._remove_entries([], [restore.category])
+        # The category's images are now in the folder itself
+        self._start_similarity_scans()
+        if failures:
+            QMessageBox.warning(
+                self,
+                "Move Errors",
+                f"Could not move {len(failures)} entries back to the main folder. "
+                f"Category '{restore.category}' was not removed.\n\n" + "\n".join(failures[:50]),
+            )
+        self.update_status_bar()
 
-            self.get_folder_content()
+    def _on_restore_failed(self, restore: CategoryRestore, error: str) -> None:
+        if restore is not self._restore:
+            return
+        self._cancel_restore()
+        QMessageBox.warning(self, "Delete Failed", f"Could not delete category '{restore.category}':\n{error}")
 
     def select_folder(self) -> None:
         """Opens folder selection dialog and sets the folder path"""
+        self.flush_culled()
         self.files = []
         folder_str = QFileDialog.getExistingDirectory(self, "Select Folder")
         if not folder_str:
             return
-        self.folder = Path(folder_str)
+        self.open_folder(Path(folder_str))
+
+    def open_folder(self, folder: Path) -> None:
+        """Shows folder and remembers it for the next start"""
+        if not folder.is_dir():
+            QMessageBox.warning(self, "Folder Not Found", f"{folder} is not a folder.")
+            return
+        self.flush_culled()
+        self.folder = folder.resolve()
         self.folderPathSelectorButton.setText(self.folder.name)
         self.toggle_categories(True)
         self.get_folder_content()
+        settings = self.settings()
+        settings.setValue("last_folder", str(self.folder))
+        settings.setValue("sources", [str(source) for source in self.sources])
+
+    def add_source(self) -> None:
+        """Adds a folder whose whole tree is sorted alongside the files of the current folder"""
+        if self.folder is None:
+            self.statusbar.showMessage("Select the folder with the categories first (Ctrl+O)", 3000)
+            return
+        folder_str = QFileDialog.getExistingDirectory(self, "Add Source Folder")
+        if not folder_str:
+            return
+        self.sources.append(Path(folder_str))
+        self.open_folder(self.folder)
+
+    def clear_sources(self) -> None:
+        """Goes back to sorting the top level of the current folder only"""
+        if not self.sources:
+            return
+        self.sources = []
+        if self.folder is not None:
+            self.open_folder(self.folder)
+        self.statusbar.showMessage("Source folders removed", 2000)
+
+    @staticmethod
+    def settings() -> QSettings:
+        return QSettings(CACHE_DIR_NAME, CACHE_DIR_NAME)
+
+    @classmethod
+    def last_folder(cls) -> Path | None:
+        """The folder open when the app last ran, if it still exists"""
+        value = cls.settings().value("last_folder")
+        if not value or not Path(value).is_dir():
+            return None
+        return Path(value)
+
+    @classmethod
+    def last_sources(cls) -> list[Path]:
+        """The source folders of the last session"""
+        value = cls.settings().value("sources") or []
+        # A single entry reads back as a plain string from some settings formats
+        return [Path(source) for source in ([value] if isinstance(value, str) else value)]
+
+
+class StartupReport(QObject):
+    """Prints when the window and the first file appeared as one line of JSON, then quits.
+
+    Times are seconds since the epoch so that a launching process can
+    subtract its own start time; benchmarks/startup.py does that."""
+
+    def __init__(self, app: QtWidgets.QApplication, window: MainWindow, wait_for_media: bool) -> None:
+        super().__init__(window)
+        self._app = app
+        self._report: dict[str, object] = {"window_shown": None, "first_media": None, "file": None}
+        self._wait_for_media = wait_for_media
+        window.media_shown.connect(self._on_media_shown)
+        # Runs once the event loop has handled the show() before it
+        QTimer.singleShot(0, self._on_window_shown)
+        QTimer.singleShot(STARTUP_REPORT_TIMEOUT_MS, self._finish)
+
+    def _on_window_shown(self) -> None:
+        self._report["window_shown"] = time.time()
+        if not self._wait_for_media:
+            self._finish()
+
+    def _on_media_shown(self, name: str) -> None:
+        if self._report["first_media"] is None:
+            self._report["first_media"] = time.time()
+            self._report["file"] = name
+            self._finish()
+
+    def _finish(self) -> None:
+        if self._report["window_shown"] is None:
+            return
+        self._report["multimedia_loaded"] = "PyQt6.QtMultimedia" in sys.modules
+        print(json.dumps(self._report), flush=True)
+        self._app.quit()
 
 
 if __name__ == "__main__":
+    # Category suggestions extract features in worker processes, which frozen builds must dispatch here
+    multiprocessing.freeze_support()
     app = QtWidgets.QApplication(sys.argv)
     app.setStyle("Fusion")
 
+    parser = argparse.ArgumentParser(description="Sort media files into category folders.")
+    parser.add_argument("folder", nargs="?", type=Path, help="folder to open (default: the folder open last time)")
+    parser.add_argument("--no-restore", action="store_true", help="start without opening the last folder")
+    parser.add_argument(
+        "--source",
+        type=Path,
+        action="append",
+        default=[],
+        help="folder whose whole tree is sorted into the categories as well (repeatable)",
+    )
+    parser.add_argument(
+        "--startup-report", action="store_true", help="print startup times as JSON and quit once the first file shows"
+    )
+    # Qt has already taken its own options out of the arguments
+    args = parser.parse_args(app.arguments()[1:])
+
     theme = ThemeManager(app)
     theme.follow_system()
 
     window = MainWindow()
+    folder = args.folder or (None if args.no_restore else window.last_folder())
+    if args.source or args.folder:
+        window.sources = args.source
+    elif folder is not None:
+        window.sources = window.last_sources()
+    if args.startup_report:
+        StartupReport(app, window, wait_for_media=folder is not None)
     window.show()
+    if folder is not None:
+        # After the first paint, so the window appears before the scan starts
+        QTimer.singleShot(0, partial(window.open_folder, folder))
     sys.exit(app.exec())
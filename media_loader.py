@@ -0,0 +1,521 @@
+"""Background image decoding, neighbour prefetching and scrub previews for the media sorter."""
+
+from __future__ import annotations
+
+import contextlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from PyQt6.QtCore import QBuffer, QByteArray, QObject, QRunnable, QSize, Qt, QThread, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QImageIOHandler, QImageReader, QImageWriter
+
+from constants import (
+    IMAGE_FORMATS,
+    MAX_IMAGE_DIMENSION,
+    MIPMAP_MIN_DIMENSION,
+    PREFETCH_AHEAD,
+    PREFETCH_BEHIND,
+    PREVIEW_CACHE_SIZE,
+    PREVIEW_DIMENSION,
+)
+from feature_index import SIGNATURE_SIZE, signature_from_rgb
+from image_hash import HASH_HEIGHT, HASH_WIDTH, dhash_from_gray
+from media_meta import probe_header
+from preview_cache import PreviewCache, worth_caching
+from tracing import tracer
+
+# Requests for the file on screen jump ahead of every prefetch in the queue
+_CURRENT_PRIORITY = 1000
+
+# Text key in cached renditions holding the original image's dimensions
+_SOURCE_SIZE_KEY = "SourceSize"
+
+
+def is_image_name(filename: str) -> bool:
+    return Path(filename).suffix.lower().lstrip(".") in IMAGE_FORMATS
+
+
+def _open_reader(path: Path, label: str) -> tuple[QImageReader, QBuffer | None]:
+    """A reader for path, plus the buffer it reads from while tracing.
+
+    With tracing on, the file is read into memory first so that disk time is
+    recorded apart from decoding; otherwise the reader streams the file."""
+    if not tracer.enabled:
+        return QImageReader(str(path)), None
+    try:
+        with tracer.span("read", file=label):
+            data = path.read_bytes()
+    except OSError:
+        return QImageReader(str(path)), None
+    buffer = QBuffer()
+    buffer.setData(QByteArray(data))
+    return QImageReader(buffer), buffer
+
+
+def decode_image(path: Path, target: QSize | None = None, label: str | None = None) -> tuple[QImage, QSize]:
+    """Decodes an image file and returns it together with the source dimensions.
+
+    Images larger than target (or MAX_IMAGE_DIMENSION when no target is given)
+    are downscaled by the reader itself, which lets JPEG scale in the DCT domain.
+    label names the file in trace spans; it defaults to the file name.
+    Safe to call from worker threads: only QImage/QImageReader are used."""
+    label = label or path.name
+    reader, _buffer = _open_reader(path, label)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if not size.isValid():
+        return reader.read(), size
+
+    bound = QSize(MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION)
+    if target is not None:
+        bound = bound.boundedTo(target)
+    # The scaled size applies before EXIF rotation, so fit against the stored orientation
+    rotated = bool(reader.transformation() & QImageIOHandler.Transformation.TransformationRotate90)
+    if rotated:
+        bound = bound.transposed()
+        source_size = size.transposed()
+    else:
+        source_size = size
+    if size.width() > bound.width() or size.height() > bound.height():
+        reader.setScaledSize(size.scaled(bound, Qt.AspectRatioMode.KeepAspectRatio))
+    with tracer.span("decode", file=label):
+        return reader.read(), source_size
+
+
+def image_dhash(path: Path) -> int | None:
+    """Difference hash of an image file, or None if it cannot be decoded.
+
+    The reader scales straight to the 9x8 hash grid, which JPEG does mostly
+    in the DCT domain. Safe to call from worker threads."""
+    reader = QImageReader(str(path))
+    reader.setAutoTransform(True)
+    if reader.size().isValid():
+        reader.setScaledSize(QSize(HASH_WIDTH, HASH_HEIGHT))
+    image = reader.read()
+    if image.isNull():
+        return None
+    if image.size() != QSize(HASH_WIDTH, HASH_HEIGHT):
+        image = image.scaled(
+            HASH_WIDTH, HASH_HEIGHT, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation
+        )
+    gray = image.convertToFormat(QImage.Format.Format_Grayscale8)
+    bits = gray.constBits()
+    bits.setsize(gray.sizeInBytes())
+    return dhash_from_gray(bytes(bits), gray.bytesPerLine())
+
+
+def image_signature(path: Path) -> int | None:
+    """Feature signature of an image file for category suggestions, or None if it cannot be decoded.
+
+    Needs no QGuiApplication, so it also runs in pool processes."""
+    size = QSize(SIGNATURE_SIZE, SIGNATURE_SIZE)
+    reader = QImageReader(str(path))
+    reader.setAutoTransform(True)
+    if reader.size().isValid():
+        reader.setScaledSize(size)
+    image = reader.read()
+    if image.isNull():
+        return None
+    if image.size() != size:
+        image = image.scaled(size, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    rgb = image.convertToFormat(QImage.Format.Format_RGB888)
+    bits = rgb.constBits()
+    bits.setsize(rgb.sizeInBytes())
+    return signature_from_rgb(bytes(bits), rgb.bytesPerLine())
+
+
+def probe_media(path: Path) -> tuple[int, int, int | None]:
+    """(width, height, capture time) of a media file from its headers alone; 0x0 when unknown.
+
+    Needs no QGuiApplication, so it also runs in pool processes."""
+    width, height, taken = probe_header(path)
+    if is_image_name(path.name):
+        # size() only reads the header
+        size = QImageReader(str(path)).size()
+        width, height = (size.width(), size.height()) if size.isValid() else (0, 0)
+    return width, height, taken
+
+
+def _fits(size: QSize, source_size: QSize, target: QSize | None) -> bool:
+    """True when an image of size, downscaled from source_size, has enough pixels for target."""
+    if target is None or size.width() >= source_size.width():
+        return True
+    fitted = source_size.scaled(target, Qt.AspectRatioMode.KeepAspectRatio)
+    # Allow for rounding in the reader's scaled size
+    return size.width() + 1 >= fitted.width() and size.height() + 1 >= fitted.height()
+
+
+def decode_cached(path: Path, target: QSize | None, cache: PreviewCache, dimension: int) -> tuple[QImage, QSize]:
+    """Like decode_image(), but serves slow formats from a screen-size rendition in the preview cache.
+
+    On a miss, a slow file is decoded once at dimension x dimension and that
+    rendition is written to the cache. The original is read again only when
+    the target is larger than the rendition, e.g. a window spanning screens."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return decode_image(path, target)
+
+    cached = cache.lookup(path, st, dimension)
+    if cached is not None:
+        reader = QImageReader(str(cached))
+        width, _, height = reader.text(_SOURCE_SIZE_KEY).partition("x")
+        if width.isdigit() and height.isdigit():
+            source_size = QSize(int(width), int(height))
+            if _fits(reader.size(), source_size, target):
+                image, _ = decode_image(cached, target, path.name)
+                if not image.isNull():
+                    return image, source_size
+
+    header = QImageReader(str(path)).size()
+    if not worth_caching(path.name, st.st_size, header.width(), header.height()):
+        return decode_image(path, target)
+    bound = QSize(dimension, dimension)
+    image, source_size = decode_image(path, bound if target is None else bound.expandedTo(target))
+    if not image.isNull():
+        _store_rendition(cache, path, st, dimension, image, source_size)
+    return image, source_size
+
+
+def _store_rendition(
+    cache: PreviewCache, path: Path, st: os.stat_result, dimension: int, image: QImage, source_size: QSize
+) -> None:
+    # JPEG decodes fastest; images with transparency keep it as PNG
+    ext = "png" if image.hasAlphaChannel() else "jpg"
+    dest = cache.path_for(path, st, dimension, ext)
+    try:
+        temp = cache.reserve(dest)
+    except OSError:
+        return
+    writer = QImageWriter(str(temp), ext.encode())
+    writer.setQuality(90)
+    writer.setText(_SOURCE_SIZE_KEY, f"{source_size.width()}x{source_size.height()}")
+    try:
+        if writer.write(image):
+            cache.commit(temp, dest)
+            return
+    except OSError:
+        pass
+    with contextlib.suppress(OSError):
+        temp.unlink()
+
+
+class ImagePyramid:
+    """Pre-halved renditions of one decoded image, largest first.
+
+    Scaling starts from the smallest level that still covers the target, so a
+    smooth pass never has to shrink by more than a factor of two."""
+
+    __slots__ = ("levels", "source_size")
+
+    def __init__(self, levels: list[QImage], source_size: QSize) -> None:
+        self.levels = levels
+        self.source_size = source_size
+
+    @classmethod
+    def build(cls, image: QImage, source_size: QSize, min_dimension: int = MIPMAP_MIN_DIMENSION) -> ImagePyramid:
+        levels = [image]
+        while max(levels[-1].width(), levels[-1].height()) // 2 >= min_dimension:
+            prev = levels[-1]
+            levels.append(
+                prev.scaled(
+                    max(1, prev.width() // 2),
+                    max(1, prev.height() // 2),
+                    Qt.AspectRatioMode.IgnoreAspectRatio,
+                    Qt.TransformationMode.SmoothTransformation,
+                )
+            )
+        return cls(levels, source_size)
+
+    def size(self) -> QSize:
+        return self.levels[0].size()
+
+    def nbytes(self) -> int:
+        return sum(level.sizeInBytes() for level in self.levels)
+
+    def covers(self, target: QSize) -> bool:
+        """True when level 0 has enough pixels to show the image fitted into target."""
+        size = self.size()
+        if max(size.width(), size.height()) >= MAX_IMAGE_DIMENSION:
+            return True
+        return _fits(size, self.source_size, target)
+
+    def level_for(self, target: QSize) -> QImage:
+        """Returns the smallest level at least as large as the image fitted into target."""
+        fitted = self.levels[0].size().scaled(target, Qt.AspectRatioMode.KeepAspectRatio)
+        best = self.levels[0]
+        for level in self.levels[1:]:
+            if level.width() < fitted.width() or level.height() < fitted.height():
+                break
+            best = level
+        return best
+
+    def scaled(self, target: QSize, smooth: bool = True) -> QImage:
+        mode = Qt.TransformationMode.SmoothTransformation if smooth else Qt.TransformationMode.FastTransformation
+        return self.level_for(target).scaled(target, Qt.AspectRatioMode.KeepAspectRatio, mode)
+
+
+class _Ticket:
+    """Cancellation flag shared between the prefetcher and one queued decode."""
+
+    __slots__ = ("cancelled",)
+
+    def __init__(self) -> None:
+        self.cancelled = False
+
+
+class _DecodeSignals(QObject):
+    decoded = pyqtSignal(str, int, bool, object)
+
+
+class _DecodeTask(QRunnable):
+    def __init__(
+        self,
+        name: str,
+        path: Path,
+        target: QSize | None,
+        preview: bool,
+        generation: int,
+        ticket: _Ticket,
+        signals: _DecodeSignals,
+        cache: tuple[PreviewCache, int] | None = None,
+    ) -> None:
+        super().__init__()
+        self._name = name
+        self._path = path
+        self._target = target
+        self._preview = preview
+        self._generation = generation
+        self._ticket = ticket
+        self._signals = signals
+        self._cache = cache
+
+    def run(self) -> None:
+        if self._ticket.cancelled:
+            return
+        if self._cache is not None:
+            image, source_size = decode_cached(self._path, self._target, *self._cache)
+        else:
+            image, source_size = decode_image(self._path, self._target)
+        if self._ticket.cancelled:
+            return
+        if image.isNull():
+            pyramid = None
+        elif self._preview:
+            pyramid = ImagePyramid([image], source_size)
+        else:
+            with tracer.span("pyramid", file=self._name):
+                pyramid = ImagePyramid.build(image, source_size)
+        self._signals.decoded.emit(self._name, self._generation, self._preview, pyramid)
+
+
+class ImagePrefetcher(QObject):
+    """Decodes the files around the current position on a QThreadPool.
+
+    The window covers `ahead` files after and `behind` files before the current
+    index. Decoded image pyramids are kept only while they stay inside the window.
+
+    The file on screen is loaded through request() (full resolution) or
+    preview() (a small, fast decode used while scrubbing). Only the latest
+    current file is ever announced through image_ready/preview_ready; older
+    requests are cancelled or their results dropped.
+
+    With a target size set, full decodes are only as large as the image fitted
+    into that size; otherwise they are capped at MAX_IMAGE_DIMENSION. With a
+    PreviewCache and a screen size, slow formats are decoded through
+    decode_cached(), so prefetching fills the on-disk cache as a side effect."""
+
+    # Both carry an ImagePyramid, or None when the file could not be decoded
+    image_ready = pyqtSignal(str, object)
+    preview_ready = pyqtSignal(str, object)
+
+    def __init__(
+        self,
+        ahead: int = PREFETCH_AHEAD,
+        behind: int = PREFETCH_BEHIND,
+        parent: QObject | None = None,
+        preview_cache: PreviewCache | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._ahead = ahead
+        self._behind = behind
+        self._preview_cache = preview_cache
+        self._screen_dimension: int | None = None
+        self._folder: Path | None = None
+        self._target: QSize | None = None
+        self._generation = 0
+        self._current: str | None = None
+        self._cache: dict[str, ImagePyramid] = {}
+        self._pending: dict[str, _Ticket] = {}
+        self._previews: OrderedDict[str, ImagePyramid] = OrderedDict()
+        self._pending_preview: tuple[str, _Ticket] | None = None
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, QThread.idealThreadCount() - 1))
+        # Previews get their own small pool so they never queue behind full decodes
+        self._preview_pool = QThreadPool(self)
+        self._preview_pool.setMaxThreadCount(2)
+
+        self._signals = _DecodeSignals(self)
+        self._signals.decoded.connect(self._on_decoded)
+
+    def set_window(self, ahead: int, behind: int) -> None:
+        self._ahead = max(0, ahead)
+        self._behind = max(0, behind)
+
+    def window(self) -> tuple[int, int]:
+        return self._ahead, self._behind
+
+    def set_target_size(self, target: QSize | None) -> None:
+        """Sets the decode size and drops cached images too small for it."""
+        self._target = target
+        if target is None:
+            return
+        for name in [n for n, pyramid in self._cache.items() if not pyramid.covers(target)]:
+            del self._cache[name]
+
+    def set_screen_size(self, size: QSize) -> None:
+        """Sets the rendition size for the on-disk preview cache, normally the screen in device pixels."""
+        self._screen_dimension = max(size.width(), size.height()) if size.isValid() else None
+
+    def reset(self, folder: Path | None = None) -> None:
+        """Drops every cached and queued decode, e.g. when the folder changes."""
+        self.cancel_pending()
+        self._cancel_preview()
+        self._pool.clear()
+        self._preview_pool.clear()
+        self._cache.clear()
+        self._previews.clear()
+        self._current = None
+        self._folder = folder
+        self._generation += 1
+
+    def get(self, name: str) -> ImagePyramid | None:
+        return self._cache.get(name)
+
+    def discard(self, name: str) -> None:
+        """Forgets a file that has been moved or deleted."""
+        self._cache.pop(name, None)
+        self._previews.pop(name, None)
+        ticket = self._pending.pop(name, None)
+        if ticket is not None:
+            ticket.cancelled = True
+        if self._pending_preview is not None and self._pending_preview[0] == name:
+            self._cancel_preview()
+
+    def cancel_pending(self) -> None:
+        """Cancels every queued full decode; running ones finish but are dropped."""
+        for ticket in self._pending.values():
+            ticket.cancelled = True
+        self._pending.clear()
+
+    def request(self, name: str) -> ImagePyramid | None:
+        """Makes name the current file and returns its full image if cached.
+
+        Otherwise a top-priority decode is queued and image_ready fires when done."""
+        self._current = name
+        if self._pending_preview is not None and self._pending_preview[0] != name:
+            self._cancel_preview()
+        image = self._cache.get(name)
+        if image is not None and self._target is not None and not image.covers(self._target):
+            del self._cache[name]
+            image = None
+        if image is not None or name in self._pending or self._folder is None:
+            return image
+        self._start(name, _CURRENT_PRIORITY)
+        return None
+
+    def preview(self, name: str) -> ImagePyramid | None:
+        """Makes name the current file and returns a low-resolution rendition if one is cached.
+
+        Otherwise a preview decode replaces any earlier one and preview_ready fires when done."""
+        self._current = name
+        image = self._previews.get(name)
+        if image is not None:
+            self._previews.move_to_end(name)
+            return image
+        if self._pending_preview is not None:
+            if self._pending_preview[0] == name:
+                return None
+            self._cancel_preview()
+        if self._folder is None:
+            return None
+        ticket = _Ticket()
+        self._pending_preview = (name, ticket)
+        task = _DecodeTask(
+            name,
+            self._folder / name,
+            QSize(PREVIEW_DIMENSION, PREVIEW_DIMENSION),
+            True,
+            self._generation,
+            ticket,
+            self._signals,
+        )
+        self._preview_pool.start(task)
+        return None
+
+    def update(self, files: list[str], index: int) -> None:
+        """Re-centres the prefetch window on files[index]."""
+        if self._folder is None or not files:
+            return
+
+        start = max(0, index - self._behind)
+        stop = min(len(files), index + self._ahead + 1)
+        # Nearest files first, favouring the forward direction
+        order = sorted(range(start, stop), key=lambda i: (abs(i - index), i < index))
+        wanted = [files[i] for i in order if is_image_name(files[i])]
+        wanted_set = set(wanted)
+
+        for name in [n for n in self._cache if n not in wanted_set]:
+            del self._cache[name]
+        for name in [n for n in self._pending if n not in wanted_set and n != self._current]:
+            self._pending.pop(name).cancelled = True
+
+        for priority, name in enumerate(reversed(wanted)):
+            if name in self._cache or name in self._pending:
+                continue
+            self._start(name, priority)
+
+    def _start(self, name: str, priority: int) -> None:
+        ticket = _Ticket()
+        self._pending[name] = ticket
+        cache = None
+        if self._preview_cache is not None and self._screen_dimension is not None:
+            cache = (self._preview_cache, self._screen_dimension)
+        task = _DecodeTask(
+            name, self._folder / name, self._target, False, self._generation, ticket, self._signals, cache
+        )
+        self._pool.start(task, priority)
+
+    def _cancel_preview(self) -> None:
+        if self._pending_preview is not None:
+            self._pending_preview[1].cancelled = True
+            self._pending_preview = None
+
+    def _on_decoded(self, name: str, generation: int, preview: bool, image: ImagePyramid | None) -> None:
+        if generation != self._generation:
+            return
+        if preview:
+            if self._pending_preview is None or self._pending_preview[0] != name:
+                return
+            self._pending_preview = None
+            if image is not None:
+                self._previews[name] = image
+                while len(self._previews) > PREVIEW_CACHE_SIZE:
+                    self._previews.popitem(last=False)
+            if name == self._current and name not in self._cache:
+                self.preview_ready.emit(name, image)
+            return
+
+        if self._pending.pop(name, None) is None:
+            return
+        if image is not None:
+            self._cache[name] = image
+        if name == self._current:
+            self.image_ready.emit(name, image)
+
+    def shutdown(self) -> None:
+        self.reset()
+        self._pool.waitForDone()
+        self._preview_pool.waitForDone()
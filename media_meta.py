@@ -0,0 +1,169 @@
+"""Capture times and video dimensions read from file headers (no Qt dependencies).
+
+Only the bytes needed are read: JPEG segments up to the EXIF block, the
+TIFF IFD chain, and for MP4/QuickTime the atom headers on the way to the
+movie and track headers, seeking over media data."""
+
+from __future__ import annotations
+
+import os
+import struct
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO
+
+# QuickTime timestamps count seconds from 1904-01-01
+_QUICKTIME_EPOCH = 2082844800
+
+_TAG_DATETIME = 0x0132
+_TAG_EXIF_IFD = 0x8769
+_TAG_DATETIME_ORIGINAL = 0x9003
+_TAG_DATETIME_DIGITIZED = 0x9004
+
+# Containers in the ISO base media file format family
+_ATOM_FORMATS = {"mp4", "mov", "m4v"}
+
+
+def parse_exif_datetime(text: bytes) -> int | None:
+    """Seconds since the epoch for an EXIF "YYYY:MM:DD HH:MM:SS" value, read as UTC.
+
+    EXIF stores local time without a zone; treating it as UTC keeps the
+    values comparable with each other, which is all sorting needs."""
+    try:
+        stamp = datetime.strptime(text.split(b"\0", 1)[0].strip().decode("ascii"), "%Y:%m:%d %H:%M:%S")
+    except (UnicodeDecodeError, ValueError):
+        return None
+    return int(stamp.replace(tzinfo=timezone.utc).timestamp())
+
+
+def tiff_capture_time(data: bytes) -> int | None:
+    """Capture time from a TIFF structure (a TIFF file or the body of a JPEG EXIF block)."""
+    if data[:4] == b"II*\0":
+        order = "<"
+    elif data[:4] == b"MM\0*":
+        order = ">"
+    else:
+        return None
+
+    def entries(offset: int) -> dict[int, bytes | int]:
+        found: dict[int, bytes | int] = {}
+        if offset + 2 > len(data):
+            return found
+        (count,) = struct.unpack_from(order + "H", data, offset)
+        for i in range(count):
+            start = offset + 2 + 12 * i
+            if start + 12 > len(data):
+                break
+            tag, kind, length, value = struct.unpack_from(order + "HHI4s", data, start)
+            if kind == 2:  # ASCII, stored inline up to four bytes
+                if length > 4:
+                    (pointer,) = struct.unpack(order + "I", value)
+                    value = data[pointer : pointer + length]
+                found[tag] = value
+            elif kind == 4:  # LONG
+                found[tag] = struct.unpack(order + "I", value)[0]
+        return found
+
+    (first,) = struct.unpack_from(order + "I", data, 4)
+    ifd0 = entries(first)
+    exif = entries(ifd0[_TAG_EXIF_IFD]) if isinstance(ifd0.get(_TAG_EXIF_IFD), int) else {}
+    for tags, tag in ((exif, _TAG_DATETIME_ORIGINAL), (exif, _TAG_DATETIME_DIGITIZED), (ifd0, _TAG_DATETIME)):
+        value = tags.get(tag)
+        if isinstance(value, bytes):
+            stamp = parse_exif_datetime(value)
+            if stamp is not None:
+                return stamp
+    return None
+
+
+def _jpeg_exif(f: BinaryIO) -> bytes | None:
+    """Body of the EXIF APP1 segment, or None when the image data starts first."""
+    if f.read(2) != b"\xff\xd8":
+        return None
+    while True:
+        header = f.read(4)
+        if len(header) < 4 or header[0] != 0xFF:
+            return None
+        marker = header[1]
+        (length,) = struct.unpack(">H", header[2:])
+        # EXIF comes before the image data; a scan or frame header means there is none
+        if marker in (0xDA, 0xC0, 0xC1, 0xC2) or length < 2:
+            return None
+        if marker == 0xE1:
+            body = f.read(length - 2)
+            if body[:6] == b"Exif\0\0":
+                return body[6:]
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+def _atoms(f: BinaryIO, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    """Yields (type, body start, body end) of the atoms between start and end."""
+    position = start
+    while position + 8 <= end:
+        f.seek(position)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, kind = struct.unpack(">I4s", header)
+        body = position + 8
+        if size == 1:
+            (size,) = struct.unpack(">Q", f.read(8))
+            body += 8
+        elif size == 0:
+            size = end - position
+        if size < body - position:
+            return
+        yield kind, body, min(position + size, end)
+        position += size
+
+
+def _movie_header(f: BinaryIO, start: int, end: int) -> tuple[int, int, int | None]:
+    """(width, height, creation time) from the children of a moov atom."""
+    width = height = 0
+    created = None
+    for kind, body, body_end in _atoms(f, start, end):
+        if kind == b"mvhd":
+            f.seek(body)
+            data = f.read(min(body_end - body, 12))
+            if len(data) >= 8:
+                stamp = struct.unpack_from(">Q", data, 4)[0] if data[0] == 1 else struct.unpack_from(">I", data, 4)[0]
+                if stamp > _QUICKTIME_EPOCH:
+                    created = stamp - _QUICKTIME_EPOCH
+        elif kind == b"trak" and not width:
+            for child, child_body, child_end in _atoms(f, body, body_end):
+                if child != b"tkhd":
+                    continue
+                f.seek(child_body)
+                data = f.read(min(child_end - child_body, 104))
+                # Width and height are the last two 16.16 fixed-point fields
+                offset = 88 if data[:1] == b"\x01" else 76
+                if len(data) >= offset + 8:
+                    track_width, track_height = struct.unpack_from(">II", data, offset)
+                    width, height = track_width >> 16, track_height >> 16
+    return width, height, created
+
+
+def probe_header(path: Path) -> tuple[int, int, int | None]:
+    """(width, height, capture time) from the file's headers; unknown dimensions are 0.
+
+    Dimensions are only read here for MP4/QuickTime video; images get theirs
+    from QImageReader, which knows every format Qt can decode."""
+    ext = path.suffix.lower().lstrip(".")
+    try:
+        with open(path, "rb") as f:
+            if ext in ("jpg", "jpeg"):
+                exif = _jpeg_exif(f)
+                return 0, 0, tiff_capture_time(exif) if exif else None
+            if ext in ("tif", "tiff"):
+                # The first IFD and its strings normally sit near the start
+                return 0, 0, tiff_capture_time(f.read(64 * 1024))
+            if ext in _ATOM_FORMATS:
+                end = f.seek(0, os.SEEK_END)
+                for kind, body, body_end in _atoms(f, 0, end):
+                    if kind == b"moov":
+                        return _movie_header(f, body, body_end)
+    except (OSError, struct.error):
+        pass
+    return 0, 0, None
@@ -0,0 +1,103 @@
+"""Size-bounded on-disk cache of screen-size renditions of slow-to-decode images (no Qt dependencies).
+
+Entries are keyed by the source path, size and mtime and by the rendition
+size, so an edited file or a different screen simply misses. Each hit bumps
+the entry's mtime; when the cache grows past its byte budget the entries with
+the oldest mtimes are deleted first."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from constants import PREVIEW_DISK_MIN_BYTES, PREVIEW_DISK_MIN_PIXELS
+
+# JPEG already decodes quickly at reduced size, so only other formats are worth a rendition
+_FAST_FORMATS = {"jpg", "jpeg"}
+
+
+def worth_caching(name: str, file_size: int, width: int, height: int) -> bool:
+    """True for files that are slow to decode: large non-JPEG images."""
+    ext = os.path.splitext(name)[1][1:].lower()
+    if ext in _FAST_FORMATS:
+        return False
+    return file_size >= PREVIEW_DISK_MIN_BYTES or width * height >= PREVIEW_DISK_MIN_PIXELS
+
+
+class PreviewCache:
+    """Stores renditions as files under root; safe to share between decode threads."""
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total: int | None = None
+
+    def path_for(self, source: Path, st: os.stat_result, dimension: int, ext: str) -> Path:
+        key = f"{source.absolute()}\0{st.st_size}\0{st.st_mtime_ns}\0{dimension}"
+        digest = hashlib.sha1(key.encode(), usedforsecurity=False).hexdigest()
+        return self.root / digest[:2] / f"{digest}.{ext}"
+
+    def lookup(self, source: Path, st: os.stat_result, dimension: int) -> Path | None:
+        """Returns the cached rendition of source, if any, and marks it as recently used."""
+        for ext in ("jpg", "png"):
+            path = self.path_for(source, st, dimension, ext)
+            try:
+                os.utime(path)
+            except OSError:
+                continue
+            return path
+        return None
+
+    def reserve(self, dest: Path) -> Path:
+        """A temporary file next to dest to write a rendition into before commit()."""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(prefix=".", suffix=dest.suffix, dir=dest.parent)
+        os.close(fd)
+        return Path(name)
+
+    def commit(self, temp: Path, dest: Path) -> None:
+        """Moves a written rendition into place and evicts old entries if over budget."""
+        size = temp.stat().st_size
+        os.replace(temp, dest)
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan_total()
+            else:
+                self._total += size
+            if self._total > self.max_bytes:
+                self._total = self._evict(self.max_bytes * 3 // 4)
+
+    def _entries(self) -> list[tuple[int, int, Path]]:
+        entries = []
+        for sub in self.root.glob("??"):
+            with os.scandir(sub) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime_ns, st.st_size, Path(entry.path)))
+        return entries
+
+    def _scan_total(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self, target: int) -> int:
+        """Deletes least recently used entries until at most target bytes remain; returns the new total."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+        return total
@@ -0,0 +1,40 @@
+"""Tests for type-ahead matching of category names."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from category_filter import CategoryFilter, fuzzy_score
+
+
+def test_fuzzy_score_counts_skipped_characters():
+    assert fuzzy_score("holiday", "hol") == 0
+    assert fuzzy_score("holiday", "hdy") == 4
+    assert fuzzy_score("holiday", "yh") is None
+
+
+def test_tiers_rank_prefix_then_word_then_fuzzy():
+    names = ["Beach 2019", "beach", "Summer Beach", "Bread", "Cats", "bitch_and_each"]
+    index = CategoryFilter(names)
+    assert index.match("") == names
+    # Exact name first, then other prefixes in listing order
+    assert index.match("beach") == ["beach", "Beach 2019", "Summer Beach", "bitch_and_each"]
+    assert index.match("BE", limit=3) == ["Beach 2019", "beach", "Summer Beach"]
+    assert index.match("2019") == ["Beach 2019"]
+    assert index.match("bd") == ["Bread", "bitch_and_each"]
+    assert index.match("xyz") == []
+
+
+def test_growing_query_only_rechecks_previous_matches():
+    index = CategoryFilter([f"category {i:04d}" for i in range(1000)] + ["cats", "dogs"])
+    assert index.match("ca")[0] == "category 0000"
+    assert index.match("cat") == [*(f"category {i:04d}" for i in range(1000)), "cats"]
+    assert index.match("cats") == ["cats"]
+    # A different query starts from every name again
+    assert index.match("dg") == ["dogs"]
+    assert index.match("0999") == ["category 0999"]
+    index.set_names(["dogs"])
+    assert index.match("cats") == []
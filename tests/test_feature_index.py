@@ -0,0 +1,98 @@
+"""Tests for feature signatures and category ranking."""
+
+from __future__ import annotations
+
+import heapq
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from feature_index import SIGNATURE_SIZE, CategoryIndex, signature_from_rgb
+
+
+def _solid(r: int, g: int, b: int, stride: int = SIGNATURE_SIZE * 3) -> bytes:
+    row = bytes((r, g, b)) * SIGNATURE_SIZE
+    return (row + b"\0" * (stride - len(row))) * SIGNATURE_SIZE
+
+
+def test_signature_distance_follows_feature_distance():
+    black = signature_from_rgb(_solid(0, 0, 0), SIGNATURE_SIZE * 3)
+    grey = signature_from_rgb(_solid(100, 100, 100), SIGNATURE_SIZE * 3)
+    white = signature_from_rgb(_solid(255, 255, 255), SIGNATURE_SIZE * 3)
+    # Row padding beyond the image is ignored
+    assert signature_from_rgb(_solid(100, 100, 100, 52), 52) == grey
+    assert (black ^ grey).bit_count() < (black ^ white).bit_count()
+    assert (grey ^ white).bit_count() < (black ^ white).bit_count()
+    # Thermometer codes make the distance additive along a line of features
+    assert (black ^ grey).bit_count() + (grey ^ white).bit_count() >= (black ^ white).bit_count()
+
+
+def test_rank_votes_by_nearest_sorted_examples():
+    index = CategoryIndex()
+    for i in range(3):
+        index.add(("cats", f"c{i}.jpg"), 0b1111 << i)
+        index.add(("dogs", f"d{i}.jpg"), 0b1111 << (40 + i))
+    # Unsorted files never vote
+    index.add(("", "query.jpg"), 0b1111)
+    assert index.rank(0b11111) == ["cats", "dogs"]
+    assert index.rank(0b1111 << 41, neighbours=2) == ["dogs"]
+    assert CategoryIndex().rank(0b1) == []
+
+
+def test_move_and_remove_update_votes():
+    index = CategoryIndex()
+    index.add(("", "a.jpg"), 0b1)
+    index.add(("cats", "b.jpg"), 0b1 << 30)
+    assert index.rank(0b1) == ["cats"]
+    index.move(("", "a.jpg"), ("dogs", "a.jpg"))
+    assert index.rank(0b1) == ["dogs", "cats"]
+    assert index.get(("dogs", "a.jpg")) == 0b1 and index.get(("", "a.jpg")) is None
+    index.remove(("dogs", "a.jpg"))
+    assert index.rank(0b1) == ["cats"]
+    assert len(index) == 1
+
+
+def _brute_rank(examples: dict[tuple[str, str], int], signature: int, neighbours: int = 7) -> list[str]:
+    nearest = heapq.nsmallest(
+        neighbours, (((other ^ signature).bit_count(), key[0]) for key, other in examples.items())
+    )
+    votes: dict[str, float] = {}
+    for distance, category in nearest:
+        votes[category] = votes.get(category, 0.0) + 1 / (1 + distance)
+    return sorted(votes, key=lambda category: -votes[category])
+
+
+def test_pivot_search_matches_a_full_scan():
+    rnd = random.Random(7)
+    centres = {f"c{i}": rnd.getrandbits(512) for i in range(12)}
+    examples = {}
+    for n in range(3000):
+        category = f"c{n % 12}"
+        noise = sum(1 << rnd.randrange(512) for _ in range(rnd.randrange(40)))
+        examples[(category, f"{n}.jpg")] = centres[category] ^ noise
+    index = CategoryIndex(max_comparisons=len(examples))
+    for key, signature in examples.items():
+        index.add(key, signature)
+    for category, centre in centres.items():
+        query = centre ^ (1 << rnd.randrange(512))
+        assert index.rank(query) == _brute_rank(examples, query)
+        assert index.rank(query)[0] == category
+    # A bounded search still finds the obvious category
+    bounded = CategoryIndex(max_comparisons=64)
+    for key, signature in examples.items():
+        bounded.add(key, signature)
+    assert bounded.rank(centres["c3"])[0] == "c3"
+
+
+def test_version_tracks_sorted_examples_only():
+    index = CategoryIndex()
+    version = index.version
+    index.add(("", "a.jpg"), 0b1)
+    assert index.version == version
+    index.add(("cats", "b.jpg"), 0b10)
+    assert index.version > version
+    version = index.version
+    index.move(("", "a.jpg"), ("dogs", "a.jpg"))
+    assert index.version > version
@@ -0,0 +1,162 @@
+"""Tests for moving files across devices."""
+
+from __future__ import annotations
+
+import errno
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import file_move
+from file_move import MoveCancelled, move_entries, move_file, partial_path
+
+
+@pytest.fixture()
+def cross_device(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Makes Path.rename fail as if source and destination were on different filesystems."""
+
+    def rename(self: Path, target: Path) -> Path:
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(Path, "rename", rename)
+
+
+@pytest.fixture()
+def source(tmp_path: Path) -> Path:
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(os.urandom(300_000))
+    (tmp_path / "cats").mkdir()
+    return path
+
+
+class TestMoveFile:
+    def test_same_device_is_a_rename(self, source: Path) -> None:
+        data = source.read_bytes()
+        dest = source.parent / "cats" / source.name
+        assert move_file(source, dest) is False
+        assert dest.read_bytes() == data
+        assert not source.exists()
+
+    def test_cross_device_copies_then_removes_source(self, cross_device, source: Path) -> None:
+        data = source.read_bytes()
+        mtime = source.stat().st_mtime_ns
+        dest = source.parent / "cats" / source.name
+        assert move_file(source, dest, verify=True) is True
+        assert dest.read_bytes() == data
+        assert dest.stat().st_mtime_ns == mtime
+        assert not source.exists()
+        assert not partial_path(dest).exists()
+
+    def test_progress_reaches_total(self, cross_device, source: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(file_move, "MOVE_CHUNK_SIZE", 64 * 1024)
+        calls: list[tuple[int, int]] = []
+        move_file(source, source.parent / "cats" / source.name, progress=lambda d, t: calls.append((d, t)))
+        assert calls[0] == (0, 300_000)
+        assert calls[-1] == (300_000, 300_000)
+        assert len(calls) > 2
+
+    def test_cancel_keeps_partial_and_resumes(
+        self, cross_device, source: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(file_move, "MOVE_CHUNK_SIZE", 64 * 1024)
+        data = source.read_bytes()
+        dest = source.parent / "cats" / source.name
+        calls: list[int] = []
+
+        def cancelled() -> bool:
+            calls.append(1)
+            return len(calls) > 3
+
+        with pytest.raises(MoveCancelled):
+            move_file(source, dest, cancelled=cancelled)
+        assert source.exists()
+        assert not dest.exists()
+        kept = partial_path(dest).stat().st_size
+        assert 0 < kept < len(data)
+
+        progress: list[int] = []
+        move_file(source, dest, progress=lambda d, t: progress.append(d))
+        assert progress[0] == kept
+        assert dest.read_bytes() == data
+
+    def test_mismatched_partial_starts_over(self, cross_device, source: Path) -> None:
+        data = source.read_bytes()
+        dest = source.parent / "cats" / source.name
+        partial_path(dest).write_bytes(b"\0" * 1000)
+        move_file(source, dest)
+        assert dest.read_bytes() == data
+
+    def test_other_errors_propagate(self, source: Path) -> None:
+        with pytest.raises(FileNotFoundError):
+            move_file(source, source.parent / "missing" / source.name)
+        assert source.exists()
+
+    @pytest.mark.parametrize("across", [False, True])
+    def test_same_name_from_another_root_is_not_overwritten(
+        self, tmp_path: Path, request: pytest.FixtureRequest, across: bool
+    ) -> None:
+        first = tmp_path / "src" / "2024" / "01" / "IMG_0001.jpg"
+        second = tmp_path / "card" / "DCIM" / "IMG_0001.jpg"
+        for path, content in ((first, b"january"), (second, b"card")):
+            path.parent.mkdir(parents=True)
+            path.write_bytes(content)
+        category = tmp_path / "sorted" / "cats"
+        category.mkdir(parents=True)
+        if across:
+            request.getfixturevalue("cross_device")
+
+        move_file(first, category / first.name)
+        with pytest.raises(FileExistsError, match="already exists in cats"):
+            move_file(second, category / second.name)
+        assert (category / "IMG_0001.jpg").read_bytes() == b"january"
+        assert second.read_bytes() == b"card"
+        assert not partial_path(category / "IMG_0001.jpg").exists()
+
+
+class TestMoveEntries:
+    @pytest.fixture()
+    def category(self, tmp_path: Path) -> Path:
+        folder = tmp_path / "cats"
+        folder.mkdir()
+        for i in range(10):
+            (folder / f"cat{i}.jpg").write_bytes(b"x")
+        (folder / "notes.txt").write_bytes(b"x")
+        (folder / "kittens").mkdir()
+        return folder
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_moves_everything_in_sorted_batches(
+        self, tmp_path: Path, category: Path, workers: int, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # Treat every rename as slow so the parallel path is taken after the first chunk
+        monkeypatch.setattr(file_move, "RESTORE_PARALLEL_LATENCY", -1.0)
+        batches = list(move_entries(category, tmp_path, workers=workers, batch_size=4))
+        assert [b.done for b in batches] == [4, 8, 12]
+        assert all(b.total == 12 for b in batches)
+        files = [name for b in batches for name in b.files]
+        assert files == sorted(files)
+        assert len(files) == 10
+        assert [name for b in batches for name in b.folders] == ["kittens"]
+        assert not any(b.failures for b in batches)
+        assert list(category.iterdir()) == []
+        assert (tmp_path / "notes.txt").exists()
+
+    def test_does_not_overwrite(self, tmp_path: Path, category: Path) -> None:
+        (tmp_path / "cat3.jpg").write_bytes(b"keep")
+        batches = list(move_entries(category, tmp_path))
+        failures = [f for b in batches for f in b.failures]
+        assert len(failures) == 1
+        assert failures[0].startswith("cat3.jpg")
+        assert (tmp_path / "cat3.jpg").read_bytes() == b"keep"
+        assert (category / "cat3.jpg").exists()
+
+    def test_cancel_between_batches(self, tmp_path: Path, category: Path) -> None:
+        batches = []
+        for batch in move_entries(category, tmp_path, cancelled=lambda: len(batches) >= 1, batch_size=4):
+            batches.append(batch)
+        assert len(batches) == 1
+        assert len(list(category.iterdir())) == 8
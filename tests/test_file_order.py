@@ -0,0 +1,70 @@
+"""Tests for sort orders and filters of the navigation list."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from file_list import index_of, merge_sorted, position
+from file_order import FileOrder
+from folder_index import IndexEntry
+
+
+def _order(order: str, file_filter: str = "all") -> FileOrder:
+    files = FileOrder(order, file_filter)
+    files.metadata = {
+        "a.jpg": IndexEntry("a.jpg", "image", 300, 3, 4000, 3000, 200),
+        "b.jpg": IndexEntry("b.jpg", "image", 100, 1, 640, 480, 100),
+        "c.mp4": IndexEntry("c.mp4", "video", 900, 2, 1920, 1080, None),
+        "d.png": IndexEntry("d.png", "image", 200, 4),
+    }
+    return files
+
+
+def test_orders_put_unknown_values_last():
+    names = ["d.png", "c.mp4", "b.jpg", "a.jpg", "e.jpg"]
+    assert _order("name").arrange(names) == (["a.jpg", "b.jpg", "c.mp4", "d.png", "e.jpg"], [])
+    assert _order("taken").arrange(names)[0] == ["b.jpg", "a.jpg", "c.mp4", "d.png", "e.jpg"]
+    assert _order("pixels").arrange(names)[0] == ["b.jpg", "c.mp4", "a.jpg", "d.png", "e.jpg"]
+    assert _order("size").arrange(names)[0] == ["b.jpg", "d.png", "a.jpg", "c.mp4", "e.jpg"]
+    assert _order("mtime").arrange(names)[0] == ["b.jpg", "c.mp4", "a.jpg", "d.png", "e.jpg"]
+
+
+def test_filters_hide_files():
+    names = ["a.jpg", "b.jpg", "c.mp4", "d.png"]
+    assert _order("name", "videos").arrange(names) == (["c.mp4"], ["a.jpg", "b.jpg", "d.png"])
+    assert _order("name", "images").arrange(names)[0] == ["a.jpg", "b.jpg", "d.png"]
+    # Images are only classed by size once probed
+    assert _order("name", "small").arrange(names)[0] == ["b.jpg"]
+    assert _order("name", "large").arrange(names)[0] == ["a.jpg"]
+    assert not _order("name").uses_metadata()
+    assert _order("name", "small").uses_metadata()
+
+
+def test_list_helpers_follow_the_sort_key():
+    order = _order("taken")
+    files, _ = order.arrange(["a.jpg", "d.png"])
+    key = order.key
+    assert index_of(files, "a.jpg", key) == 0
+    assert index_of(files, "b.jpg", key) == -1
+    assert position(files, "b.jpg", key) == 0
+    files = merge_sorted(files, ["c.mp4", "b.jpg", "a.jpg"], key)
+    assert files == ["b.jpg", "a.jpg", "c.mp4", "d.png"]
+    many = [f"z{i:03d}.jpg" for i in range(100)]
+    assert merge_sorted(files, many, key) == [*files, *many]
+
+
+def test_source_paths_sort_by_file_name():
+    order = _order("name")
+    order.has_paths = True
+    source = "/photos/2019/aa.jpg"
+    files = merge_sorted(["a.jpg", "b.jpg"], ["/old/b.jpg", source], order.key)
+    assert files == ["a.jpg", source, "/old/b.jpg", "b.jpg"]
+    assert index_of(files, source, order.key) == 1
+
+    # Probed source files are placed and filtered like the rest
+    order = _order("pixels", "small")
+    order.metadata[source] = IndexEntry(source, "image", 50, 5, 320, 240, None)
+    assert order.arrange(["a.jpg", "b.jpg", source]) == ([source, "b.jpg"], ["a.jpg"])
@@ -0,0 +1,113 @@
+"""Tests for the persistent folder index."""
+
+from __future__ import annotations
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from folder_index import FolderIndex, IndexEntry, entry_kind, stat_entry
+
+
+@pytest.fixture()
+def index(tmp_path: Path) -> FolderIndex:
+    return FolderIndex(tmp_path / "cache" / "index.sqlite3")
+
+
+@pytest.fixture()
+def source(tmp_path: Path) -> Path:
+    folder = tmp_path / "source"
+    folder.mkdir()
+    return folder
+
+
+class TestEntryKind:
+    def test_kinds(self) -> None:
+        assert entry_kind("a.JPG") == "image"
+        assert entry_kind("b.mkv") == "video"
+        assert entry_kind("c.txt") == "other"
+        assert entry_kind("cats", is_dir=True) == "dir"
+
+    def test_stat_entry(self, source: Path) -> None:
+        (source / "a.jpg").write_bytes(b"1234")
+        entry = stat_entry(source, "a.jpg", "image")
+        assert entry is not None
+        assert entry.size == 4
+        assert stat_entry(source, "gone.jpg", "image") is None
+
+
+class TestFolderIndex:
+    def test_unknown_folder(self, index: FolderIndex, source: Path) -> None:
+        assert index.load(source) is None
+        assert index.entries(source) == {}
+
+    def test_round_trip(self, index: FolderIndex, source: Path) -> None:
+        entries = [
+            IndexEntry("b.jpg", "image", 10, 1),
+            IndexEntry("a.mp4", "video", 20, 2),
+            IndexEntry("notes.txt", "other", 5, 3),
+            IndexEntry("cats", "dir"),
+        ]
+        index.update(source, 42, entries, replace=True)
+        loaded = index.load(source)
+        assert loaded is not None
+        assert loaded.mtime_ns == 42
+        assert loaded.files == ["a.mp4", "b.jpg"]
+        assert loaded.folders == ["cats"]
+        assert index.entries(source)["b.jpg"].size == 10
+
+    def test_diff_update(self, index: FolderIndex, source: Path) -> None:
+        index.update(source, 1, [IndexEntry("a.jpg", "image"), IndexEntry("b.jpg", "image")], replace=True)
+        index.update(source, 2, [IndexEntry("c.jpg", "image")], removed=["a.jpg"])
+        loaded = index.load(source)
+        assert loaded is not None
+        assert loaded.mtime_ns == 2
+        assert loaded.files == ["b.jpg", "c.jpg"]
+
+    def test_replace_drops_old_entries(self, index: FolderIndex, source: Path) -> None:
+        index.update(source, 1, [IndexEntry("a.jpg", "image")], replace=True)
+        index.update(source, 2, [IndexEntry("b.jpg", "image")], replace=True)
+        assert index.load(source).files == ["b.jpg"]
+
+    def test_probed_metadata(self, index: FolderIndex, source: Path) -> None:
+        entries = [IndexEntry("a.jpg", "image"), IndexEntry("v.mp4", "video"), IndexEntry("n.txt", "other")]
+        index.update(source, 1, entries, replace=True)
+        assert sorted(index.unprobed(source)) == ["a.jpg", "v.mp4"]
+        index.set_probed(source, [("a.jpg", 640, 480, 1_600_000_000), ("v.mp4", 0, 0, None)])
+        assert index.unprobed(source) == []
+        entry = index.entries(source)["a.jpg"]
+        assert (entry.width, entry.height, entry.taken) == (640, 480, 1_600_000_000)
+
+    def test_update_keeps_capture_times(self, index: FolderIndex, source: Path) -> None:
+        index.update(source, 1, [IndexEntry("a.jpg", "image", 1, 1, 640, 480, 1_600_000_000)], replace=True)
+        index.update(source, 2, [IndexEntry("b.jpg", "image", 2, 2, 800, 600, 1_700_000_000)], removed=["c.jpg"])
+        entries = index.entries(source)
+        assert entries["a.jpg"].taken == 1_600_000_000
+        assert entries["b.jpg"].taken == 1_700_000_000
+
+    def test_old_index_gains_capture_times(self, tmp_path: Path, source: Path) -> None:
+        db_path = tmp_path / "old.sqlite3"
+        conn = sqlite3.connect(db_path)
+        with conn:
+            conn.executescript(
+                "CREATE TABLE folders (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, mtime_ns INTEGER NOT NULL);"
+                "CREATE TABLE entries (folder_id INTEGER NOT NULL, name TEXT NOT NULL, kind TEXT NOT NULL,"
+                " size INTEGER NOT NULL DEFAULT 0, mtime_ns INTEGER NOT NULL DEFAULT 0, width INTEGER, height INTEGER,"
+                " PRIMARY KEY (folder_id, name)) WITHOUT ROWID;"
+            )
+            conn.execute("INSERT INTO folders (id, path, mtime_ns) VALUES (1, ?, 1)", (str(source.resolve()),))
+            conn.execute("INSERT INTO entries VALUES (1, 'a.jpg', 'image', 1, 1, 640, 480)")
+        conn.close()
+        index = FolderIndex(db_path)
+        assert index.unprobed(source) == ["a.jpg"]
+        assert index.entries(source)["a.jpg"].taken is None
+
+    def test_forget(self, index: FolderIndex, source: Path) -> None:
+        index.update(source, 1, [IndexEntry("a.jpg", "image")], replace=True)
+        index.forget(source)
+        assert index.load(source) is None
+        assert index.entries(source) == {}
@@ -0,0 +1,149 @@
+"""Tests for the background folder scan helpers."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from file_list import contains, diff_listing, index_of, merge_sorted, remove_names, remove_selection
+from folder_scan import distinct_roots, is_media_name, iter_folder_batches, iter_tree_batches
+
+
+@pytest.fixture()
+def media_folder(tmp_path: Path) -> Path:
+    for name in ["alpha.jpg", "beta.png", "gamma.mp4", "delta.txt", "epsilon.avi", "Zeta.JPG"]:
+        (tmp_path / name).touch()
+    (tmp_path / "cats").mkdir()
+    (tmp_path / "dogs").mkdir()
+    return tmp_path
+
+
+def _collect(folder: Path, **kwargs) -> tuple[list[str], list[str], list[int]]:
+    files: list[str] = []
+    folders: list[str] = []
+    progress: list[int] = []
+    for batch_files, batch_folders, scanned in iter_folder_batches(folder, **kwargs):
+        files = merge_sorted(files, batch_files)
+        folders = merge_sorted(folders, batch_folders)
+        progress.append(scanned)
+    return files, folders, progress
+
+
+class TestIterFolderBatches:
+    def test_matches_media_and_folders(self, media_folder: Path) -> None:
+        files, folders, _ = _collect(media_folder)
+        assert files == ["Zeta.JPG", "alpha.jpg", "beta.png", "epsilon.avi", "gamma.mp4"]
+        assert folders == ["cats", "dogs"]
+
+    def test_batches_are_sorted_and_progress_increases(self, tmp_path: Path) -> None:
+        for i in range(50):
+            (tmp_path / f"{49 - i:02d}.jpg").touch()
+        progress = []
+        for batch_files, _, scanned in iter_folder_batches(tmp_path, first_batch=4, max_batch=8):
+            assert batch_files == sorted(batch_files)
+            progress.append(scanned)
+        assert progress == sorted(progress)
+        assert progress[-1] == 50
+
+    def test_first_media_file_is_reported_immediately(self, tmp_path: Path) -> None:
+        for i in range(20):
+            (tmp_path / f"note{i}.txt").touch()
+        (tmp_path / "photo.jpg").touch()
+        first_files, _, scanned = next(b for b in iter_folder_batches(tmp_path, first_batch=1000) if b[0])
+        assert first_files == ["photo.jpg"]
+        assert scanned <= 21
+
+    def test_cancel_stops_scan(self, media_folder: Path) -> None:
+        assert list(iter_folder_batches(media_folder, cancelled=lambda: True)) == []
+
+    def test_missing_folder_raises(self, tmp_path: Path) -> None:
+        with pytest.raises(OSError):
+            list(iter_folder_batches(tmp_path / "missing"))
+
+    def test_is_media_name(self) -> None:
+        assert is_media_name("a.JPG")
+        assert is_media_name("clip.mkv")
+        assert not is_media_name("notes.txt")
+        assert not is_media_name(".jpg")
+
+
+class TestIterTreeBatches:
+    def test_walks_nested_folders_but_skips_hidden_and_excluded(self, tmp_path: Path) -> None:
+        for name in ["2024/01/a.jpg", "2024/01/b.mp4", "2024/02/c.png", "2024/notes.txt", "top.jpg"]:
+            (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / name).touch()
+        (tmp_path / ".cache").mkdir()
+        (tmp_path / ".cache" / "hidden.jpg").touch()
+        (tmp_path / "sorted" / "cats").mkdir(parents=True)
+        (tmp_path / "sorted" / "cats" / "done.jpg").touch()
+        (tmp_path / "sorted" / "loose.jpg").touch()
+        excluded = str(tmp_path / "sorted")
+        files: list[str] = []
+        for batch, _ in iter_tree_batches(tmp_path, skip=lambda path: path == excluded, first_batch=2):
+            assert batch == sorted(batch)
+            files = merge_sorted(files, batch)
+        expected = ["2024/01/a.jpg", "2024/01/b.mp4", "2024/02/c.png", "top.jpg"]
+        assert files == [str(tmp_path / name) for name in expected]
+
+    def test_first_media_file_is_reported_immediately(self, tmp_path: Path) -> None:
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "photo.jpg").touch()
+        for i in range(30):
+            (tmp_path / f"z{i:02d}").mkdir()
+        first, scanned = next(batch for batch in iter_tree_batches(tmp_path, first_batch=1000) if batch[0])
+        assert first == [str(tmp_path / "a" / "photo.jpg")]
+        # The root's own entries, then the photo; not the thirty folders after it
+        assert scanned == 32
+
+    def test_unreadable_root_raises_and_cancel_stops(self, media_folder: Path) -> None:
+        with pytest.raises(OSError):
+            list(iter_tree_batches(media_folder / "missing"))
+        assert list(iter_tree_batches(media_folder, cancelled=lambda: True)) == []
+        assert list(iter_tree_batches(media_folder, skip=lambda path: True)) == [([], 0)]
+
+    def test_distinct_roots_drops_nested_and_repeated_roots(self, tmp_path: Path) -> None:
+        a, b = tmp_path / "a", tmp_path / "b"
+        assert distinct_roots([a / "x", b, a, b / "."]) == [b, a]
+
+
+class TestSortedFileList:
+    def test_merge_keeps_order_and_drops_duplicates(self) -> None:
+        assert merge_sorted(["b.jpg", "d.jpg"], ["c.jpg", "a.jpg", "d.jpg"]) == ["a.jpg", "b.jpg", "c.jpg", "d.jpg"]
+
+    def test_merge_returns_new_list(self) -> None:
+        items = ["a.jpg"]
+        assert merge_sorted(items, []) is not items
+
+    def test_index_of(self) -> None:
+        items = ["a.jpg", "b.jpg", "c.jpg"]
+        assert index_of(items, "b.jpg") == 1
+        assert index_of(items, "bb.jpg") == -1
+        assert contains(items, "c.jpg")
+        assert not contains(items, "d.jpg")
+
+    def test_remove_names_keeps_order(self) -> None:
+        assert remove_names(["a.jpg", "b.jpg", "c.jpg"], ["b.jpg", "x.jpg"]) == ["a.jpg", "c.jpg"]
+
+    def test_diff_listing(self) -> None:
+        added, removed = diff_listing(["a.jpg", "b.jpg", "c.jpg"], {"a.jpg", "c.jpg", "e.jpg", "d.jpg"})
+        assert added == ["d.jpg", "e.jpg"]
+        assert removed == ["b.jpg"]
+
+    def test_diff_listing_ignores_touched_names(self) -> None:
+        added, removed = diff_listing(["a.jpg", "b.jpg"], {"b.jpg", "moving.jpg"}, {"a.jpg", "moving.jpg"})
+        assert added == []
+        assert removed == []
+
+    def test_remove_selection_keeps_surviving_current(self) -> None:
+        items = ["a.jpg", "b.jpg", "c.jpg", "d.jpg", "e.jpg"]
+        assert remove_selection(items, ["a.jpg", "d.jpg"], 2) == (["b.jpg", "c.jpg", "e.jpg"], 1)
+
+    def test_remove_selection_moves_to_successor(self) -> None:
+        items = ["a.jpg", "b.jpg", "c.jpg", "d.jpg", "e.jpg"]
+        assert remove_selection(items, ["b.jpg", "c.jpg", "d.jpg"], 1) == (["a.jpg", "e.jpg"], 1)
+        assert remove_selection(items, ["d.jpg", "e.jpg"], 4) == (["a.jpg", "b.jpg", "c.jpg"], 2)
+        assert remove_selection(items, items, 0) == ([], 0)
@@ -0,0 +1,61 @@
+"""Tests for perceptual hashing, the Hamming index and the hash store."""
+
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from image_hash import HashIndex, HashStore, dhash_from_gray, hamming
+
+
+def test_dhash_reads_rows_left_to_right():
+    # Every row falls from left to right, so every bit is set
+    row = bytes(range(90, 0, -10))
+    assert dhash_from_gray(row * 8, 9) == (1 << 64) - 1
+    # Padding past the ninth pixel of a row is ignored
+    assert dhash_from_gray((bytes(range(9)) + b"\xff" * 3) * 8, 12) == 0
+
+
+def test_index_finds_hashes_within_distance():
+    rnd = random.Random(7)
+    index = HashIndex()
+    values = [rnd.getrandbits(64) for _ in range(2000)]
+    for i, value in enumerate(values):
+        index.add(("", f"{i}.jpg"), value)
+    # Flip bits spread over different chunks
+    query = values[42] ^ (1 << 3) ^ (1 << 20) ^ (1 << 40) ^ (1 << 63)
+    found = index.find(query, 6)
+    assert found[0] == (4, ("", "42.jpg"))
+    assert all(hamming(query, index.get(key)) == distance <= 6 for distance, key in found)
+    assert ("", "42.jpg") not in [key for _, key in index.find(query, 3)]
+
+
+def test_index_move_and_remove():
+    index = HashIndex()
+    index.add(("", "a.jpg"), 0xFF)
+    index.add(("cats", "b.jpg"), 0xFF)
+    index.move(("", "a.jpg"), ("dogs", "a.jpg"))
+    assert sorted(key for _, key in index.find(0xFF, 0)) == [("cats", "b.jpg"), ("dogs", "a.jpg")]
+    index.remove(("cats", "b.jpg"))
+    assert index.find(0xFF, 0) == [(0, ("dogs", "a.jpg"))]
+    assert len(index) == 1
+
+
+def test_store_round_trips_full_width_hashes(tmp_path: Path):
+    store = HashStore(tmp_path / "hashes.sqlite3")
+    store.store([("a.jpg", 10, 100, (1 << 64) - 1), ("b.png", 20, 200, None), ("c.jpg", 30, 300, 5)])
+    found = store.lookup([("a.jpg", 10, 100), ("b.png", 20, 200), ("c.jpg", 30, 999), ("d.jpg", 1, 1)])
+    assert found == {("a.jpg", 10, 100): (1 << 64) - 1, ("b.png", 20, 200): None}
+
+
+def test_store_round_trips_signatures(tmp_path: Path):
+    store = HashStore(tmp_path / "hashes.sqlite3")
+    wide = (1 << 1300) | 0b1011
+    store.store_signatures([("a.jpg", 10, 100, wide), ("b.png", 20, 200, None)])
+    store.store([("a.jpg", 10, 100, 7)])
+    found = store.lookup_signatures([("a.jpg", 10, 100), ("b.png", 20, 200), ("c.jpg", 1, 1)])
+    assert found == {("a.jpg", 10, 100): wide, ("b.png", 20, 200): None}
+    assert store.lookup([("a.jpg", 10, 100)]) == {("a.jpg", 10, 100): 7}
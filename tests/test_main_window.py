@@ -0,0 +1,103 @@
+"""Tests of the main window against real folders, run headless."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+from PyQt6 import QtWidgets
+from PyQt6.QtCore import QEventLoop
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main
+
+IMAGES = Path(__file__).resolve().parent / "random_folder"
+
+
+@pytest.fixture(scope="module")
+def app() -> QtWidgets.QApplication:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture()
+def window(app: QtWidgets.QApplication, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[main.MainWindow]:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    window = main.MainWindow()
+    window.resize(800, 600)
+    window.show()
+    yield window
+    window.close()
+
+
+def wait_until(app: QtWidgets.QApplication, condition: Callable[[], bool], timeout: float = 10.0) -> bool:
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end:
+            return False
+        app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 20)
+        time.sleep(0.005)
+    return True
+
+
+def test_file_added_to_an_empty_folder_loads(app: QtWidgets.QApplication, window: main.MainWindow, tmp_path: Path):
+    folder = tmp_path / "empty"
+    folder.mkdir()
+    window.open_folder(folder)
+    assert wait_until(app, lambda: window.scan_progress is None)
+    assert window.files == []
+
+    shutil.copy(IMAGES / "cat1.jpg", folder / "new.jpg")
+    assert wait_until(app, lambda: window.files == ["new.jpg"])
+    assert wait_until(app, lambda: window.image_pyramid is not None and not window.image_pending)
+
+
+def test_filter_that_hides_everything_can_be_undone(
+    app: QtWidgets.QApplication, window: main.MainWindow, tmp_path: Path
+):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    for name in ("cat1.jpg", "cat2.jpg", "dog1.jpg"):
+        shutil.copy(IMAGES / name, folder / name)
+    window.open_folder(folder)
+    assert wait_until(app, lambda: window.scan_progress is None and len(window.files) == 3)
+
+    window.filterComboBox.setCurrentIndex(window.filterComboBox.findData("videos"))
+    assert window.files == []
+    assert "3 hidden by filter" in window.statusbar.currentMessage()
+
+    window.filterComboBox.setCurrentIndex(window.filterComboBox.findData("all"))
+    assert window.files == ["cat1.jpg", "cat2.jpg", "dog1.jpg"]
+    assert wait_until(app, lambda: window.image_pyramid is not None and not window.image_pending)
+    window.next_image()
+    assert wait_until(app, lambda: window.image_pyramid is not None and not window.image_pending)
+    assert window.media_path == folder.resolve() / "cat2.jpg"
+
+
+def test_source_files_are_probed_and_sorted_by_name(
+    app: QtWidgets.QApplication, window: main.MainWindow, tmp_path: Path
+):
+    folder = tmp_path / "images"
+    source = tmp_path / "source" / "trip"
+    folder.mkdir()
+    source.mkdir(parents=True)
+    shutil.copy(IMAGES / "cat2.jpg", folder / "b.jpg")
+    shutil.copy(IMAGES / "cat1.jpg", source / "a.jpg")
+    shutil.copy(IMAGES / "dog1.jpg", source / "c.jpg")
+    window.sources = [tmp_path / "source"]
+    window.open_folder(folder)
+    assert wait_until(app, lambda: window.scan_progress is None and window.source_progress is None)
+    paths = [str(source.resolve() / "a.jpg"), str(source.resolve() / "c.jpg")]
+    assert window.files == [paths[0], "b.jpg", paths[1]]
+
+    # Source files are placed by their probed size like the top-level one
+    window.filterComboBox.setCurrentIndex(window.filterComboBox.findData("small"))
+    window.sortComboBox.setCurrentIndex(window.sortComboBox.findData("pixels"))
+    assert wait_until(app, lambda: window.files == [paths[1], paths[0], "b.jpg"])
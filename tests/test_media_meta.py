@@ -0,0 +1,99 @@
+"""Tests for capture times and video dimensions read from file headers."""
+
+from __future__ import annotations
+
+import struct
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from media_meta import parse_exif_datetime, probe_header, tiff_capture_time
+
+
+def _tiff(order: str, ifd0: list[tuple[int, int, bytes]], exif: list[tuple[int, int, bytes]]) -> bytes:
+    """A TIFF structure with IFD0 pointing at an EXIF IFD; entries are (tag, type, value)."""
+    head = (b"II*\0" if order == "<" else b"MM\0*") + struct.pack(order + "I", 8)
+    ifd0_size = 2 + 12 * (len(ifd0) + 1) + 4
+    exif_offset = 8 + ifd0_size
+    exif_size = 2 + 12 * len(exif) + 4
+    data_offset = exif_offset + exif_size
+    blobs = b""
+
+    def table(entries: list[tuple[int, int, bytes]]) -> bytes:
+        nonlocal blobs
+        out = struct.pack(order + "H", len(entries))
+        for tag, kind, value in entries:
+            if len(value) > 4:
+                out += struct.pack(order + "HHII", tag, kind, len(value), data_offset + len(blobs))
+                blobs += value
+            else:
+                out += struct.pack(order + "HHI", tag, kind, len(value)) + value.ljust(4, b"\0")
+        return out + b"\0\0\0\0"
+
+    first = table([*ifd0, (0x8769, 4, struct.pack(order + "I", exif_offset))])
+    second = table(exif)
+    return head + first + second + blobs
+
+
+def _jpeg_with_exif(tiff: bytes) -> bytes:
+    app1 = b"Exif\0\0" + tiff
+    comment = b"hello"
+    return (
+        b"\xff\xd8"
+        + b"\xff\xfe"
+        + struct.pack(">H", len(comment) + 2)
+        + comment
+        + b"\xff\xe1"
+        + struct.pack(">H", len(app1) + 2)
+        + app1
+        + b"\xff\xda\0\x02"
+    )
+
+
+def _atom(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body) + 8) + kind + body
+
+
+def test_parse_exif_datetime():
+    expected = int(datetime(2021, 5, 4, 13, 2, 1, tzinfo=timezone.utc).timestamp())
+    assert parse_exif_datetime(b"2021:05:04 13:02:01\0") == expected
+    assert parse_exif_datetime(b"0000:00:00 00:00:00") is None
+    assert parse_exif_datetime(b"\xff\xfe") is None
+
+
+def test_capture_time_prefers_original_over_file_time():
+    original = b"2020:01:02 03:04:05\0"
+    changed = b"2023:01:01 00:00:00\0"
+    for order in "<>":
+        tiff = _tiff(order, [(0x0132, 2, changed)], [(0x9003, 2, original)])
+        assert tiff_capture_time(tiff) == parse_exif_datetime(original)
+    # Without an original time the IFD0 time is used
+    assert tiff_capture_time(_tiff("<", [(0x0132, 2, changed)], [])) == parse_exif_datetime(changed)
+    assert tiff_capture_time(b"not a tiff") is None
+
+
+def test_probe_jpeg_reads_exif_segment(tmp_path: Path):
+    original = b"2019:12:31 23:59:59\0"
+    path = tmp_path / "a.JPG"
+    path.write_bytes(_jpeg_with_exif(_tiff(">", [], [(0x9003, 2, original)])))
+    assert probe_header(path) == (0, 0, parse_exif_datetime(original))
+    bare = tmp_path / "b.jpg"
+    bare.write_bytes(b"\xff\xd8\xff\xdb\0\x04\0\0\xff\xda\0\x02")
+    assert probe_header(bare) == (0, 0, None)
+
+
+def test_probe_mp4_reads_movie_and_track_headers(tmp_path: Path):
+    created = 1_600_000_000
+    mvhd = _atom(b"mvhd", b"\0\0\0\0" + struct.pack(">II", created + 2082844800, 0) + b"\0" * 88)
+    # An audio track without dimensions comes first
+    audio = _atom(b"trak", _atom(b"tkhd", b"\0\0\0\x07" + b"\0" * 72 + struct.pack(">II", 0, 0)))
+    video = _atom(b"trak", _atom(b"tkhd", b"\0\0\0\x07" + b"\0" * 72 + struct.pack(">II", 1920 << 16, 1080 << 16)))
+    data = _atom(b"ftyp", b"isom\0\0\0\0") + _atom(b"mdat", b"\0" * 1000) + _atom(b"moov", mvhd + audio + video)
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(data)
+    assert probe_header(path) == (1920, 1080, created)
+    broken = tmp_path / "broken.mov"
+    broken.write_bytes(data[:40])
+    assert probe_header(broken) == (0, 0, None)
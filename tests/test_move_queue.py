@@ -0,0 +1,48 @@
+"""Tests for the bound on queued file moves."""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from PyQt6.QtCore import QCoreApplication, QEventLoop
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from move_queue import MoveQueue
+
+
+@pytest.fixture(scope="module")
+def app() -> QCoreApplication:
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def _moves(folder: Path, names: list[str]) -> list[tuple[Path, Path]]:
+    (folder / "cats").mkdir(exist_ok=True)
+    for name in names:
+        (folder / name).write_bytes(b"x")
+    return [(folder / name, folder / "cats" / name) for name in names]
+
+
+def test_batch_larger_than_remaining_capacity_is_refused(app: QCoreApplication, tmp_path: Path) -> None:
+    queue = MoveQueue(max_depth=3)
+    assert not queue.submit_many(_moves(tmp_path, ["a.jpg", "b.jpg", "c.jpg", "d.jpg"]))
+    assert queue.pending() == 0
+
+    assert queue.submit_many(_moves(tmp_path, ["e.jpg", "f.jpg"]))
+    # Completions are only counted once the event loop delivers them
+    assert queue.capacity() == 1
+    assert not queue.submit_many(_moves(tmp_path, ["g.jpg", "h.jpg"]))
+    assert queue.submit_many(_moves(tmp_path, ["g.jpg"]))
+    assert queue.is_full()
+
+    drained: list[bool] = []
+    queue.drained.connect(lambda: drained.append(True))
+    end = time.monotonic() + 10
+    while not drained and time.monotonic() < end:
+        app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 20)
+    assert drained == [True]
+    assert queue.capacity() == 3
+    assert sorted(path.name for path in (tmp_path / "cats").iterdir()) == ["e.jpg", "f.jpg", "g.jpg"]
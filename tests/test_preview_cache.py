@@ -0,0 +1,65 @@
+"""Tests for the on-disk preview cache."""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from preview_cache import PreviewCache, worth_caching
+
+
+@pytest.fixture()
+def source(tmp_path: Path) -> Path:
+    path = tmp_path / "scan.tiff"
+    path.write_bytes(b"x" * 100)
+    return path
+
+
+def _store(cache: PreviewCache, source: Path, dimension: int, size: int) -> Path:
+    dest = cache.path_for(source, os.stat(source), dimension, "jpg")
+    temp = cache.reserve(dest)
+    temp.write_bytes(b"r" * size)
+    cache.commit(temp, dest)
+    return dest
+
+
+class TestWorthCaching:
+    def test_slow_formats_only(self) -> None:
+        assert worth_caching("a.tiff", 50 * 1024 * 1024, 8000, 6000)
+        assert worth_caching("a.PNG", 1024, 8000, 6000)
+        assert not worth_caching("a.png", 1024, 800, 600)
+        assert not worth_caching("a.jpg", 50 * 1024 * 1024, 8000, 6000)
+
+
+class TestPreviewCache:
+    def test_miss_then_hit(self, tmp_path: Path, source: Path) -> None:
+        cache = PreviewCache(tmp_path / "previews", 10_000)
+        st = os.stat(source)
+        assert cache.lookup(source, st, 2560) is None
+        dest = _store(cache, source, 2560, 10)
+        assert cache.lookup(source, st, 2560) == dest
+        assert cache.lookup(source, st, 1920) is None
+
+    def test_changed_source_misses(self, tmp_path: Path, source: Path) -> None:
+        cache = PreviewCache(tmp_path / "previews", 10_000)
+        _store(cache, source, 2560, 10)
+        source.write_bytes(b"y" * 200)
+        assert cache.lookup(source, os.stat(source), 2560) is None
+
+    def test_evicts_least_recently_used(self, tmp_path: Path, source: Path) -> None:
+        cache = PreviewCache(tmp_path / "previews", 250)
+        st = os.stat(source)
+        old = _store(cache, source, 1, 100)
+        used = _store(cache, source, 2, 100)
+        os.utime(old, ns=(1_000_000_000, 1_000_000_000))
+        os.utime(used, ns=(2_000_000_000, 2_000_000_000))
+        assert cache.lookup(source, st, 2) == used
+        _store(cache, source, 3, 60)
+        assert not old.exists()
+        assert used.exists()
+        assert cache.lookup(source, st, 3) is not None
@@ -0,0 +1,49 @@
+"""Tests for freedesktop thumbnail cache naming and validation."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from thumbnail_cache import MTIME_KEY, URI_KEY, ThumbnailCache, file_uri, size_class
+
+
+class TestThumbnailCache:
+    def test_size_classes(self) -> None:
+        assert size_class(100) == 128
+        assert size_class(128) == 128
+        assert size_class(200) == 256
+        assert size_class(4000) == 1024
+
+    def test_paths_follow_the_standard(self, tmp_path: Path) -> None:
+        cache = ThumbnailCache(tmp_path / "thumbnails", 128, "sorter")
+        source = tmp_path / "my photo.jpg"
+        uri = file_uri(source)
+        assert uri == "file://" + str(tmp_path).replace(" ", "%20") + "/my%20photo.jpg"
+        expected = hashlib.md5(uri.encode()).hexdigest() + ".png"
+        assert cache.path_for(source) == tmp_path / "thumbnails" / "normal" / expected
+        assert cache.fail_path_for(source) == tmp_path / "thumbnails" / "fail" / "sorter" / expected
+        assert ThumbnailCache(tmp_path, 256, "sorter").path_for(source).parent.name == "large"
+
+    def test_current_only_while_mtime_matches(self, tmp_path: Path) -> None:
+        source = tmp_path / "a.jpg"
+        source.write_bytes(b"x")
+        text = ThumbnailCache.text_for(source, os.stat(source))
+        assert text[URI_KEY] == file_uri(source)
+        assert ThumbnailCache.is_current(text, os.stat(source))
+        os.utime(source, (0, 1_000_000))
+        assert not ThumbnailCache.is_current(text, os.stat(source))
+        assert not ThumbnailCache.is_current({}, os.stat(source))
+        assert text[MTIME_KEY].isdigit()
+
+    def test_temp_path_is_private_and_beside_dest(self, tmp_path: Path) -> None:
+        dest = tmp_path / "thumbnails" / "normal" / "abc.png"
+        temp = ThumbnailCache.temp_path(dest)
+        assert temp.parent == dest.parent
+        assert temp.exists()
+        assert temp.stat().st_mode & 0o777 == 0o600
+        assert dest.parent.stat().st_mode & 0o777 == 0o700
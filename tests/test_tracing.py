@@ -0,0 +1,63 @@
+"""Tests for timing spans and their Chrome trace export."""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tracing import Tracer
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    with tracer.span("decode", file="a.jpg"):
+        pass
+    tracer.instant("player_state", state="PlayingState")
+    tracer.finish("load", tracer.start())
+    assert tracer.start() is None
+    assert tracer.chrome_trace()["traceEvents"] == []
+    assert tracer.percentile("decode", 0.5) is None
+
+
+def test_percentile_and_breakdown():
+    tracer = Tracer()
+    tracer.enabled = True
+    for ms in range(1, 101):
+        tracer.record("load", 0, ms * 1_000_000, file=f"{ms}.jpg")
+    assert tracer.percentile("load", 0.5) == 51.0
+    assert tracer.percentile("load", 0.95) == 96.0
+    tracer.record("decode", 0, 3_000_000, file="a.jpg")
+    tracer.record("decode", 0, 5_000_000, file="b.jpg")
+    tracer.record("scale", 0, 1_500_000, file="a.jpg", smooth=True)
+    # The latest event of each name whose args match
+    assert tracer.breakdown(["decode", "scale", "read"], file="a.jpg") == {"decode": 3.0, "scale": 1.5}
+    assert tracer.breakdown(["decode"]) == {"decode": 5.0}
+    tracer.clear()
+    assert tracer.percentile("load", 0.5) is None
+
+
+def test_ring_buffer_is_bounded():
+    tracer = Tracer(capacity=10)
+    tracer.enabled = True
+    for _ in range(25):
+        with tracer.span("move_file"):
+            pass
+    assert len(tracer.chrome_trace()["traceEvents"]) == 10 + 1
+
+
+def test_chrome_trace_export(tmp_path: Path):
+    tracer = Tracer()
+    tracer.enabled = True
+    with tracer.span("decode", file="a.jpg"):
+        pass
+    tracer.instant("player_error", message="broken")
+    path = tmp_path / "trace.json"
+    assert tracer.export(path) == 3
+    events = json.loads(path.read_text())["traceEvents"]
+    assert [event["ph"] for event in events] == ["M", "X", "i"]
+    assert events[0]["args"]["name"] == "MainThread"
+    assert events[1]["name"] == "decode" and events[1]["args"] == {"file": "a.jpg"} and events[1]["dur"] >= 0
+    assert events[2]["args"] == {"message": "broken"}
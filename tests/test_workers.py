@@ -0,0 +1,66 @@
+"""Tests for the process pool fallback of the background jobs."""
+
+from __future__ import annotations
+
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import workers
+from workers import _ProcessMap
+
+
+class _FailingExecutor:
+    """Stands in for ProcessPoolExecutor; fails the way a broken spawn bootstrap or pickling does."""
+
+    error: Exception = RuntimeError("An attempt has been made to start a new process before bootstrapping")
+    started = 0
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        type(self).started += 1
+
+    def map(self, *args: object, **kwargs: object) -> list[object]:
+        raise self.error
+
+    def shutdown(self, *args: object, **kwargs: object) -> None:
+        pass
+
+
+@pytest.fixture()
+def failing_pool(monkeypatch: pytest.MonkeyPatch) -> type[_FailingExecutor]:
+    _FailingExecutor.started = 0
+    monkeypatch.setattr(workers, "ProcessPoolExecutor", _FailingExecutor)
+    return _FailingExecutor
+
+
+@pytest.mark.parametrize("error", [RuntimeError("bootstrap"), pickle.PicklingError("lambda"), ValueError("x")])
+def test_pool_failure_falls_back_to_the_calling_thread(failing_pool: type[_FailingExecutor], error: Exception):
+    failing_pool.error = error
+    pool = _ProcessMap(2)
+    assert pool.map(abs, [-1, 2, -3]) == [1, 2, 3]
+    # Later calls do not try to start processes again
+    assert pool.map(abs, [-4]) == [4]
+    assert failing_pool.started == 1
+    pool.shutdown()
+
+
+def test_feature_scan_extracts_signatures_without_worker_processes(
+    failing_pool: type[_FailingExecutor], tmp_path: Path
+):
+    images = Path(__file__).resolve().parent / "random_folder"
+    (tmp_path / "cats").mkdir()
+    (tmp_path / "cats" / "cat1.jpg").write_bytes((images / "cat1.jpg").read_bytes())
+    (tmp_path / "dog1.jpg").write_bytes((images / "dog1.jpg").read_bytes())
+    scan = workers.FeatureScan(tmp_path, ["cats"])
+    found: list[tuple[str, str, int]] = []
+    finished: list[bool] = []
+    scan.signatures.connect(found.extend)
+    scan.finished.connect(lambda: finished.append(True))
+    scan._run()
+    assert failing_pool.started == 1
+    assert [(category, name) for category, name, _ in found] == [("cats", "cat1.jpg"), ("", "dog1.jpg")]
+    assert finished == [True]
@@ -16,6 +16,7 @@ _COLORS = {
         "surface": "#383838",
         "danger": "#ef5350",
         "danger_hover": "#e57373",
+        "suggest": "#ffb74d",
     },
     "light": {
         "accent": "#1976d2",
@@ -25,6 +26,7 @@ _COLORS = {
         "surface": "#f5f5f5",
         "danger": "#d32f2f",
         "danger_hover": "#c62828",
+        "suggest": "#ef6c00",
     },
 }
 
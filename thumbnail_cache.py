@@ -0,0 +1,79 @@
+"""Locations and validity rules for cached thumbnails (no Qt dependencies).
+
+Thumbnails follow the freedesktop.org Thumbnail Managing Standard: a PNG named
+after the MD5 of the file's URI under thumbnails/normal (128 px) or
+thumbnails/large (256 px), tagged with Thumb::URI and Thumb::MTime. Other
+programs on the desktop can reuse them, and a thumbnail is only trusted while
+its Thumb::MTime still matches the file."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+# Freedesktop size classes, largest dimension in pixels
+SIZE_DIRS = {128: "normal", 256: "large", 512: "x-large", 1024: "xx-large"}
+
+URI_KEY = "Thumb::URI"
+MTIME_KEY = "Thumb::MTime"
+SIZE_KEY = "Thumb::Size"
+
+
+def size_class(size: int) -> int:
+    """Smallest freedesktop size class that holds a thumbnail of size pixels."""
+    for dimension in SIZE_DIRS:
+        if size <= dimension:
+            return dimension
+    return max(SIZE_DIRS)
+
+
+def file_uri(path: Path) -> str:
+    return path.absolute().as_uri()
+
+
+class ThumbnailCache:
+    """Maps source files to thumbnail paths under root, usually $XDG_CACHE_HOME/thumbnails."""
+
+    def __init__(self, root: Path, size: int, app_name: str) -> None:
+        self.root = root
+        self.size = size_class(size)
+        self.folder = root / SIZE_DIRS[self.size]
+        self.fail_folder = root / "fail" / app_name
+
+    def key(self, source: Path) -> tuple[str, str]:
+        """(URI, file name) used to store the thumbnail of source."""
+        uri = file_uri(source)
+        # The standard names thumbnails after the MD5 of the URI
+        return uri, hashlib.md5(uri.encode()).hexdigest() + ".png"
+
+    def path_for(self, source: Path) -> Path:
+        return self.folder / self.key(source)[1]
+
+    def fail_path_for(self, source: Path) -> Path:
+        return self.fail_folder / self.key(source)[1]
+
+    @staticmethod
+    def text_for(source: Path, st: os.stat_result) -> dict[str, str]:
+        """The PNG text chunks a thumbnail of source must carry."""
+        return {URI_KEY: file_uri(source), MTIME_KEY: mtime_text(st), SIZE_KEY: str(st.st_size)}
+
+    @staticmethod
+    def is_current(text: dict[str, str], st: os.stat_result) -> bool:
+        """True when a thumbnail's text chunks still describe the file as it is on disk."""
+        return text.get(MTIME_KEY) == mtime_text(st)
+
+    @staticmethod
+    def temp_path(dest: Path) -> Path:
+        """A unique file next to dest for writing a thumbnail before renaming it into place."""
+        dest.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(prefix=".", suffix=".png", dir=dest.parent)
+        os.close(fd)
+        os.chmod(name, 0o600)
+        return Path(name)
+
+
+def mtime_text(st: os.stat_result) -> str:
+    """Thumb::MTime is the modification time in whole seconds."""
+    return str(int(st.st_mtime))
@@ -0,0 +1,226 @@
+"""Thumbnail generation for the grid view, backed by the shared freedesktop thumbnail cache."""
+
+from __future__ import annotations
+
+import contextlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from PyQt6.QtCore import QObject, QRunnable, QSize, Qt, QThread, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QPixmap
+
+from constants import CACHE_DIR_NAME, THUMBNAIL_CACHE_SIZE, THUMBNAIL_MAX_PENDING, THUMBNAIL_SIZE
+from media_loader import is_image_name
+from thumbnail_cache import ThumbnailCache
+
+if TYPE_CHECKING:
+    from video_poster import PosterFrameGrabber
+
+
+class _Ticket:
+    __slots__ = ("cancelled",)
+
+    def __init__(self) -> None:
+        self.cancelled = False
+
+
+class _ThumbnailSignals(QObject):
+    # name, generation, QImage (null when the file has no usable thumbnail), needs a video poster frame
+    done = pyqtSignal(str, int, object, bool)
+
+
+def _load_cached(path: Path, st: os.stat_result) -> QImage | None:
+    image = QImage(str(path))
+    if image.isNull():
+        return None
+    text = {key: image.text(key) for key in image.textKeys()}
+    return image if ThumbnailCache.is_current(text, st) else None
+
+
+def save_thumbnail(cache: ThumbnailCache, source: Path, image: QImage, failed: bool = False) -> None:
+    """Writes a thumbnail atomically; failed=True records a file that could not be thumbnailed."""
+    try:
+        st = os.stat(source)
+        dest = cache.fail_path_for(source) if failed else cache.path_for(source)
+        temp = cache.temp_path(dest)
+    except OSError:
+        return
+    if failed:
+        image = QImage(1, 1, QImage.Format.Format_ARGB32)
+        image.fill(Qt.GlobalColor.transparent)
+    for key, value in ThumbnailCache.text_for(source, st).items():
+        image.setText(key, value)
+    if image.save(str(temp), "PNG"):
+        with contextlib.suppress(OSError):
+            os.replace(temp, dest)
+            return
+    with contextlib.suppress(OSError):
+        temp.unlink()
+
+
+class _ThumbnailTask(QRunnable):
+    def __init__(
+        self, name: str, path: Path, cache: ThumbnailCache, generation: int, ticket: _Ticket, signals: _ThumbnailSignals
+    ) -> None:
+        super().__init__()
+        self._name = name
+        self._path = path
+        self._cache = cache
+        self._generation = generation
+        self._ticket = ticket
+        self._signals = signals
+
+    def run(self) -> None:
+        if self._ticket.cancelled:
+            return
+        try:
+            st = os.stat(self._path)
+        except OSError:
+            self._signals.done.emit(self._name, self._generation, QImage(), False)
+            return
+
+        image = _load_cached(self._cache.path_for(self._path), st)
+        if image is None and _load_cached(self._cache.fail_path_for(self._path), st) is not None:
+            image = QImage()
+        if image is None:
+            if not is_image_name(self._name):
+                self._signals.done.emit(self._name, self._generation, QImage(), True)
+                return
+            image = self._decode()
+            if self._ticket.cancelled:
+                return
+            save_thumbnail(self._cache, self._path, image, failed=image.isNull())
+        self._signals.done.emit(self._name, self._generation, image, False)
+
+    def _decode(self) -> QImage:
+        reader = QImageReader(str(self._path))
+        reader.setAutoTransform(True)
+        size = reader.size()
+        bound = QSize(self._cache.size, self._cache.size)
+        if size.isValid() and (size.width() > bound.width() or size.height() > bound.height()):
+            # Scaling happens before EXIF rotation, which does not change the bounding square
+            reader.setScaledSize(size.scaled(bound, Qt.AspectRatioMode.KeepAspectRatio))
+        return reader.read()
+
+
+class ThumbnailLoader(QObject):
+    """Produces thumbnails on demand for files in one folder.
+
+    get() answers from memory and otherwise queues a background job. Jobs
+    check the on-disk cache first, so a folder that was seen before never
+    decodes again. The newest requests run first and the oldest are dropped
+    once THUMBNAIL_MAX_PENDING are waiting, which keeps fast scrolling from
+    queueing work for rows that have long left the screen. Video thumbnails
+    come from a poster frame grabbed by PosterFrameGrabber, which is only
+    created (and QtMultimedia only imported) for the first video.
+
+    size must be one of the freedesktop sizes; cache_size bounds the number
+    of pixmaps kept in memory."""
+
+    thumbnail_ready = pyqtSignal(str)
+
+    def __init__(
+        self,
+        cache_root: Path,
+        size: int = THUMBNAIL_SIZE,
+        cache_size: int = THUMBNAIL_CACHE_SIZE,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.cache = ThumbnailCache(cache_root, size, CACHE_DIR_NAME)
+        self._cache_size = cache_size
+        self._folder: Path | None = None
+        self._generation = 0
+        self._sequence = 0
+        self._pixmaps: OrderedDict[str, QPixmap] = OrderedDict()
+        self._missing: set[str] = set()
+        self._pending: OrderedDict[str, _Ticket] = OrderedDict()
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, QThread.idealThreadCount() // 2))
+        self._signals = _ThumbnailSignals(self)
+        self._signals.done.connect(self._on_done)
+
+        self._size = size
+        self._posters: PosterFrameGrabber | None = None
+
+    def reset(self, folder: Path | None) -> None:
+        for ticket in self._pending.values():
+            ticket.cancelled = True
+        self._pending.clear()
+        self._pool.clear()
+        if self._posters is not None:
+            self._posters.clear()
+        self._pixmaps.clear()
+        self._missing.clear()
+        self._folder = folder
+        self._generation += 1
+
+    def get(self, name: str) -> QPixmap | None:
+        """Returns the thumbnail of name if it is ready, queueing it otherwise."""
+        pixmap = self._pixmaps.get(name)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(name)
+            return pixmap
+        if name in self._missing or self._folder is None:
+            return None
+        if name in self._pending:
+            self._pending.move_to_end(name)
+            return None
+
+        while len(self._pending) >= THUMBNAIL_MAX_PENDING:
+            _, ticket = self._pending.popitem(last=False)
+            ticket.cancelled = True
+        ticket = _Ticket()
+        self._pending[name] = ticket
+        self._sequence += 1
+        task = _ThumbnailTask(name, self._folder / name, self.cache, self._generation, ticket, self._signals)
+        self._pool.start(task, self._sequence)
+        return None
+
+    def discard(self, name: str) -> None:
+        self._pixmaps.pop(name, None)
+        self._missing.discard(name)
+        ticket = self._pending.pop(name, None)
+        if ticket is not None:
+            ticket.cancelled = True
+
+    def _on_done(self, name: str, generation: int, image: QImage, needs_poster: bool) -> None:
+        if generation != self._generation or self._pending.pop(name, None) is None:
+            return
+        if needs_poster:
+            self._poster_grabber().grab(name, self._folder / name)
+            return
+        self._store(name, image)
+
+    def _poster_grabber(self) -> PosterFrameGrabber:
+        if self._posters is None:
+            from video_poster import PosterFrameGrabber
+
+            self._posters = PosterFrameGrabber(QSize(self._size, self._size), self)
+            self._posters.grabbed.connect(self._on_poster)
+        return self._posters
+
+    def _on_poster(self, name: str, path: Path, image: QImage, failed: bool) -> None:
+        # Posters of a folder that was left meanwhile; names may be nested or absolute paths
+        if self._folder is None or path != self._folder / name:
+            return
+        # A grab that timed out is not cached, so the video is tried again the next time the folder is opened
+        if not image.isNull() or failed:
+            save_thumbnail(self.cache, path, image, failed=failed)
+        self._store(name, image)
+
+    def _store(self, name: str, image: QImage) -> None:
+        if image.isNull():
+            self._missing.add(name)
+        else:
+            self._pixmaps[name] = QPixmap.fromImage(image)
+            while len(self._pixmaps) > self._cache_size:
+                self._pixmaps.popitem(last=False)
+        self.thumbnail_ready.emit(name)
+
+    def shutdown(self) -> None:
+        self.reset(None)
+        self._pool.waitForDone()
@@ -0,0 +1,433 @@
+"""Zoom and pan viewer that decodes only the visible part of an image, tile by tile."""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from PyQt6.QtCore import QObject, QPoint, QPointF, QRect, QRectF, QRunnable, QSize, Qt, QThread, QThreadPool, pyqtSignal
+from PyQt6.QtGui import (
+    QColor,
+    QImage,
+    QImageIOHandler,
+    QImageReader,
+    QMouseEvent,
+    QPainter,
+    QPaintEvent,
+    QResizeEvent,
+    QTransform,
+    QWheelEvent,
+)
+from PyQt6.QtWidgets import QWidget
+
+from constants import ZOOM_FALLBACK_PIXELS, ZOOM_MAX_FACTOR, ZOOM_TILE_CACHE_BYTES, ZOOM_TILE_SIZE
+
+# Wheel zoom per 15 degree notch
+_WHEEL_STEP = 1.25
+
+# (level of detail, column, row); level n decodes at 1/2**n of full resolution
+TileKey = tuple[int, int, int]
+
+
+def orientation_transform(transformation: QImageIOHandler.Transformation, stored: QSize) -> QTransform:
+    """Maps stored pixel coordinates to displayed ones, the way QImageReader's auto-transform does.
+
+    Mirroring and flipping come first, then the 90 degree clockwise rotation."""
+    flags = QImageIOHandler.Transformation
+    width, height = stored.width(), stored.height()
+    mirror = QTransform()
+    if transformation & flags.TransformationMirror:
+        mirror *= QTransform(-1, 0, 0, 1, width, 0)
+    if transformation & flags.TransformationFlip:
+        mirror *= QTransform(1, 0, 0, -1, 0, height)
+    if transformation & flags.TransformationRotate90:
+        mirror *= QTransform(0, 1, -1, 0, height, 0)
+    return mirror
+
+
+class _RegionSource:
+    """Decodes tiles straight from the file; for formats whose reader supports clip rects (JPEG)."""
+
+    # Fraction of the stored resolution that tiles can show
+    detail = 1.0
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+
+    def resident_bytes(self) -> int:
+        return 0
+
+    def release(self) -> None:
+        pass
+
+    def decode(self, rect: QRect, size: QSize) -> QImage:
+        reader = QImageReader(str(self._path))
+        reader.setAutoTransform(False)
+        reader.setClipRect(rect)
+        reader.setScaledSize(size)
+        return reader.read()
+
+
+class _WholeSource:
+    """For formats that can only be read whole: one decode, capped at ZOOM_FALLBACK_PIXELS, shared by all tiles.
+
+    The decoded image counts against ZOOM_TILE_CACHE_BYTES; detail tells how
+    much of the stored resolution survived the cap."""
+
+    def __init__(self, path: Path, stored: QSize) -> None:
+        self._path = path
+        self._stored = stored
+        self._lock = threading.Lock()
+        self._image: QImage | None = None
+        self._released = False
+        pixels = stored.width() * stored.height()
+        self.detail = min(1.0, math.sqrt(ZOOM_FALLBACK_PIXELS / pixels)) if pixels else 1.0
+
+    def resident_bytes(self) -> int:
+        image = self._image
+        return image.sizeInBytes() if image is not None else 0
+
+    def release(self) -> None:
+        """Frees the decoded image; bands still queued get null images instead of decoding it again."""
+        with self._lock:
+            self._released = True
+            self._image = None
+
+    def _load(self) -> QImage:
+        with self._lock:
+            if self._released:
+                return QImage()
+            if self._image is None:
+                reader = QImageReader(str(self._path))
+                reader.setAutoTransform(False)
+                if self.detail < 1:
+                    reader.setScaledSize(self._stored * self.detail)
+                self._image = reader.read()
+            return self._image
+
+    def decode(self, rect: QRect, size: QSize) -> QImage:
+        image = self._load()
+        if image.isNull():
+            return image
+        factor = image.width() / self._stored.width()
+        scaled_rect = QRectF(rect.x() * factor, rect.y() * factor, rect.width() * factor, rect.height() * factor)
+        part = image.copy(scaled_rect.toAlignedRect())
+        if part.size() == size:
+            return part
+        return part.scaled(size, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+
+class _Ticket:
+    __slots__ = ("cancelled",)
+
+    def __init__(self) -> None:
+        self.cancelled = False
+
+
+class _TileSignals(QObject):
+    decoded = pyqtSignal(int, object)
+
+
+class _BandTask(QRunnable):
+    """Decodes adjacent tiles of one row with a single read and splits the result.
+
+    A JPEG region read has to decode every scanline above the region, so one
+    read per row of tiles costs about as much as one read per tile."""
+
+    def __init__(
+        self,
+        source: _RegionSource | _WholeSource,
+        keys: list[TileKey],
+        rect: QRect,
+        size: QSize,
+        generation: int,
+        ticket: _Ticket,
+        signals: _TileSignals,
+    ) -> None:
+        super().__init__()
+        self._source = source
+        self._keys = keys
+        self._rect = rect
+        self._size = size
+        self._generation = generation
+        self._ticket = ticket
+        self._signals = signals
+
+    def run(self) -> None:
+        if self._ticket.cancelled:
+            return
+        band = self._source.decode(self._rect, self._size)
+        if self._ticket.cancelled or band.isNull():
+            return
+        tiles = []
+        for index, key in enumerate(self._keys):
+            width = min(ZOOM_TILE_SIZE, band.width() - index * ZOOM_TILE_SIZE)
+            tiles.append((key, band.copy(index * ZOOM_TILE_SIZE, 0, width, band.height())))
+        self._signals.decoded.emit(self._generation, tiles)
+
+
+class TileViewer(QWidget):
+    """Shows one image at any zoom, decoding ZOOM_TILE_SIZE tiles of the visible region on demand.
+
+    Tiles are cut in stored (pre-EXIF-rotation) coordinates at the coarsest
+    power-of-two level that still gives one decoded pixel per device pixel,
+    so memory depends on the window size and the bounded tile cache, not on
+    the size of the source. Until a tile arrives, the already decoded
+    screen-size image is drawn in its place.
+
+    Wheel zooms around the cursor, dragging pans, and a double-click or
+    zooming out past the fitted size emits exit_requested."""
+
+    exit_requested = pyqtSignal()
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._path: Path | None = None
+        self._source: _RegionSource | _WholeSource | None = None
+        self._backdrop: QImage | None = None
+        self._stored = QSize()
+        self._orientation = QTransform()
+        self._display = QSize()
+        self._scale = 1.0
+        self._center = QPointF()
+        self._drag_from: QPointF | None = None
+
+        self._generation = 0
+        self._tiles: OrderedDict[TileKey, QImage] = OrderedDict()
+        self._tile_bytes = 0
+        self._pending: dict[TileKey, _Ticket] = {}
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(2, QThread.idealThreadCount() // 2))
+        self._signals = _TileSignals(self)
+        self._signals.decoded.connect(self._on_decoded)
+
+        self.setCursor(Qt.CursorShape.OpenHandCursor)
+
+    def open(self, path: Path, backdrop: QImage, anchor: QPointF, scale: float | None = None) -> bool:
+        """Shows path zoomed to scale (1:1 device pixels when None) around anchor; False if unreadable."""
+        self.clear()
+        reader = QImageReader(str(path))
+        stored = reader.size()
+        if not stored.isValid():
+            return False
+        self._path = path
+        self._stored = stored
+        self._orientation = orientation_transform(reader.transformation(), stored)
+        self._display = self._orientation.mapRect(QRect(0, 0, stored.width(), stored.height())).size()
+        self._backdrop = backdrop
+        if reader.supportsOption(QImageIOHandler.ImageOption.ClipRect):
+            self._source = _RegionSource(path)
+        else:
+            self._source = _WholeSource(path, stored)
+        self._scale = self.fit_scale()
+        self._center = QPointF(self._display.width() / 2, self._display.height() / 2)
+        self.set_scale(scale if scale is not None else 1 / self.devicePixelRatioF(), anchor)
+        return True
+
+    def clear(self) -> None:
+        """Drops the image and every tile, cancelling queued decodes."""
+        self._generation += 1
+        for ticket in self._pending.values():
+            ticket.cancelled = True
+        self._pending.clear()
+        self._pool.clear()
+        self._tiles.clear()
+        self._tile_bytes = 0
+        self._path = None
+        if self._source is not None:
+            self._source.release()
+        self._source = None
+        self._backdrop = None
+
+    def shutdown(self) -> None:
+        self.clear()
+        self._pool.waitForDone()
+
+    def detail(self) -> float:
+        """Fraction of the image's resolution that zooming can show; below 1 for large images of formats read whole."""
+        return self._source.detail if self._source is not None else 1.0
+
+    def fit_scale(self) -> float:
+        if self._display.isEmpty() or self.width() <= 0 or self.height() <= 0:
+            return 1.0
+        return min(self.width() / self._display.width(), self.height() / self._display.height())
+
+    def set_scale(self, scale: float, anchor: QPointF) -> None:
+        """Zooms to scale (widget pixels per image pixel) keeping the image point under anchor in place."""
+        if self._path is None:
+            return
+        point = self._view_transform().inverted()[0].map(anchor)
+        self._scale = min(max(scale, self.fit_scale()), ZOOM_MAX_FACTOR / self.devicePixelRatioF())
+        offset = anchor - QPointF(self.width() / 2, self.height() / 2)
+        self._center = point - offset / self._scale
+        self._clamp_center()
+        self.update()
+
+    def _clamp_center(self) -> None:
+        for axis, visible in (("x", self.width() / self._scale), ("y", self.height() / self._scale)):
+            extent = self._display.width() if axis == "x" else self._display.height()
+            value = getattr(self._center, axis)()
+            value = extent / 2 if visible >= extent else min(max(value, visible / 2), extent - visible / 2)
+            getattr(self._center, "set" + axis.upper())(value)
+
+    def _view_transform(self) -> QTransform:
+        view = QTransform()
+        view.translate(self.width() / 2, self.height() / 2)
+        view.scale(self._scale, self._scale)
+        view.translate(-self._center.x(), -self._center.y())
+        return view
+
+    def _level(self) -> int:
+        device_scale = self._scale * self.devicePixelRatioF()
+        if device_scale >= 1:
+            return 0
+        max_level = max(0, math.ceil(math.log2(max(self._stored.width(), self._stored.height()) / ZOOM_TILE_SIZE)))
+        return min(max_level, math.floor(math.log2(1 / device_scale) + 1e-6))
+
+    def _tile_geometry(self, key: TileKey) -> tuple[QRect, QSize]:
+        """Stored-pixel rect of a tile and the size it decodes to."""
+        level, column, row = key
+        span = ZOOM_TILE_SIZE << level
+        rect = QRect(column * span, row * span, span, span).intersected(
+            QRect(0, 0, self._stored.width(), self._stored.height())
+        )
+        size = QSize(max(1, math.ceil(rect.width() / (1 << level))), max(1, math.ceil(rect.height() / (1 << level))))
+        return rect, size
+
+    def _visible_tiles(self, transform: QTransform) -> list[TileKey]:
+        level = self._level()
+        span = ZOOM_TILE_SIZE << level
+        visible = transform.inverted()[0].mapRect(QRectF(self.rect()))
+        visible = visible.intersected(QRectF(0, 0, self._stored.width(), self._stored.height()))
+        if visible.isEmpty():
+            return []
+        first_column, last_column = int(visible.left()) // span, math.ceil(visible.right()) // span
+        first_row, last_row = int(visible.top()) // span, math.ceil(visible.bottom()) // span
+        center_column, center_row = (first_column + last_column) / 2, (first_row + last_row) / 2
+        keys = [
+            (level, column, row)
+            for row in range(first_row, last_row + 1)
+            for column in range(first_column, last_column + 1)
+            if column * span < self._stored.width() and row * span < self._stored.height()
+        ]
+        # Centre tiles first
+        keys.sort(key=lambda k: abs(k[1] - center_column) + abs(k[2] - center_row))
+        return keys
+
+    def paintEvent(self, event: QPaintEvent | None) -> None:
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.palette().window())
+        if self._path is None:
+            return
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+
+        view = self._view_transform()
+        if self._backdrop is not None:
+            painter.setTransform(view)
+            painter.drawImage(QRectF(0, 0, self._display.width(), self._display.height()), self._backdrop)
+
+        transform = self._orientation * view
+        painter.setTransform(transform)
+        wanted = self._visible_tiles(transform)
+        missing: dict[int, list[TileKey]] = {}
+        for key in wanted:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                painter.drawImage(QRectF(self._tile_geometry(key)[0]), tile)
+            elif key not in self._pending:
+                missing.setdefault(key[2], []).append(key)
+        painter.resetTransform()
+        if self._scale * self.devicePixelRatioF() > self.detail():
+            self._paint_detail_note(painter)
+        painter.end()
+
+        wanted_set = set(wanted)
+        kept = {id(self._pending[key]) for key in wanted_set if key in self._pending}
+        for key in [k for k in self._pending if k not in wanted_set]:
+            ticket = self._pending.pop(key)
+            if id(ticket) not in kept:
+                ticket.cancelled = True
+        for priority, keys in enumerate(reversed(missing.values())):
+            self._request(keys, priority)
+
+    def _paint_detail_note(self, painter: QPainter) -> None:
+        """Says that the zoomed image is softer than the file, rather than passing it off as 1:1"""
+        text = f"Zoom detail limited to {self.detail():.0%} of full resolution for this format"
+        rect = painter.fontMetrics().boundingRect(text).adjusted(-6, -3, 6, 3)
+        rect.moveTopLeft(QPoint(8, 8))
+        painter.fillRect(rect, QColor(0, 0, 0, 160))
+        painter.setPen(Qt.GlobalColor.white)
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
+
+    def _request(self, keys: list[TileKey], priority: int) -> None:
+        """Queues one band decode for tiles of the same row, splitting it where columns are not adjacent"""
+        keys.sort()
+        start = 0
+        for end in range(1, len(keys) + 1):
+            if end == len(keys) or keys[end][1] != keys[end - 1][1] + 1:
+                self._request_band(keys[start:end], priority)
+                start = end
+
+    def _request_band(self, keys: list[TileKey], priority: int) -> None:
+        first, first_size = self._tile_geometry(keys[0])
+        last, last_size = self._tile_geometry(keys[-1])
+        rect = first.united(last)
+        size = QSize(first_size.width() * (len(keys) - 1) + last_size.width(), first_size.height())
+        ticket = _Ticket()
+        for key in keys:
+            self._pending[key] = ticket
+        self._pool.start(_BandTask(self._source, keys, rect, size, self._generation, ticket, self._signals), priority)
+
+    def _on_decoded(self, generation: int, tiles: list[tuple[TileKey, QImage]]) -> None:
+        if generation != self._generation:
+            return
+        for key, image in tiles:
+            self._pending.pop(key, None)
+            if key in self._tiles:
+                continue
+            self._tiles[key] = image
+            self._tile_bytes += image.sizeInBytes()
+        budget = ZOOM_TILE_CACHE_BYTES - self._source.resident_bytes()
+        while self._tile_bytes > budget and len(self._tiles) > 1:
+            _, old = self._tiles.popitem(last=False)
+            self._tile_bytes -= old.sizeInBytes()
+        self.update()
+
+    def wheelEvent(self, event: QWheelEvent | None) -> None:
+        steps = event.angleDelta().y() / 120
+        if not steps or self._path is None:
+            return
+        if steps < 0 and self._scale <= self.fit_scale() * 1.001:
+            self.exit_requested.emit()
+            return
+        self.set_scale(self._scale * _WHEEL_STEP**steps, event.position())
+
+    def mousePressEvent(self, event: QMouseEvent | None) -> None:
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._drag_from = event.position()
+            self.setCursor(Qt.CursorShape.ClosedHandCursor)
+
+    def mouseMoveEvent(self, event: QMouseEvent | None) -> None:
+        if self._drag_from is None:
+            return
+        delta = event.position() - self._drag_from
+        self._drag_from = event.position()
+        self._center -= delta / self._scale
+        self._clamp_center()
+        self.update()
+
+    def mouseReleaseEvent(self, event: QMouseEvent | None) -> None:
+        self._drag_from = None
+        self.setCursor(Qt.CursorShape.OpenHandCursor)
+
+    def mouseDoubleClickEvent(self, event: QMouseEvent | None) -> None:
+        self.exit_requested.emit()
+
+    def resizeEvent(self, event: QResizeEvent | None) -> None:
+        if self._path is not None:
+            self._scale = max(self._scale, self.fit_scale())
+            self._clamp_center()
+        super().resizeEvent(event)
@@ -0,0 +1,144 @@
+"""Timing spans around hot paths, exportable as a Chrome trace (no Qt dependencies).
+
+Spans are recorded into a bounded ring buffer from any thread. While the
+tracer is disabled span() hands out one shared no-op context manager, so an
+instrumented call costs an attribute check and nothing else.
+
+Open an exported file in chrome://tracing or https://ui.perfetto.dev."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+from constants import TRACE_CAPACITY
+
+# Durations kept per span name for percentiles
+_HISTORY = 512
+# How many recent events breakdown() looks through
+_BREAKDOWN_WINDOW = 4096
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> _NullSpan:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_args", "_name", "_start", "_tracer")
+
+    def __init__(self, tracer: Tracer, name: str, args: dict[str, Any]) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+
+    def __enter__(self) -> _Span:
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._tracer.record(self._name, self._start, time.perf_counter_ns() - self._start, **self._args)
+
+
+class Tracer:
+    """Collects (name, start, duration, thread, args) events while enabled."""
+
+    def __init__(self, capacity: int = TRACE_CAPACITY) -> None:
+        self.enabled = False
+        self._events: deque[tuple[str, int, int | None, int, dict[str, Any]]] = deque(maxlen=capacity)
+        self._durations: dict[str, deque[int]] = {}
+        self._threads: dict[int, str] = {}
+
+    def span(self, name: str, **args: Any) -> _Span | _NullSpan:
+        """Context manager timing its block as one event."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def start(self) -> int | None:
+        """Start time of a span that ends somewhere else (see finish()); None while disabled."""
+        return time.perf_counter_ns() if self.enabled else None
+
+    def finish(self, name: str, started: int | None, **args: Any) -> None:
+        if started is not None and self.enabled:
+            self.record(name, started, time.perf_counter_ns() - started, **args)
+
+    def instant(self, name: str, **args: Any) -> None:
+        """Records a point in time, such as a media player state change."""
+        if self.enabled:
+            self._events.append((name, time.perf_counter_ns(), None, self._thread(), args))
+
+    def record(self, name: str, start_ns: int, duration_ns: int, **args: Any) -> None:
+        self._events.append((name, start_ns, duration_ns, self._thread(), args))
+        durations = self._durations.get(name)
+        if durations is None:
+            durations = self._durations.setdefault(name, deque(maxlen=_HISTORY))
+        durations.append(duration_ns)
+
+    def _thread(self) -> int:
+        ident = threading.get_ident()
+        if ident not in self._threads:
+            self._threads[ident] = threading.current_thread().name
+        return ident
+
+    def clear(self) -> None:
+        self._events.clear()
+        self._durations.clear()
+
+    def percentile(self, name: str, fraction: float) -> float | None:
+        """Milliseconds at the given fraction of the recent durations of name, or None."""
+        durations = sorted(self._durations.get(name, ()))
+        if not durations:
+            return None
+        return durations[min(len(durations) - 1, int(fraction * len(durations)))] / 1e6
+
+    def breakdown(self, names: list[str], **match: Any) -> dict[str, float]:
+        """Milliseconds of the latest event of each name whose args include match."""
+        found: dict[str, float] = {}
+        wanted = set(names)
+        for i, (name, _, duration, _, args) in enumerate(reversed(self._events)):
+            if i >= _BREAKDOWN_WINDOW or not wanted:
+                break
+            if name in wanted and duration is not None and all(args.get(k) == v for k, v in match.items()):
+                found[name] = duration / 1e6
+                wanted.discard(name)
+        return found
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """The recorded events in the Chrome trace event format, timestamps in microseconds."""
+        pid = os.getpid()
+        events: list[dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in list(self._threads.items())
+        ]
+        for name, start, duration, tid, args in list(self._events):
+            event = {"name": name, "cat": "media-sorter", "pid": pid, "tid": tid, "ts": start / 1000, "args": args}
+            if duration is None:
+                event.update(ph="i", s="t")
+            else:
+                event.update(ph="X", dur=duration / 1000)
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: Path) -> int:
+        """Writes a Chrome trace JSON file and returns the number of events in it."""
+        trace = self.chrome_trace()
+        path.write_text(json.dumps(trace, default=str))
+        return len(trace["traceEvents"])
+
+
+# The application's tracer; enable it to start recording
+tracer = Tracer()
@@ -0,0 +1,207 @@
+"""Two-player video output that pre-rolls the next clip while the current one plays.
+
+QtMultimedia is only imported once the first clip is loaded: importing it
+and creating a player starts the platform media backend, which would
+otherwise slow down the start of sessions that never show a video."""
+
+from __future__ import annotations
+
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from PyQt6.QtCore import QObject, QSize, QTimer, QUrl, pyqtSignal
+from PyQt6.QtWidgets import QStackedWidget
+
+from constants import VIDEO_PRELOAD_DELAY_MS
+
+if TYPE_CHECKING:
+    from PyQt6.QtMultimedia import QMediaPlayer
+
+
+class _Slot:
+    """One player with its own audio output and video widget; path is the file its pipeline holds."""
+
+    __slots__ = ("audio", "path", "player", "widget")
+
+    def __init__(self, parent: QObject) -> None:
+        from PyQt6.QtMultimedia import QAudioOutput, QMediaPlayer
+        from PyQt6.QtMultimediaWidgets import QVideoWidget
+
+        self.player = QMediaPlayer(parent)
+        self.audio = QAudioOutput(parent)
+        self.widget = QVideoWidget()
+        self.player.setAudioOutput(self.audio)
+        self.player.setVideoOutput(self.widget)
+        self.path: Path | None = None
+
+    def load(self, path: Path | None) -> None:
+        self.player.stop()
+        self.path = path
+        self.player.setSource(QUrl.fromLocalFile(str(path)) if path is not None else QUrl())
+
+
+class VideoDeck(QObject):
+    """Plays videos through two QMediaPlayers so switching clips does not rebuild a pipeline.
+
+    The active player shows the current video; the standby player opens the
+    clip that is expected next, muted and paused on its first frame. When
+    play() asks for the standby's file the two swap, and the previous clip
+    stays loaded in the new standby so stepping back is just as quick. At
+    most two pipelines are ever open. Signals mirror QMediaPlayer's and only
+    fire for the active player.
+
+    The players are created by the first play() or preload() that names a
+    file; until then every other call is a no-op."""
+
+    playbackStateChanged = pyqtSignal(object)
+    durationChanged = pyqtSignal(int)
+    positionChanged = pyqtSignal(int)
+    errorOccurred = pyqtSignal(object, str)
+    metaDataChanged = pyqtSignal()
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.widget = QStackedWidget()
+        self._slots: tuple[_Slot, _Slot] | None = None
+        self._active: _Slot | None = None
+        self._standby: _Slot | None = None
+        self._current: Path | None = None
+        self._muted = False
+
+        self._preload_path: Path | None = None
+        self._preload_timer = QTimer(self)
+        self._preload_timer.setSingleShot(True)
+        self._preload_timer.setInterval(VIDEO_PRELOAD_DELAY_MS)
+        self._preload_timer.timeout.connect(self._preload)
+
+    def _create_players(self) -> None:
+        if self._slots is not None:
+            return
+        self._slots = (_Slot(self), _Slot(self))
+        for slot in self._slots:
+            self.widget.addWidget(slot.widget)
+            player = slot.player
+            player.playbackStateChanged.connect(partial(self._forward, slot, self.playbackStateChanged))
+            player.durationChanged.connect(partial(self._forward, slot, self.durationChanged))
+            player.positionChanged.connect(partial(self._forward, slot, self.positionChanged))
+            player.metaDataChanged.connect(partial(self._forward, slot, self.metaDataChanged))
+            player.errorOccurred.connect(partial(self._on_error, slot))
+            player.mediaStatusChanged.connect(partial(self._on_status, slot))
+        self._active, self._standby = self._slots
+        self._apply_audio()
+
+    @property
+    def player(self) -> QMediaPlayer | None:
+        """The active player, or None before the first clip"""
+        return self._active.player if self._active is not None else None
+
+    def source(self) -> QUrl:
+        """The playing file, or an empty QUrl once stop() was called"""
+        return self.player.source() if self._current is not None else QUrl()
+
+    def is_playing(self) -> bool:
+        player = self.player
+        return player is not None and player.playbackState() == player.PlaybackState.PlayingState
+
+    def pause(self) -> None:
+        if self.player is not None:
+            self.player.pause()
+
+    def resume(self) -> None:
+        """Continues the current clip after pause()"""
+        if self._current is not None:
+            self.player.play()
+
+    def duration(self) -> int:
+        return self.player.duration() if self.player is not None else 0
+
+    def position(self) -> int:
+        return self.player.position() if self.player is not None else 0
+
+    def resolution(self) -> QSize | None:
+        """Frame size of the current clip from its metadata, once the player has read it"""
+        if self.player is None:
+            return None
+        from PyQt6.QtMultimedia import QMediaMetaData
+
+        resolution = self.player.metaData().value(QMediaMetaData.Key.Resolution)
+        return resolution if resolution and resolution.isValid() else None
+
+    def play(self, path: Path) -> None:
+        """Starts path, swapping to the standby player when it already holds the file"""
+        self._create_players()
+        self._preload_timer.stop()
+        if self._standby.path == path and self._active.path != path:
+            self._active.player.stop()
+            self._active, self._standby = self._standby, self._active
+            self.widget.setCurrentWidget(self._active.widget)
+            self._apply_audio()
+            # A pre-rolled player reported these while it was still the standby
+            self.durationChanged.emit(self.player.duration())
+            self.positionChanged.emit(self.player.position())
+            self.metaDataChanged.emit()
+        elif self._active.path != path:
+            self._active.load(path)
+        self._current = path
+        self.player.play()
+
+    def stop(self) -> None:
+        """Stops playback but keeps the pipeline open, so the clip can be resumed or swapped back cheaply"""
+        self._current = None
+        if self._active is not None:
+            self._active.player.stop()
+
+    def preload(self, path: Path | None) -> None:
+        """Opens path in the standby player once navigation has settled"""
+        self._preload_path = path
+        if path is None or (self._slots is not None and path in (self._active.path, self._standby.path)):
+            self._preload_timer.stop()
+        else:
+            self._preload_timer.start()
+
+    def release(self, paths: set[Path] | None = None) -> None:
+        """Closes the pipelines holding any of paths (all of them when None), e.g. before the files move"""
+        self._preload_timer.stop()
+        for slot in self._slots or ():
+            if slot.path is not None and (paths is None or slot.path in paths):
+                if slot is self._active:
+                    self._current = None
+                slot.load(None)
+
+    def set_position(self, position: int) -> None:
+        if self.player is not None:
+            self.player.setPosition(position)
+
+    def set_muted(self, muted: bool) -> None:
+        self._muted = muted
+        if self._slots is not None:
+            self._apply_audio()
+
+    def _apply_audio(self) -> None:
+        self._active.audio.setMuted(self._muted)
+        self._standby.audio.setMuted(True)
+
+    def _preload(self) -> None:
+        path = self._preload_path
+        if path is None:
+            return
+        self._create_players()
+        if path not in (self._active.path, self._standby.path):
+            self._standby.load(path)
+
+    def _forward(self, slot: _Slot, signal: pyqtSignal, *args: object) -> None:
+        if slot is self._active:
+            signal.emit(*args)
+
+    def _on_status(self, slot: _Slot, status: QMediaPlayer.MediaStatus) -> None:
+        if slot is self._standby and status == slot.player.MediaStatus.LoadedMedia:
+            # Pre-roll: decode the first frame so the swap shows a picture at once
+            slot.player.pause()
+
+    def _on_error(self, slot: _Slot, error: QMediaPlayer.Error, message: str) -> None:
+        if slot is self._standby:
+            slot.load(None)
+        elif self._current is not None:
+            self.release({self._current})
+            self.errorOccurred.emit(error, message)
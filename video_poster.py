@@ -0,0 +1,103 @@
+"""Grabbing a single representative frame from video files."""
+
+from __future__ import annotations
+
+from collections import deque
+from pathlib import Path
+
+from PyQt6.QtCore import QObject, QSize, Qt, QTimer, QUrl, pyqtSignal
+from PyQt6.QtGui import QImage
+from PyQt6.QtMultimedia import QMediaPlayer, QVideoFrame, QVideoSink
+
+from constants import POSTER_TIMEOUT_MS
+
+# Poster frames are taken this far into the video, or at a tenth of shorter videos
+_POSTER_POSITION_MS = 3000
+
+
+class PosterFrameGrabber(QObject):
+    """Decodes one frame per video with a muted, never-shown QMediaPlayer.
+
+    Requests are handled one at a time in the order they arrive. grabbed
+    carries (name, path, image, failed); the image is null when the video
+    could not be decoded within POSTER_TIMEOUT_MS. failed is only True when
+    the player rejected the file, not when it merely took too long, e.g. on
+    a slow network share."""
+
+    grabbed = pyqtSignal(str, object, object, bool)
+
+    def __init__(self, size: QSize, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._size = size
+        self._queue: deque[tuple[str, Path]] = deque()
+        self._current: tuple[str, Path] | None = None
+
+        self._sink = QVideoSink(self)
+        self._sink.videoFrameChanged.connect(self._on_frame)
+        self._player = QMediaPlayer(self)
+        self._player.setVideoSink(self._sink)
+        self._player.mediaStatusChanged.connect(self._on_status)
+        self._player.errorOccurred.connect(self._on_error)
+
+        self._timeout = QTimer(self)
+        self._timeout.setSingleShot(True)
+        self._timeout.setInterval(POSTER_TIMEOUT_MS)
+        self._timeout.timeout.connect(self._on_timeout)
+
+    def grab(self, name: str, path: Path) -> None:
+        self._queue.append((name, path))
+        if self._current is None:
+            self._next()
+
+    def clear(self) -> None:
+        self._queue.clear()
+        if self._current is not None:
+            self._current = None
+            self._timeout.stop()
+            self._player.stop()
+            self._player.setSource(QUrl())
+
+    def _next(self) -> None:
+        if self._current is not None or not self._queue:
+            return
+        self._current = self._queue.popleft()
+        self._timeout.start()
+        self._player.setSource(QUrl.fromLocalFile(str(self._current[1])))
+
+    def _on_status(self, status: QMediaPlayer.MediaStatus) -> None:
+        if self._current is None:
+            return
+        if status == QMediaPlayer.MediaStatus.LoadedMedia:
+            duration = self._player.duration()
+            if duration > 0:
+                self._player.setPosition(min(_POSTER_POSITION_MS, duration // 10))
+            self._player.play()
+        elif status == QMediaPlayer.MediaStatus.InvalidMedia:
+            self._finish(QImage(), failed=True)
+
+    def _on_frame(self, frame: QVideoFrame) -> None:
+        if self._current is None or not frame.isValid():
+            return
+        image = frame.toImage()
+        if image.isNull():
+            return
+        self._finish(
+            image.scaled(self._size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        )
+
+    def _on_error(self, *args: object) -> None:
+        if self._current is not None:
+            self._finish(QImage(), failed=True)
+
+    def _on_timeout(self) -> None:
+        if self._current is not None:
+            self._finish(QImage())
+
+    def _finish(self, image: QImage, failed: bool = False) -> None:
+        name, path = self._current
+        self._current = None
+        self._timeout.stop()
+        self._player.stop()
+        self._player.setSource(QUrl())
+        self.grabbed.emit(name, path, image, failed)
+        QTimer.singleShot(0, self._next)
@@ -0,0 +1,698 @@
+"""Background jobs that report back to the GUI thread through Qt signals."""
+
+from __future__ import annotations
+
+import contextlib
+import multiprocessing
+import os
+import sqlite3
+import threading
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from send2trash import send2trash
+
+from constants import HASH_BATCH, SOURCE_SCAN_PENDING, SOURCE_SCAN_WORKERS, SUGGEST_WORKERS, TRASH_BATCH
+from file_move import move_entries
+from folder_index import FolderIndex, IndexedFolder, IndexEntry, entry_kind, stat_entry
+from folder_scan import distinct_roots, iter_folder_batches, iter_tree_batches
+from image_hash import HashStore
+from media_loader import image_dhash, image_signature, probe_media
+
+# Headers are probed and committed to the index in chunks of this many files
+_PROBE_CHUNK = 500
+# Fewer unprobed files than this are probed on the scan thread without starting processes
+_PROBE_POOL_MIN = 64
+
+
+def _image_files(directory: Path) -> list[tuple[str, int, int]]:
+    """Sorted (name, size, mtime_ns) of the images directly in directory; empty if it cannot be read."""
+    files = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry_kind(entry.name) != "image" or not entry.is_file():
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                files.append((entry.name, st.st_size, st.st_mtime_ns))
+    except OSError:
+        return []
+    files.sort()
+    return files
+
+
+def _probe_source(path: str) -> IndexEntry | None:
+    """Index entry of a file found under a source folder, named by its absolute path; None if it has gone."""
+    entry = stat_entry(Path(), path, entry_kind(path))
+    if entry is None:
+        return None
+    width, height, taken = probe_media(Path(path))
+    return replace(entry, width=width, height=height, taken=taken)
+
+
+class _ProcessMap:
+    """Maps a module-level function over items in a lazily started pool of spawned processes.
+
+    Spawned workers do not inherit the GUI process's Qt threads. When the
+    pool fails in any way, e.g. worker processes cannot start, the spawn
+    bootstrap raises, or items cannot be pickled, the items are mapped on the
+    calling thread, and so is every later call. Several threads may share one
+    map."""
+
+    def __init__(self, workers: int) -> None:
+        self._workers = workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._in_thread = False
+        self._lock = threading.Lock()
+
+    def map(self, fn: Callable[[Any], Any], items: list[Any], chunksize: int = 16) -> list[Any]:
+        if not self._in_thread:
+            try:
+                with self._lock:
+                    if self._executor is None:
+                        context = multiprocessing.get_context("spawn")
+                        self._executor = ProcessPoolExecutor(self._workers, mp_context=context)
+                    executor = self._executor
+                return list(executor.map(fn, items, chunksize=chunksize))
+            except Exception:
+                # A job dying here would leave the window waiting for signals that never come
+                self._in_thread = True
+                self.shutdown()
+        return [fn(item) for item in items]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _Task(QRunnable):
+    """Runs a job's _run() on a pool thread; holds a reference so the job outlives its owner."""
+
+    def __init__(self, job: QObject) -> None:
+        super().__init__()
+        self._job = job
+
+    def run(self) -> None:
+        self._job._run()
+
+
+class FolderScan(QObject):
+    """Scans the top level of a folder on a worker thread.
+
+    batch_ready carries (media files, subfolders, entries scanned so far), each
+    list sorted; the receiver merges batches into its own sorted lists.
+
+    With a FolderIndex, the stored listing is sent first. If the directory
+    mtime still matches the index the scan stops there; otherwise a rescan
+    sends the new names through batch_ready and vanished ones through
+    entries_removed, then writes the diff back. Image dimensions missing from
+    the index are probed from file headers after finished has been emitted.
+
+    metadata_ready carries lists of IndexEntry for sorting and filtering: the
+    whole stored listing once the scan is done (before the first batch when
+    early_metadata is set), then every chunk of newly probed files. Probing
+    runs in one process per core."""
+
+    # Lists travel as plain Python objects; declaring them as list would copy them into QVariantLists
+    batch_ready = pyqtSignal(object, object, int)
+    entries_removed = pyqtSignal(object, object)
+    metadata_ready = pyqtSignal(object)
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, folder: Path, index: FolderIndex | None = None, early_metadata: bool = False) -> None:
+        super().__init__()
+        self.folder = folder
+        self._index = index
+        self._early_metadata = early_metadata
+        self._cancelled = False
+
+    def start(self) -> None:
+        QThreadPool.globalInstance().start(_Task(self))
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def _run(self) -> None:
+        try:
+            dir_mtime = os.stat(self.folder).st_mtime_ns
+            cached = self._load_index()
+            entries = None
+            if cached is not None:
+                if self._early_metadata:
+                    entries = self._emit_metadata()
+                self.batch_ready.emit(cached.files, cached.folders, 0)
+                if cached.mtime_ns == dir_mtime:
+                    if not self._cancelled:
+                        self.finished.emit()
+                        self._probe_metadata(entries)
+                    return
+
+            known_files = set(cached.files) if cached else set()
+            known_folders = set(cached.folders) if cached else set()
+            seen_files: set[str] = set()
+            seen_folders: set[str] = set()
+            for files, folders, scanned in iter_folder_batches(self.folder, self.is_cancelled):
+                seen_files.update(files)
+                seen_folders.update(folders)
+                new_files = [name for name in files if name not in known_files]
+                new_folders = [name for name in folders if name not in known_folders]
+                self.batch_ready.emit(new_files, new_folders, scanned)
+        except OSError as e:
+            if not self._cancelled:
+                self.failed.emit(str(e))
+            return
+        if self._cancelled:
+            return
+
+        removed_files = sorted(known_files - seen_files)
+        removed_folders = sorted(known_folders - seen_folders)
+        if removed_files or removed_folders:
+            self.entries_removed.emit(removed_files, removed_folders)
+        self.finished.emit()
+
+        self._save_index(
+            cached,
+            dir_mtime,
+            seen_files - known_files,
+            seen_folders - known_folders,
+            removed_files + removed_folders,
+        )
+        # The rescan may have changed the listing sent early
+        self._probe_metadata(None)
+
+    def _load_index(self) -> IndexedFolder | None:
+        if self._index is None:
+            return None
+        try:
+            return self._index.load(self.folder)
+        except sqlite3.Error:
+            return None
+
+    def _save_index(
+        self,
+        cached: IndexedFolder | None,
+        dir_mtime: int,
+        added_files: set[str],
+        added_folders: set[str],
+        removed: list[str],
+    ) -> None:
+        if self._index is None:
+            return
+        added = [IndexEntry(name, "dir") for name in added_folders]
+        for name in added_files:
+            if self._cancelled:
+                return
+            entry = stat_entry(self.folder, name, entry_kind(name))
+            if entry is not None:
+                added.append(entry)
+        with contextlib.suppress(sqlite3.Error):
+            self._index.update(self.folder, dir_mtime, added, removed, replace=cached is None)
+
+    def _emit_metadata(self) -> dict[str, IndexEntry] | None:
+        try:
+            entries = self._index.entries(self.folder)
+        except sqlite3.Error:
+            return None
+        media = [entry for entry in entries.values() if entry.kind in ("image", "video")]
+        if media and not self._cancelled:
+            self.metadata_ready.emit(media)
+        return entries
+
+    def _probe_metadata(self, entries: dict[str, IndexEntry] | None) -> None:
+        if self._index is None:
+            return
+        if entries is None:
+            entries = self._emit_metadata()
+            if entries is None:
+                return
+        workers = os.cpu_count() or 1
+        pool = _ProcessMap(workers)
+        try:
+            while not self._cancelled:
+                names = self._index.unprobed(self.folder, _PROBE_CHUNK)
+                if not names:
+                    return
+                paths = [self.folder / name for name in names]
+                if len(names) < _PROBE_POOL_MIN:
+                    probed = [probe_media(path) for path in paths]
+                else:
+                    probed = pool.map(probe_media, paths, chunksize=max(1, len(paths) // (4 * workers)))
+                if self._cancelled:
+                    return
+                self._index.set_probed(
+                    self.folder, ((name, *values) for name, values in zip(names, probed, strict=True))
+                )
+                updated = []
+                for name, (width, height, taken) in zip(names, probed, strict=True):
+                    entry = entries.get(name) or IndexEntry(name, entry_kind(name))
+                    updated.append(replace(entry, width=width, height=height, taken=taken))
+                self.metadata_ready.emit(updated)
+        except sqlite3.Error:
+            return
+        finally:
+            pool.shutdown()
+
+
+class FolderListing(QObject):
+    """Lists the top level of a folder on a worker thread and reports it in one go.
+
+    Used to re-check a folder after change notifications. When a FolderIndex
+    is given, the difference to the stored listing is written back so the
+    next open of the folder stays instant."""
+
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, folder: Path, index: FolderIndex | None = None) -> None:
+        super().__init__()
+        self.folder = folder
+        self._index = index
+        self._cancelled = False
+
+    def start(self) -> None:
+        QThreadPool.globalInstance().start(_Task(self))
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def _run(self) -> None:
+        files: set[str] = set()
+        folders: set[str] = set()
+        try:
+            dir_mtime = os.stat(self.folder).st_mtime_ns
+            for batch_files, batch_folders, _ in iter_folder_batches(self.folder, self.is_cancelled):
+                files.update(batch_files)
+                folders.update(batch_folders)
+        except OSError as e:
+            if not self._cancelled:
+                self.failed.emit(str(e))
+            return
+        if self._cancelled:
+            return
+        self.finished.emit(files, folders)
+        self._update_index(dir_mtime, files, folders)
+
+    def _update_index(self, dir_mtime: int, files: set[str], folders: set[str]) -> None:
+        cached = None
+        if self._index is not None:
+            with contextlib.suppress(sqlite3.Error):
+                cached = self._index.load(self.folder)
+        if cached is None:
+            return
+        known_files = set(cached.files)
+        known_folders = set(cached.folders)
+        added = [IndexEntry(name, "dir") for name in folders - known_folders]
+        for name in files - known_files:
+            entry = stat_entry(self.folder, name, entry_kind(name))
+            if entry is not None:
+                added.append(entry)
+        removed = list(known_files - files) + list(known_folders - folders)
+        with contextlib.suppress(sqlite3.Error):
+            self._index.update(self.folder, dir_mtime, added, removed)
+
+
+class SourceScan(QObject):
+    """Walks source folders recursively, one worker thread per storage device.
+
+    Roots on the same device are walked one after another by the same
+    worker, so no disk is read by two walkers at once. The category folder
+    and the categories directly inside it are never entered.
+
+    batch_ready carries (worker, sorted absolute media paths, entries scanned
+    so far by all workers). The receiver merges the paths into its own sorted
+    list and hands the worker back to batch_taken(); a worker pauses while
+    SOURCE_SCAN_PENDING of its batches wait, which keeps queued paths bounded
+    however large the trees are. failed carries a message per root that
+    could not be read; finished follows once every worker is done.
+
+    After its walk, each worker probes the headers of the files it found in a
+    process pool shared by all workers and sends IndexEntry lists, named by
+    absolute path, through metadata_ready; this goes on after finished, as
+    with FolderScan."""
+
+    batch_ready = pyqtSignal(int, object, int)
+    metadata_ready = pyqtSignal(object)
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, roots: list[Path], category_folder: Path | None = None) -> None:
+        super().__init__()
+        self.roots = distinct_roots(roots)
+        self._excluded = os.path.normcase(os.path.abspath(category_folder)) if category_folder else None
+        self._cancelled = False
+        self._lock = threading.Lock()
+        self._scanned: dict[Path, int] = {}
+        self._running = 0
+        self._permits: dict[int, threading.Semaphore] = {}
+        self._pool = _ProcessMap(os.cpu_count() or 1)
+        self._probing = 0
+
+    def start(self) -> None:
+        groups: dict[int, list[Path]] = {}
+        for root in self.roots:
+            try:
+                device = os.stat(root).st_dev
+            except OSError as e:
+                self.failed.emit(f"{root}: {e.strerror or e}")
+                continue
+            groups.setdefault(device, []).append(root)
+        if not groups:
+            self.finished.emit()
+            return
+        self._running = self._probing = len(groups)
+        for worker, roots in enumerate(groups.values()):
+            self._permits[worker] = threading.Semaphore(SOURCE_SCAN_PENDING)
+            _source_pool().start(_SourceWalker(self, worker, roots))
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def batch_taken(self, worker: int) -> None:
+        self._permits[worker].release()
+
+    def _skip(self, path: str) -> bool:
+        if self._excluded is None:
+            return False
+        path = os.path.normcase(path)
+        return path == self._excluded or os.path.dirname(path) == self._excluded
+
+    def _walk(self, worker: int, roots: list[Path]) -> None:
+        walked: list[str] = []
+        try:
+            try:
+                self._walk_roots(worker, roots, walked)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    done = self._running == 0
+                if done and not self._cancelled:
+                    self.finished.emit()
+            self._probe_metadata(walked)
+        finally:
+            with self._lock:
+                self._probing -= 1
+                last = self._probing == 0
+            if last:
+                self._pool.shutdown()
+
+    def _walk_roots(self, worker: int, roots: list[Path], walked: list[str]) -> None:
+        for root in roots:
+            try:
+                for files, scanned in iter_tree_batches(root, self._skip, self.is_cancelled):
+                    if not self._wait_for_permit(worker):
+                        return
+                    with self._lock:
+                        self._scanned[root] = scanned
+                        total = sum(self._scanned.values())
+                    self.batch_ready.emit(worker, files, total)
+                    walked.extend(files)
+            except OSError as e:
+                if not self._cancelled:
+                    self.failed.emit(f"{root}: {e.strerror or e}")
+
+    def _probe_metadata(self, paths: list[str]) -> None:
+        workers = os.cpu_count() or 1
+        for start in range(0, len(paths), _PROBE_CHUNK):
+            if self._cancelled:
+                return
+            chunk = paths[start : start + _PROBE_CHUNK]
+            if len(chunk) < _PROBE_POOL_MIN:
+                probed = [_probe_source(path) for path in chunk]
+            else:
+                probed = self._pool.map(_probe_source, chunk, chunksize=max(1, len(chunk) // (4 * workers)))
+            entries = [entry for entry in probed if entry is not None]
+            if entries and not self._cancelled:
+                self.metadata_ready.emit(entries)
+
+    def _wait_for_permit(self, worker: int) -> bool:
+        """Blocks while the receiver has too many of this worker's batches; False once cancelled"""
+        while not self._permits[worker].acquire(timeout=0.1):
+            if self._cancelled:
+                return False
+        return not self._cancelled
+
+
+class _SourceWalker(QRunnable):
+    """One SourceScan worker with its roots; holds a reference so the scan outlives its owner."""
+
+    def __init__(self, scan: SourceScan, worker: int, roots: list[Path]) -> None:
+        super().__init__()
+        self._scan = scan
+        self._worker = worker
+        self._roots = roots
+
+    def run(self) -> None:
+        self._scan._walk(self._worker, self._roots)
+
+
+_SOURCE_POOL: QThreadPool | None = None
+
+
+def _source_pool() -> QThreadPool:
+    """Threads for source walks; separate from the global pool, whose threads are sized for CPU work."""
+    global _SOURCE_POOL
+    if _SOURCE_POOL is None:
+        _SOURCE_POOL = QThreadPool()
+        _SOURCE_POOL.setMaxThreadCount(SOURCE_SCAN_WORKERS)
+    return _SOURCE_POOL
+
+
+class CategoryRestore(QObject):
+    """Moves everything in a category folder back into its parent on a worker thread.
+
+    batch_ready carries (sorted media files, sorted folders, entries done, total)
+    for each chunk that was moved. finished carries the failure messages and
+    whether the category folder, once empty, was removed."""
+
+    batch_ready = pyqtSignal(object, object, int, int)
+    finished = pyqtSignal(object, bool)
+    failed = pyqtSignal(str)
+
+    def __init__(self, folder: Path, category: str) -> None:
+        super().__init__()
+        self.folder = folder
+        self.category = category
+        self._cancelled = False
+
+    def start(self) -> None:
+        QThreadPool.globalInstance().start(_Task(self))
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def _run(self) -> None:
+        category_path = self.folder / self.category
+        failures: list[str] = []
+        removed = False
+        try:
+            for batch in move_entries(category_path, self.folder, self.is_cancelled):
+                failures.extend(batch.failures)
+                self.batch_ready.emit(batch.files, batch.folders, batch.done, batch.total)
+        except OSError as e:
+            if not self._cancelled:
+                self.failed.emit(str(e))
+            return
+        if not failures and not self._cancelled:
+            try:
+                category_path.rmdir()
+                removed = True
+            except OSError as e:
+                failures.append(f"{self.category}: {e.strerror or e}")
+        self.finished.emit(failures, removed)
+
+
+class TrashJob(QObject):
+    """Sends files to the recycle bin on a worker thread.
+
+    batch_done carries (names trashed, [(name, error)] failures, files handled
+    so far) for every TRASH_BATCH files, so one failure never stops the rest."""
+
+    batch_done = pyqtSignal(object, object, int)
+    finished = pyqtSignal()
+
+    def __init__(self, folder: Path, names: list[str]) -> None:
+        super().__init__()
+        self.folder = folder
+        self.names = names
+
+    def start(self) -> None:
+        QThreadPool.globalInstance().start(_Task(self))
+
+    def _run(self) -> None:
+        done = 0
+        for start in range(0, len(self.names), TRASH_BATCH):
+            trashed: list[str] = []
+            failures: list[tuple[str, str]] = []
+            for name in self.names[start : start + TRASH_BATCH]:
+                try:
+                    send2trash(str(self.folder / name))
+                except OSError as e:
+                    failures.append((name, str(e)))
+                else:
+                    trashed.append(name)
+            done += len(trashed) + len(failures)
+            self.batch_done.emit(trashed, failures, done)
+        self.finished.emit()
+
+
+class DuplicateScan(QObject):
+    """Computes perceptual hashes for the images in a folder and its category subfolders.
+
+    hashed carries lists of (category, name, hash), with category "" for the
+    folder itself. Categories go first because they hold what is already
+    sorted. Hashes come from the HashStore when a file's name, size and mtime
+    match, so only new or edited files are decoded."""
+
+    hashed = pyqtSignal(object)
+    finished = pyqtSignal()
+
+    def __init__(self, folder: Path, categories: list[str], store: HashStore | None = None) -> None:
+        super().__init__()
+        self.folder = folder
+        self.categories = categories
+        self._store = store
+        self._cancelled = False
+
+    def start(self) -> None:
+        QThreadPool.globalInstance().start(_Task(self))
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def _run(self) -> None:
+        for category in [*self.categories, ""]:
+            if self._cancelled:
+                return
+            self._hash_folder(category)
+        if not self._cancelled:
+            self.finished.emit()
+
+    def _hash_folder(self, category: str) -> None:
+        directory = self.folder / category if category else self.folder
+        files = _image_files(directory)
+        for start in range(0, len(files), HASH_BATCH):
+            chunk = files[start : start + HASH_BATCH]
+            known = self._lookup(chunk)
+            new: list[tuple[str, int, int, int | None]] = []
+            results: list[tuple[str, str, int]] = []
+            for key in chunk:
+                if self._cancelled:
+                    return
+                if key in known:
+                    value = known[key]
+                else:
+                    value = image_dhash(directory / key[0])
+                    new.append((*key, value))
+                if value is not None:
+                    results.append((category, key[0], value))
+            if new and self._store is not None:
+                with contextlib.suppress(sqlite3.Error):
+                    self._store.store(new)
+            if results:
+                self.hashed.emit(results)
+
+    def _lookup(self, files: list[tuple[str, int, int]]) -> dict[tuple[str, int, int], int | None]:
+        if self._store is None:
+            return {}
+        try:
+            return self._store.lookup(files)
+        except sqlite3.Error:
+            return {}
+
+
+class FeatureScan(QObject):
+    """Extracts category-suggestion signatures for a folder and its categories.
+
+    Works like DuplicateScan: signatures carries lists of (category, name,
+    signature) and stored signatures are reused. Files without one are
+    decoded in a pool of SUGGEST_WORKERS processes, which is only started
+    when there is something to extract; if the pool fails they are decoded
+    on the scan thread instead."""
+
+    signatures = pyqtSignal(object)
+    finished = pyqtSignal()
+
+    def __init__(self, folder: Path, categories: list[str], store: HashStore | None = None) -> None:
+        super().__init__()
+        self.folder = folder
+        self.categories = categories
+        self._store = store
+        self._cancelled = False
+        self._pool = _ProcessMap(SUGGEST_WORKERS)
+
+    def start(self) -> None:
+        QThreadPool.globalInstance().start(_Task(self))
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def _run(self) -> None:
+        try:
+            for category in [*self.categories, ""]:
+                if self._cancelled:
+                    return
+                self._scan_folder(category)
+        finally:
+            self._pool.shutdown()
+        if not self._cancelled:
+            self.finished.emit()
+
+    def _scan_folder(self, category: str) -> None:
+        directory = self.folder / category if category else self.folder
+        files = _image_files(directory)
+        for start in range(0, len(files), HASH_BATCH):
+            if self._cancelled:
+                return
+            chunk = files[start : start + HASH_BATCH]
+            known = self._lookup(chunk)
+            missing = [key for key in chunk if key not in known]
+            if missing:
+                paths = [directory / name for name, _, _ in missing]
+                extracted = self._pool.map(image_signature, paths)
+                if self._cancelled:
+                    return
+                known.update(zip(missing, extracted, strict=True))
+                if self._store is not None:
+                    with contextlib.suppress(sqlite3.Error):
+                        self._store.store_signatures(
+                            (*key, value) for key, value in zip(missing, extracted, strict=True)
+                        )
+            results = [(category, key[0], known[key]) for key in chunk if known[key] is not None]
+            if results:
+                self.signatures.emit(results)
+
+    def _lookup(self, files: list[tuple[str, int, int]]) -> dict[tuple[str, int, int], int | None]:
+        if self._store is None:
+            return {}
+        try:
+            return self._store.lookup_signatures(files)
+        except sqlite3.Error:
+            return {}